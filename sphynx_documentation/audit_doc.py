@@ -0,0 +1,257 @@
+"""
+Ce script vérifie la documentation des fonctions et classes MATLAB (.m)
+avant une publication, sans construction Sphinx.
+
+Les dossiers trouvés par find_leaf_folders sont répartis entre plusieurs
+processus qui lisent l'en-tête de chaque fichier .m (voir
+matlab_symbols.parse_header) à travers le cache d'analyse adressé par le
+contenu (voir parse_cache.ParseCache): lors d'une nouvelle vérification,
+seuls les fichiers modifiés sont analysés.
+
+Pour chaque symbole public (fonction ou classe), le script signale:
+- missing_header: aucun en-tête de commentaires;
+- undocumented_args: arguments de la signature sans champ ':param <nom>:';
+- unknown_params: champs ':param <nom>:' ne correspondant à aucun argument.
+
+Les résultats sont écrits au fil de l'eau au format JSON lines (un objet
+par symbole), puis un récapitulatif de la couverture par dossier est
+affiché.
+
+Exemple:
+    python audit_doc.py ../code_matlab --output audit.jsonl --fail-under 90
+"""
+
+import argparse
+import json
+import os
+import re
+import sys
+from collections.abc import Iterator
+from concurrent.futures import ProcessPoolExecutor
+
+from auto_doc_matlab import find_leaf_folders
+from matlab_symbols import iter_documented_folders, public_symbols, scan_folder_symbols
+from parse_cache import ParseCache
+from scan_rules import ScanRules
+
+# Dossiers envoyés ensemble à un processus
+CHUNK_SIZE = 16
+
+# Arguments qu'il n'est pas nécessaire de documenter (entrée ignorée,
+# arguments variables)
+UNDOCUMENTED_ARGS = ("~", "varargin")
+
+_PARAM_RE = re.compile(r"^\s*:param\s+(?:[^:]*\s)?(?P<name>[\w~]+)\s*:", re.MULTILINE)
+
+
+def documented_params(docstring: str) -> list[str]:
+    """
+    Liste les arguments décrits par des champs ':param:' d'une docstring.
+
+    Les deux formes de Sphinx sont reconnues: ':param nom:' et
+    ':param type nom:'.
+
+    Args:
+        docstring: Docstring du symbole.
+
+    Returns:
+        Noms des arguments, dans l'ordre de la docstring.
+    """
+    return [match.group("name") for match in _PARAM_RE.finditer(docstring)]
+
+
+def audit_symbol(symbol: dict) -> list[dict]:
+    """
+    Vérifie la documentation d'un symbole.
+
+    Args:
+        symbol: Symbole décrit par matlab_symbols.parse_header.
+
+    Returns:
+        Liste des problèmes {"issue", "names"} (vide si le symbole est
+        correctement documenté).
+    """
+    if not symbol.get("docstring"):
+        return [{"issue": "missing_header", "names": []}]
+    if symbol["kind"] != "function":
+        return []
+
+    issues = []
+    params = documented_params(symbol["docstring"])
+    undocumented = [
+        name for name in symbol["args"]
+        if name not in params and name not in UNDOCUMENTED_ARGS
+        ]
+    if undocumented:
+        issues.append({"issue": "undocumented_args", "names": undocumented})
+    unknown = [name for name in params if name not in symbol["args"]]
+    if unknown:
+        issues.append({"issue": "unknown_params", "names": unknown})
+    return issues
+
+
+def audit_folder(task: tuple[str, str, str, str | None]) -> tuple[str, list[dict], int, int]:
+    """
+    Vérifie les symboles publics d'un dossier (exécuté dans un processus).
+
+    Args:
+        task: Tuple (dossier racine du code, chemin relatif du dossier,
+            chemin en notation pointée, dossier du cache d'analyse ou None
+            pour le dossier par défaut).
+
+    Returns:
+        Tuple (chemin en notation pointée, résultats de chaque symbole,
+        fichiers lus depuis le cache, fichiers analysés).
+    """
+    root_path, relative_folder, module_path, cache_dir = task
+    cache = ParseCache(cache_dir)
+    symbols = scan_folder_symbols(root_path, relative_folder, cache.read_header)
+
+    results = []
+    for symbol in public_symbols(symbols, module_path):
+        issues = audit_symbol(symbol)
+        results.append({
+            "module": module_path,
+            "name": symbol["name"],
+            "kind": symbol["kind"],
+            "file": symbol["file"],
+            "line": symbol["line"],
+            "documented": bool(symbol.get("docstring")),
+            "issues": issues,
+            })
+    return module_path, results, cache.hits, cache.misses
+
+
+def iter_audit(code_path: str,
+        workers: int = 1,
+        cache_dir: str | None = None,
+        rules: ScanRules | None = None
+        ) -> Iterator[tuple[str, list[dict], int, int]]:
+    """
+    Vérifie tous les dossiers documentés d'une arborescence MATLAB.
+
+    Args:
+        code_path: Dossier racine du code.
+        workers: Nombre de processus (1: vérification dans le processus
+            courant).
+        cache_dir: Dossier du cache d'analyse (voir parse_cache.ParseCache).
+        rules: Règles de parcours (voir scan_rules.ScanRules). Par défaut,
+            le fichier .matlabdocignore de la racine du code s'il existe.
+
+    Yields:
+        Résultats de chaque dossier (voir audit_folder), dans l'ordre de
+        la structure des dossiers.
+    """
+    if rules is None:
+        rules = ScanRules.from_options(code_path)
+    structure = find_leaf_folders(code_path, workers=workers, rules=rules)
+    tasks = [
+        (code_path, relative_folder, module_path, cache_dir)
+        for relative_folder, module_path in iter_documented_folders(structure)
+        ]
+
+    if workers <= 1:
+        yield from map(audit_folder, tasks)
+        return
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        yield from executor.map(audit_folder, tasks, chunksize=CHUNK_SIZE)
+
+
+def print_coverage(coverage: dict[str, list[int]], out=sys.stdout) -> float:
+    """
+    Affiche la couverture de la documentation par dossier.
+
+    Args:
+        coverage: Dictionnaire {chemin en notation pointée: [symboles
+            documentés, symboles sans problème, symboles]}.
+        out: Flux de sortie.
+
+    Returns:
+        Couverture globale en pourcentage (100 sans symbole).
+    """
+    width = max((len(module_path) for module_path in coverage), default=0)
+    for module_path, (documented, valid, total) in coverage.items():
+        print(f"{module_path:<{width}}  {documented:>6}/{total:<6} documenté(s) "
+              f"{100 * documented / total:6.1f} %  {total - valid:>6} à corriger", file=out)
+
+    documented = sum(counts[0] for counts in coverage.values())
+    valid = sum(counts[1] for counts in coverage.values())
+    total = sum(counts[2] for counts in coverage.values())
+    percent = 100 * documented / total if total else 100.0
+    print(f"Total: {documented}/{total} symbole(s) documenté(s) ({percent:.1f} %), "
+          f"{total - valid} à corriger", file=out)
+    return percent
+
+
+def main() -> None:
+    """
+    Point d'entrée en ligne de commande.
+
+    Les résultats JSON lines sont écrits dans le fichier --output, ou sur la
+    sortie standard; le récapitulatif est alors affiché sur la sortie
+    d'erreur.
+    """
+    base_dir = os.path.dirname(os.path.abspath(__file__))
+
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("code_path", nargs="?", default=os.path.join(base_dir, "..", "code_matlab"),
+                        help="Dossier racine du code MATLAB")
+    parser.add_argument("--output", help="Fichier JSON lines des résultats (par défaut: sortie standard)")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1,
+                        help="Nombre de processus")
+    parser.add_argument("--parse-cache-dir", help="Dossier du cache d'analyse des fichiers .m")
+    parser.add_argument("--issues-only", action="store_true",
+                        help="N'écrire que les symboles à corriger")
+    parser.add_argument("--exclude", action="append", default=[],
+                        help="Motif de dossiers à exclure (format .gitignore, répétable)")
+    parser.add_argument("--ignore-file",
+                        help="Fichier de motifs (par défaut: .matlabdocignore du code)")
+    parser.add_argument("--max-depth", type=int, help="Profondeur maximale du parcours")
+    parser.add_argument("--follow-symlinks", action="store_true",
+                        help="Suivre les liens symboliques vers des dossiers")
+    parser.add_argument("--fail-under", type=float,
+                        help="Code de retour 1 si la couverture globale (en %%) est inférieure")
+    args = parser.parse_args()
+
+    if not os.path.isdir(args.code_path):
+        print(f"Erreur: Le dossier {args.code_path} n'existe pas")
+        raise SystemExit(1)
+
+    rules = ScanRules.from_options(
+        args.code_path, args.exclude, args.ignore_file, args.max_depth, args.follow_symlinks
+        )
+    output = open(args.output, 'w', encoding='utf-8') if args.output else sys.stdout
+    summary = sys.stdout if args.output else sys.stderr
+
+    coverage = {}
+    hits = misses = 0
+    try:
+        for module_path, results, folder_hits, folder_misses in iter_audit(
+                args.code_path, args.workers, args.parse_cache_dir, rules):
+            hits += folder_hits
+            misses += folder_misses
+            if not results:
+                continue
+            coverage[module_path] = [
+                sum(result["documented"] for result in results),
+                sum(not result["issues"] for result in results),
+                len(results),
+                ]
+            for result in results:
+                if result["issues"] or not args.issues_only:
+                    output.write(json.dumps(result, ensure_ascii=False) + "\n")
+            output.flush()
+    finally:
+        if args.output:
+            output.close()
+
+    percent = print_coverage(coverage, summary)
+    print(f"Cache d'analyse: {hits} fichier(s) réutilisé(s), {misses} fichier(s) analysé(s)",
+          file=summary)
+    if args.fail_under is not None and percent < args.fail_under:
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
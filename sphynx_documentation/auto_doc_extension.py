@@ -0,0 +1,381 @@
+"""
+Extension Sphinx générant la documentation de l'arborescence MATLAB au
+démarrage de chaque construction.
+
+Au lieu d'exécuter auto_doc_matlab.py et index_writer.py à la main avant
+sphinx-build, l'extension lit 'matlab_src_dir' dans conf.py et génère les
+fichiers RST dans le même processus, à l'événement 'builder-inited'.
+L'état du parcours (dates des dossiers, empreintes des fichiers .m) est
+conservé dans l'environnement Sphinx: il persiste d'une construction
+incrémentale à l'autre, et les pages des dossiers dont un fichier .m a
+changé sont signalées à Sphinx via 'env-get-outdated', même lorsque le
+fichier RST généré est identique.
+
+Options de configuration (conf.py):
+    matlab_autogen_enabled: Active la génération (True par défaut).
+    matlab_autogen_output: Fichier RST généré, relatif au dossier source
+        (par défaut "documentation_hierarchique.rst").
+    matlab_autogen_split_pages: Une page par dossier (False par défaut).
+    matlab_autogen_explicit_members: Directives autofunction/autoclass
+        explicites, à partir de l'index des symboles (False par défaut).
+    matlab_autogen_max_members: Nombre de symboles au-delà duquel la page
+        d'un dossier est découpée en un tableau récapitulatif et des
+        sous-pages (None par défaut: pas de découpage; nécessite
+        matlab_autogen_split_pages et matlab_autogen_explicit_members).
+    matlab_autogen_workers: Dossiers lus simultanément (1 par défaut).
+    matlab_autogen_index: Génère aussi index.rst avec index_writer
+        (False par défaut).
+    matlab_autogen_index_sections: Sections de index.rst, liste de
+        dictionnaires {"folder", "caption", "options"} (None par défaut:
+        index_writer.SECTIONS).
+    matlab_autogen_exclude: Motifs de dossiers exclus du parcours, au
+        format .gitignore (voir scan_rules), en plus du fichier
+        .matlabdocignore de matlab_src_dir s'il existe.
+    matlab_autogen_max_depth: Profondeur maximale du parcours (None par
+        défaut: sans limite).
+    matlab_autogen_follow_symlinks: Suit les liens symboliques vers des
+        dossiers, avec détection des boucles (False par défaut).
+    matlab_autogen_check_files: Vérifie la date de chaque fichier .m à
+        chaque construction (True par défaut; seuls les dossiers dont la
+        date de modification a changé sont relus, les autres fichiers étant
+        lus avec os.stat). Avec False, les fichiers des dossiers inchangés
+        ne sont pas vérifiés: une modification sur place d'un fichier, qui
+        ne change pas la date de son dossier, n'est alors pas détectée.
+    matlab_autogen_metrics: Rapport JSON des mesures de la génération
+        (voir build_metrics), relatif au dossier des doctrees; None
+        (par défaut) pour ne pas mesurer.
+"""
+
+import hashlib
+import os
+import weakref
+from functools import partial
+from pathlib import Path
+
+from auto_doc_matlab import (
+    find_leaf_folders,
+    folder_page_names,
+    measure_phase,
+    pages_dir_for,
+    scan_folder,
+    write_documentation,
+)
+from build_metrics import BuildMetrics
+from folder_tree import FolderNode
+from index_writer import write_index
+from matlab_symbols import iter_documented_folders, prune_structure
+from parse_cache import symbol_index_for
+from scan_cache import ScanCache
+from scan_rules import ScanRules
+
+# Version de l'état conservé dans l'environnement Sphinx
+STATE_VERSION = 3
+
+# Pages à relire lors de la construction en cours, par application Sphinx
+_outdated_docnames = weakref.WeakKeyDictionary()
+
+
+def unchanged_folders(previous_entries: dict, entries: dict) -> set[str]:
+    """
+    Détermine les dossiers dont la date de modification n'a pas changé
+    entre deux parcours (voir scan_cache.ScanCache.entries).
+
+    Args:
+        previous_entries: Entrées du parcours précédent.
+        entries: Entrées du parcours courant.
+
+    Returns:
+        Chemins relatifs des dossiers inchangés. Un dossier dont la date
+        était trop récente pour être mémorisée est considéré comme modifié.
+    """
+    unchanged = set()
+    for key, entry in entries.items():
+        previous = previous_entries.get(key)
+        if entry[0] is not None and previous is not None and previous[0] == entry[0]:
+            unchanged.add(key)
+    return unchanged
+
+
+def folder_fingerprints(root_path: str,
+        structure: FolderNode,
+        previous: dict[str, list] | None = None,
+        unchanged: set[str] = frozenset(),
+        check_files: bool = True
+        ) -> dict[str, list]:
+    """
+    Calcule l'empreinte des fichiers .m de chaque dossier documenté.
+
+    L'empreinte combine le nom, la date de modification et la taille de
+    chaque fichier .m du dossier: elle change dès qu'un fichier est
+    modifié, ajouté ou supprimé, sans relire le contenu des fichiers.
+
+    Un dossier dont la date de modification n'a pas changé contient les
+    mêmes fichiers: seuls ses fichiers .m connus sont relus avec os.stat,
+    sans relire le dossier. Une modification sur place d'un fichier ne
+    change pas la date de son dossier et reste ainsi détectée.
+
+    Args:
+        root_path: Chemin du dossier racine du code.
+        structure: Nœud racine de la structure des dossiers (issu de
+            auto_doc_matlab.find_leaf_folders).
+        previous: Empreintes de la construction précédente.
+        unchanged: Chemins relatifs des dossiers dont la date de
+            modification n'a pas changé (voir unchanged_folders).
+        check_files: Si False, l'empreinte précédente d'un dossier
+            inchangé est reprise sans relire ses fichiers (les
+            modifications sur place ne sont alors pas détectées).
+
+    Returns:
+        Dictionnaire {chemin en notation pointée: [empreinte hexadécimale,
+        noms des fichiers .m]}.
+    """
+    fingerprints = {}
+    previous = previous or {}
+
+    for relative_folder, module_path in iter_documented_folders(structure):
+        folder_path = os.path.join(root_path, relative_folder)
+        known = previous.get(module_path) if relative_folder in unchanged else None
+        if known is not None and not check_files:
+            fingerprints[module_path] = known
+            continue
+
+        m_files = None
+        if known is not None:
+            try:
+                m_files = [(name, os.stat(os.path.join(folder_path, name))) for name in known[1]]
+            except OSError:
+                m_files = None
+        if m_files is None:
+            try:
+                with os.scandir(folder_path) as entries:
+                    m_files = sorted(
+                        (entry.name, entry.stat()) for entry in entries if entry.name.endswith('.m')
+                        )
+            except OSError:
+                m_files = []
+
+        digest = hashlib.sha1()
+        for name, stat in m_files:
+            digest.update(f"{name}\0{stat.st_mtime_ns}\0{stat.st_size}\n".encode('utf-8'))
+        fingerprints[module_path] = [digest.hexdigest(), [name for name, _ in m_files]]
+
+    return fingerprints
+
+
+def changed_modules(previous: dict[str, list] | None, fingerprints: dict[str, list]) -> list[str]:
+    """
+    Liste les dossiers dont les fichiers .m ont changé depuis la
+    construction précédente.
+
+    Args:
+        previous: Empreintes de la construction précédente, ou None sans
+            état connu (tous les dossiers sont alors considérés modifiés).
+        fingerprints: Empreintes courantes (voir folder_fingerprints).
+
+    Returns:
+        Chemins en notation pointée des dossiers modifiés.
+    """
+    if previous is None:
+        return list(fingerprints)
+    return [
+        module_path for module_path, (digest, _) in fingerprints.items()
+        if previous.get(module_path, [None])[0] != digest
+        ]
+
+
+def _docname(app, path: str) -> str:
+    """
+    Convertit le chemin d'un fichier source en nom de document Sphinx.
+
+    Args:
+        app: Application Sphinx.
+        path: Chemin du fichier RST.
+
+    Returns:
+        Nom du document (chemin relatif au dossier source, sans extension,
+        avec '/' comme séparateur).
+    """
+    relative = os.path.relpath(os.path.splitext(path)[0], app.srcdir)
+    return relative.replace(os.sep, '/')
+
+
+def _module_docnames(app,
+        output_file: str,
+        modules,
+        split_pages: bool,
+        symbol_index: dict | None = None,
+        max_members: int | None = None
+        ) -> set[str]:
+    """
+    Détermine les documents Sphinx qui décrivent des dossiers MATLAB.
+
+    Args:
+        app: Application Sphinx.
+        output_file: Chemin du fichier RST généré.
+        modules: Chemins en notation pointée des dossiers.
+        split_pages: True en mode une page par dossier.
+        symbol_index: Index des symboles optionnel.
+        max_members: Découpage des dossiers volumineux (voir
+            auto_doc_matlab.member_chunks): les sous-pages d'un dossier
+            sont aussi concernées.
+
+    Returns:
+        Ensemble des noms de documents.
+    """
+    if not split_pages:
+        return {_docname(app, output_file)} if modules else set()
+
+    pages_docname = _docname(app, pages_dir_for(output_file))
+    return {
+        f"{pages_docname}/{page_name}"
+        for module_path in modules
+        for page_name in folder_page_names(module_path, symbol_index, max_members)
+        }
+
+
+def _on_builder_inited(app) -> None:
+    """
+    Génère les fichiers RST de l'arborescence MATLAB (et index.rst).
+
+    Args:
+        app: Application Sphinx.
+    """
+    from sphinx.util import logging
+
+    logger = logging.getLogger(__name__)
+    config = app.config
+    if not config.matlab_autogen_enabled:
+        return
+
+    src_dir = getattr(config, "matlab_src_dir", None)
+    if not src_dir or not os.path.isdir(src_dir):
+        logger.warning(f"matlab_src_dir introuvable ({src_dir}): documentation MATLAB non générée")
+        return
+    src_dir = os.path.abspath(src_dir)
+
+    rules = ScanRules.from_options(
+        src_dir, config.matlab_autogen_exclude, max_depth=config.matlab_autogen_max_depth,
+        follow_symlinks=config.matlab_autogen_follow_symlinks,
+        )
+
+    # État du parcours précédent, conservé dans l'environnement et ignoré si
+    # les règles du parcours ont changé
+    state = getattr(app.env, "matlab_autogen_state", None)
+    if (not state or state.get("version") != STATE_VERSION or state.get("root") != src_dir
+            or state.get("rules") != rules.digest()):
+        state = None
+
+    metrics = BuildMetrics() if config.matlab_autogen_metrics else None
+    with measure_phase(metrics, "scan"):
+        cache = ScanCache(
+            None, src_dir, partial(scan_folder, metrics=metrics, follow_symlinks=rules.follow_symlinks),
+            entries=state["scan"] if state else {}, metrics=metrics, rules=rules
+            )
+        structure = find_leaf_folders(
+            src_dir, cache=cache, workers=config.matlab_autogen_workers, metrics=metrics, rules=rules
+            )
+
+    symbol_index = None
+    if config.matlab_autogen_explicit_members:
+        with measure_phase(metrics, "symbols"):
+            symbol_index = symbol_index_for(app, structure)
+            structure = prune_structure(structure, symbol_index or {})
+
+    output_file = os.path.join(app.srcdir, config.matlab_autogen_output)
+    split_pages = config.matlab_autogen_split_pages
+    max_members = config.matlab_autogen_max_members
+    with measure_phase(metrics, "write"):
+        written, unchanged, removed = write_documentation(
+            structure, output_file, split_pages, symbol_index, metrics, max_members
+            )
+
+    # Dossiers dont les fichiers .m ont changé depuis la construction
+    # précédente: sans état connu, toutes les pages sont à relire. Seuls les
+    # dossiers dont la date de modification a changé sont relus
+    previous = state["fingerprints"] if state else None
+    unchanged = unchanged_folders(state["scan"], cache.entries) if state else set()
+    fingerprints = folder_fingerprints(
+        src_dir, structure, previous, unchanged, config.matlab_autogen_check_files
+        )
+    modules = changed_modules(previous, fingerprints)
+    _outdated_docnames[app] = _module_docnames(
+        app, output_file, modules, split_pages, symbol_index, max_members
+        )
+
+    app.env.matlab_autogen_state = {
+        "version": STATE_VERSION,
+        "root": src_dir,
+        "rules": rules.digest(),
+        "scan": cache.entries,
+        "fingerprints": fingerprints,
+        }
+
+    if config.matlab_autogen_index:
+        if write_index(Path(app.srcdir), config.matlab_autogen_index_sections):
+            written.append(os.path.join(app.srcdir, "index.rst"))
+
+    logger.info(f"Documentation MATLAB: {len(written)} fichier(s) écrit(s), {unchanged} "
+                f"inchangé(s), {len(removed)} supprimé(s), {len(modules)} dossier(s) "
+                f"modifié(s) ({cache.hits} dossier(s) lus depuis le cache)")
+
+    if metrics is not None:
+        report_file = os.path.join(app.doctreedir, config.matlab_autogen_metrics)
+        metrics.write_json(report_file)
+        logger.info(f"Mesures de la génération MATLAB ({report_file}): {metrics.summary()}")
+
+
+def _on_env_get_outdated(app, env, added, changed, removed) -> list[str]:
+    """
+    Signale à Sphinx les pages des dossiers dont un fichier .m a changé.
+
+    Args:
+        app: Application Sphinx.
+        env: Environnement Sphinx.
+        added: Documents ajoutés.
+        changed: Documents modifiés.
+        removed: Documents supprimés.
+
+    Returns:
+        Noms des documents supplémentaires à relire.
+    """
+    docnames = _outdated_docnames.pop(app, set())
+    return sorted(
+        docname for docname in docnames
+        if docname in env.found_docs and docname not in added and docname not in changed
+        )
+
+
+def setup(app) -> dict:
+    """
+    Point d'entrée de l'extension Sphinx.
+
+    Args:
+        app: Application Sphinx.
+
+    Returns:
+        Métadonnées de l'extension.
+    """
+    app.setup_extension("parse_cache")
+
+    app.add_config_value("matlab_autogen_enabled", True, "env")
+    app.add_config_value("matlab_autogen_output", "documentation_hierarchique.rst", "env")
+    app.add_config_value("matlab_autogen_split_pages", False, "env")
+    app.add_config_value("matlab_autogen_explicit_members", False, "env")
+    app.add_config_value("matlab_autogen_max_members", None, "env")
+    app.add_config_value("matlab_autogen_workers", 1, "env")
+    app.add_config_value("matlab_autogen_index", False, "env")
+    app.add_config_value("matlab_autogen_index_sections", None, "env")
+    app.add_config_value("matlab_autogen_exclude", [], "env")
+    app.add_config_value("matlab_autogen_max_depth", None, "env")
+    app.add_config_value("matlab_autogen_follow_symlinks", False, "env")
+    app.add_config_value("matlab_autogen_check_files", True, "env")
+    app.add_config_value("matlab_autogen_metrics", None, "")
+
+    app.connect("builder-inited", _on_builder_inited)
+    app.connect("env-get-outdated", _on_env_get_outdated)
+    return {
+        "version": str(STATE_VERSION),
+        "env_version": STATE_VERSION,
+        "parallel_read_safe": True,
+        "parallel_write_safe": True,
+    }
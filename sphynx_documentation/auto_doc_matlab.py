@@ -4,7 +4,30 @@ décrivant l'arborescence de dossiers contenant des fichiers MATLAB (.m).
 Il est conçu pour s'intégrer avec Sphinx et l'extension sphinxcontrib-matlabdomain.
 """
 
+import argparse
 import os
+from collections.abc import Iterator
+from contextlib import nullcontext
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from functools import partial
+
+from build_metrics import BuildMetrics
+from folder_tree import FolderNode
+from matlab_symbols import (
+    build_symbol_index,
+    iter_member_directives,
+    iter_summary_table,
+    prune_structure,
+    public_symbols,
+    read_header,
+    symbol_index_path_for,
+    write_symbol_index,
+)
+from parse_cache import ParseCache
+from rst_writer import write_lines_if_changed
+from scan_cache import ScanCache, cache_path_for
+from scan_rules import ScanRules
+
 
 def has_m_files(folder_path: str) -> bool:
         """
@@ -17,125 +40,679 @@ def has_m_files(folder_path: str) -> bool:
             True si le dossier contient au moins un fichier .m, False sinon.
             Retourne False en cas d'erreur d'accès au dossier.
         """
-        try:
-            return any(f.endswith('.m') for f in os.listdir(folder_path))
-        except:
-            return False
+        return scan_folder(folder_path)[1]
+
+
+def scan_folder(folder_path: str,
+        metrics: BuildMetrics | None = None,
+        follow_symlinks: bool = False
+        ) -> tuple[list[str], bool]:
+    """
+    Lit le contenu d'un dossier en une seule passe avec os.scandir.
+
+    Le type de chaque entrée est lu depuis le cache de DirEntry, ce qui
+    évite un appel à os.path.isdir par élément et une seconde lecture
+    du dossier pour détecter les fichiers .m.
 
+    Args:
+        folder_path: Chemin vers le dossier à analyser.
+        metrics: Mesures optionnelles (appels à os.scandir, fichiers .m).
+        follow_symlinks: Si True, les liens symboliques vers des dossiers
+            sont retournés comme sous-dossiers (voir
+            scan_rules.ScanRules.follow_symlinks pour la détection des
+            boucles); sinon ils sont ignorés sans appel système.
 
-def find_leaf_folders(root_path: str, current_path: str = "") -> dict:
+    Returns:
+        Tuple (sous-dossiers triés alphabétiquement, présence de fichiers .m).
+        Retourne ([], False) en cas d'erreur d'accès au dossier.
+    """
+    folders = []
+    m_files = 0
+
+    if metrics is not None:
+        metrics.count("listdir_calls")
+    try:
+        with os.scandir(folder_path) as entries:
+            for entry in entries:
+                if entry.name.endswith('.m'):
+                    m_files += 1
+                try:
+                    if entry.is_dir(follow_symlinks=follow_symlinks):
+                        folders.append(entry.name)
+                except OSError:
+                    continue
+    except OSError:
+        return [], False
+
+    if metrics is not None:
+        metrics.count("files_matched", m_files)
+    folders.sort()
+    return folders, m_files > 0
+
+
+def _classify_folder(name: str, has_m: bool, children: list[FolderNode]) -> FolderNode | None:
+    """
+    Construit le nœud d'un dossier de la structure hiérarchique.
+
+    Args:
+        name: Nom du dossier.
+        has_m: True si le dossier contient des fichiers .m.
+        children: Nœuds déjà calculés des sous-dossiers.
+
+    Returns:
+        Nœud du dossier (terminal, mixte ou parent), ou None si le dossier
+        ne contient rien à documenter.
+    """
+    if not has_m and not children:
+        return None
+    return FolderNode(name, has_m, children)
+
+
+def find_leaf_folders(root_path: str,
+        iterative: bool = False,
+        cache: ScanCache | None = None,
+        workers: int = 1,
+        metrics: BuildMetrics | None = None,
+        rules: ScanRules | None = None,
+        lister=None
+        ) -> FolderNode:
     """
     Parcourt l'arborescence du dossier et des sous-dossiers pour identifier 
     les fichiers MATLAB (.m) à documenter.
 
-    Construit une structure de dictionnaires imbriqués représentant
+    Construit une arborescence de FolderNode (voir folder_tree) représentant
     la hiérarchie des dossiers. Trois types de dossiers sont identifiés:
-    - "LEAF": dossier terminal contenant uniquement des fichiers .m
-    - Dict avec "__functions__": dossier mixte (fichiers .m + sous-dossiers)
-    - Dict sans "__functions__": dossier parent (sous-dossiers uniquement)
+    - dossier terminal: fichiers .m uniquement (has_m, sans enfant)
+    - dossier mixte: fichiers .m et sous-dossiers (has_m, avec enfants)
+    - dossier parent: sous-dossiers uniquement (avec enfants)
+    Les dossiers sans fichier .m dans leur sous-arborescence sont omis.
+
+    Chaque dossier n'est lu qu'une seule fois (voir scan_folder).
 
     Args:
         root_path: Chemin absolu du dossier à explorer.
-        current_path: Ne pas spécifier lors de l'appel initial.
+        iterative: Conservé pour compatibilité: le parcours utilise
+            toujours une pile explicite (voir _find_children), quelle que
+            soit la profondeur de l'arborescence.
+        cache: Cache de parcours optionnel (voir scan_cache.ScanCache).
+            Les dossiers dont la date de modification n'a pas changé
+            depuis le précédent parcours ne sont pas relus.
+        workers: Nombre de dossiers lus simultanément. Au-delà de 1, les
+            dossiers sont d'abord listés dans un pool de threads (utile sur
+            un système de fichiers réseau), puis la structure est assemblée
+            dans le même ordre que le parcours séquentiel.
+        metrics: Mesures optionnelles (dossiers visités, appels à
+            os.scandir). Avec un cache, les mesures doivent aussi être
+            transmises au cache et à sa fonction de lecture.
+        rules: Règles de parcours optionnelles (voir scan_rules.ScanRules):
+            les sous-dossiers exclus, trop profonds ou formant une boucle
+            de liens symboliques ne sont pas lus. Sans cache ni fonction de
+            lecture, leur option follow_symlinks est transmise à
+            scan_folder.
+        lister: Fonction de lecture d'un dossier remplaçant scan_folder et
+            le cache, de même signature (ex: git_tree.GitTreeScanner, qui
+            lit les dossiers dans les objets git d'une version).
 
     Returns:
-        Dictionnaire représentant la structure hiérarchique.
-        Les clés sont les noms de dossiers.
+        Nœud racine (sans nom) dont les enfants sont les dossiers de
+        premier niveau à documenter.
     """
-    structure = {}
-    
-    try:
-        items = os.listdir(root_path)
-    except:
-        return structure
-    
-    # Trier alphabétiquement les éléments 
-    folders = sorted([
-        item for item in items 
-        if os.path.isdir(os.path.join(root_path, item))
-        ])
-    
-    for folder in folders:
-        folder_path = os.path.join(root_path, folder)
-        
-        # Explorer récursivement les sous-dossiers
-        sub_structure = find_leaf_folders(
-            folder_path, 
-            os.path.join(current_path, folder) if current_path else folder
-            )
-        
-        # Vérifier si ce dossier contient des fichiers matlab (.m)
-        has_m = has_m_files(folder_path)
-        
-        if has_m and sub_structure:
-            # Dossier mixte : contient des .m ET des sous-dossiers
-            structure[folder] = {"__functions__": "LEAF", **sub_structure}
-        elif has_m:
-            # Dossier terminal : contient seulement des .m
-            structure[folder] = "LEAF"
-        elif sub_structure:
-            # Dossier parent : contient seulement des sous-dossiers
-            structure[folder] = sub_structure
-                    
-    return structure
-
-
-def generate_rst_content(structure: dict,
+    if lister is None:
+        if cache is not None:
+            lister = cache.scan_folder
+        else:
+            lister = partial(
+                scan_folder, metrics=metrics,
+                follow_symlinks=rules is not None and rules.follow_symlinks
+                )
+
+    if metrics is not None:
+        lister = metrics.wrap_lister(lister)
+
+    if rules is not None:
+        lister = rules.wrap_lister(lister, root_path)
+
+    if workers > 1:
+        listings = _list_folders_parallel(root_path, lister, workers)
+        lister = listings.__getitem__
+
+    folders, _ = lister(root_path)
+    return FolderNode("", False, _find_children(root_path, folders, lister))
+
+
+def _list_folders_parallel(root_path: str, lister, workers: int) -> dict:
+    """
+    Liste tous les dossiers de l'arborescence dans un pool de threads.
+
+    Dès qu'un dossier est lu, ses sous-dossiers sont soumis au pool: les
+    dossiers frères sont ainsi lus en parallèle, sans attendre la fin de
+    l'exploration en profondeur de leurs aînés.
+
+    Args:
+        root_path: Chemin absolu du dossier à explorer.
+        lister: Fonction de lecture d'un dossier, de même signature
+            que scan_folder.
+        workers: Nombre maximal de threads.
+
+    Returns:
+        Dictionnaire {chemin du dossier: résultat de lister}.
+    """
+    listings = {}
+
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        pending = {executor.submit(lister, root_path): root_path}
+
+        while pending:
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                folder_path = pending.pop(future)
+                listings[folder_path] = future.result()
+                for folder in listings[folder_path][0]:
+                    child_path = os.path.join(folder_path, folder)
+                    pending[executor.submit(lister, child_path)] = child_path
+
+    return listings
+
+
+def _find_children(folder_path: str, sub_folders: list[str], lister) -> list[FolderNode]:
+    """
+    Construit les nœuds des sous-dossiers d'un dossier déjà listé.
+
+    Utilise une pile explicite de cadres (chemin, sous-dossiers restants,
+    nœuds des sous-dossiers déjà traités) et construit le nœud de chaque
+    dossier une fois tous ses sous-dossiers traités (parcours post-ordre):
+    la profondeur de l'arborescence n'est pas limitée par la limite de
+    récursion.
+
+    Args:
+        folder_path: Chemin du dossier parent.
+        sub_folders: Sous-dossiers du parent, triés (issus de scan_folder).
+        lister: Fonction de lecture d'un dossier, de même signature
+            que scan_folder.
+
+    Returns:
+        Liste des nœuds des sous-dossiers à documenter.
+    """
+    children = []
+
+    # Chaque cadre: [chemin, nom, has_m, sous-dossiers, index suivant, enfants]
+    stack = [[folder_path, None, False, sub_folders, 0, children]]
+
+    while stack:
+        frame = stack[-1]
+        path, _, _, folders, index, _ = frame
+
+        if index < len(folders):
+            frame[4] = index + 1
+            child_path = os.path.join(path, folders[index])
+            child_folders, has_m = lister(child_path)
+            stack.append([child_path, folders[index], has_m, child_folders, 0, []])
+            continue
+
+        # Tous les sous-dossiers ont été traités: remonter vers le parent
+        stack.pop()
+        if stack:
+            _, name, has_m, _, _, grandchildren = frame
+            node = _classify_folder(name, has_m, grandchildren)
+            if node is not None:
+                stack[-1][5].append(node)
+
+    return children
+
+
+# Caractères de soulignement des titres RST, par niveau de profondeur
+UNDERLINE_CHARS = ['=', '-', '~', '^', '+', '*', '#']
+
+
+def iter_local_members(module_path: str, symbol_index: dict | None = None) -> Iterator[str]:
+    """
+    Produit les directives documentant les fonctions locales d'un dossier.
+
+    Sans index des symboles, une directive automodule laisse
+    sphinxcontrib-matlabdomain découvrir les membres du dossier. Avec un
+    index (voir matlab_symbols), des directives autofunction/autoclass
+    explicites sont produites pour chaque symbole public.
+
+    Args:
+        module_path: Chemin du dossier en notation pointée.
+        symbol_index: Index des symboles optionnel
+            ({chemin pointé: liste des symboles}).
+
+    Yields:
+        Lignes RST des directives.
+    """
+    if symbol_index is None:
+        yield f".. automodule:: {module_path}"
+        yield "   :members:"
+        yield ""
+    else:
+        yield from iter_member_directives(module_path, symbol_index.get(module_path, []))
+
+
+def generate_rst_content(structure: FolderNode,
         level: int = 0,
-        parent_path: str = ""
+        parent_path: str = "",
+        symbol_index: dict | None = None
         ) -> list[str]:
     """
     Génère le fichier .rst indiquant la structure des dossiers
     à documenter.
     
     Args:
-        structure: Dictionnaire de la structure des dossiers (issu de
+        structure: Nœud racine de la structure des dossiers (issu de
             find_leaf_folders).
         level: Niveau de profondeur (0 pour le dossier racine).
         parent_path: Chemin du dossier parent en notatation pointée
             suivant le format Dossier.Sous_dossier (ex: "Audit.Test")
+        symbol_index: Index des symboles optionnel (voir iter_local_members).
+
+    Returns:
+        Liste des lignes du fichier RST (voir iter_rst_lines).
     """
-    content = []
-    underline_chars = ['=', '-', '~', '^', '+', '*', '#']
-    
-    for folder_name, sub_content in structure.items():
+    return list(iter_rst_lines(structure, level, parent_path, symbol_index))
+
+
+def iter_rst_lines(structure: FolderNode,
+        level: int = 0,
+        parent_path: str = "",
+        symbol_index: dict | None = None
+        ) -> Iterator[str]:
+    """
+    Produit une à une les lignes du fichier .rst indiquant la structure
+    des dossiers à documenter.
+
+    Version génératrice de generate_rst_content: les lignes sont transmises
+    au fur et à mesure, sans construire le document complet en mémoire.
+    Les dossiers sont parcourus avec une pile explicite (préordre), sans
+    récursion.
+
+    Args:
+        structure: Nœud racine de la structure des dossiers (issu de
+            find_leaf_folders).
+        level: Niveau de profondeur (0 pour le dossier racine).
+        parent_path: Chemin du dossier parent en notatation pointée
+            suivant le format Dossier.Sous_dossier (ex: "Audit.Test")
+        symbol_index: Index des symboles optionnel (voir iter_local_members).
+
+    Yields:
+        Lignes du fichier RST, sans caractère de fin de ligne.
+    """
+    stack = [(node, level, parent_path) for node in reversed(structure.children)]
+
+    while stack:
+        node, depth, parent = stack.pop()
+        folder_name = node.name
+        underline_char = UNDERLINE_CHARS[min(depth, len(UNDERLINE_CHARS)-1)]
+
         # Construire le chemin complet pour automodule
-        if parent_path:
-            full_module_path = f"{parent_path}.{folder_name}"
+        if parent:
+            full_module_path = f"{parent}.{folder_name}"
         else:
             full_module_path = folder_name
-        
+
         # Ajouter le titre (nom du dossier) avec le soulignement approprié
-        content.append(folder_name)
-        underline_char = underline_chars[min(level, len(underline_chars)-1)]
-        content.append(underline_char * len(folder_name))
-        content.append("")
-        
-        if sub_content == "LEAF":
-            # Dossier terminal avec des fonctions .m
-            # La directive automodule est indiquée pour documenter les fonctions locales
-            content.append(f".. automodule:: {full_module_path}")
-            content.append("   :members:")
-            content.append("")
-        elif isinstance(sub_content, dict) and "__functions__" in sub_content:
-            # Dossier mixte : documenter les fonctions locales puis les sous-dossiers
-            content.append(f".. automodule:: {full_module_path}")
-            content.append("   :members:")
-            content.append("")
-            
-            # Traiter les sous-dossiers (exclure __functions__)
-            sub_dict = {k: v for k, v in sub_content.items() if k != "__functions__"}
-            if sub_dict:
-                sub_rst = generate_rst_content(sub_dict, level + 1, full_module_path)
-                content.extend(sub_rst)
-        else:
-            # Dossier parent, traiter récursivement les sous-dossiers
-            sub_rst = generate_rst_content(sub_content, level + 1, full_module_path)
-            content.extend(sub_rst)
-    
-    return content
+        yield folder_name
+        yield underline_char * len(folder_name)
+        yield ""
+
+        if node.has_m:
+            # Dossier terminal ou mixte : documenter les fonctions locales
+            yield from iter_local_members(full_module_path, symbol_index)
+
+        # Dossier mixte ou parent : les sous-dossiers suivent, dans l'ordre
+        stack.extend((child, depth + 1, full_module_path) for child in reversed(node.children))
+
+
+def pages_dir_for(output_file: str) -> str:
+    """
+    Construit le chemin du dossier des pages par dossier MATLAB.
+
+    Les pages sont regroupées dans un dossier portant le nom du fichier
+    racine (ex: source/documentation_hierarchique/ pour
+    source/documentation_hierarchique.rst).
+
+    Args:
+        output_file: Chemin du fichier RST racine.
 
-def generate_hierarchical_rst(code_folder_path: str, output_file: str = "documentation.rst") -> None:
+    Returns:
+        Chemin du dossier des pages.
+    """
+    return os.path.splitext(output_file)[0]
+
+
+def iter_index_page_lines(structure: FolderNode, pages_dirname: str, title: str) -> Iterator[str]:
+    """
+    Produit les lignes de la page racine en mode une page par dossier.
+
+    La page racine contient uniquement un titre et un toctree référençant
+    les pages des dossiers de premier niveau.
+
+    Args:
+        structure: Nœud racine de la structure des dossiers (issu de
+            find_leaf_folders).
+        pages_dirname: Nom du dossier des pages, relatif à la page racine.
+        title: Titre de la page racine.
+
+    Yields:
+        Lignes du fichier RST, sans caractère de fin de ligne.
+    """
+    yield title
+    yield UNDERLINE_CHARS[0] * len(title)
+    yield ""
+    yield ".. toctree::"
+    yield "   :maxdepth: 2"
+    yield ""
+    for node in structure.children:
+        yield f"   {pages_dirname}/{node.name}"
+    yield ""
+
+
+def member_chunks(module_path: str,
+        symbol_index: dict | None,
+        max_members: int | None
+        ) -> list[list[dict]]:
+    """
+    Répartit les symboles publics d'un dossier volumineux en pages.
+
+    Args:
+        module_path: Chemin du dossier en notation pointée.
+        symbol_index: Index des symboles optionnel (voir iter_local_members).
+        max_members: Nombre maximal de symboles documentés sur une page,
+            ou None pour ne jamais découper.
+
+    Returns:
+        Liste des symboles de chaque sous-page, dans l'ordre de l'index;
+        une liste vide si le dossier tient sur une seule page (ou sans
+        index des symboles).
+    """
+    if symbol_index is None or max_members is None:
+        return []
+    symbols = public_symbols(symbol_index.get(module_path, []), module_path)
+    if len(symbols) <= max_members:
+        return []
+    return [symbols[start:start + max_members] for start in range(0, len(symbols), max_members)]
+
+
+def part_page_name(module_path: str, number: int) -> str:
+    """
+    Nom de la sous-page d'un dossier découpé (voir member_chunks).
+
+    Args:
+        module_path: Chemin du dossier en notation pointée.
+        number: Numéro de la sous-page (à partir de 1).
+
+    Returns:
+        Nom de la page sans extension (ex: "Outils-part2").
+    """
+    return f"{module_path}-part{number}"
+
+
+def folder_page_names(module_path: str,
+        symbol_index: dict | None = None,
+        max_members: int | None = None
+        ) -> list[str]:
+    """
+    Liste les pages qui documentent un dossier en mode une page par dossier.
+
+    Args:
+        module_path: Chemin du dossier en notation pointée.
+        symbol_index: Index des symboles optionnel (voir iter_local_members).
+        max_members: Taille maximale des pages (voir member_chunks).
+
+    Returns:
+        Noms des pages sans extension: la page du dossier puis ses
+        sous-pages éventuelles.
+    """
+    chunks = member_chunks(module_path, symbol_index, max_members)
+    return [module_path] + [part_page_name(module_path, number) for number in range(1, len(chunks) + 1)]
+
+
+def iter_folder_page_lines(node: FolderNode,
+        module_path: str,
+        symbol_index: dict | None = None,
+        chunks: list[list[dict]] | None = None
+        ) -> Iterator[str]:
+    """
+    Produit les lignes de la page d'un dossier en mode une page par dossier.
+
+    La page documente les fonctions locales du dossier (automodule) puis
+    référence les pages de ses sous-dossiers dans un toctree, ce qui
+    reproduit la hiérarchie des dossiers dans la navigation Sphinx. Un
+    dossier découpé (voir member_chunks) n'a qu'un tableau récapitulatif de
+    ses symboles, et le toctree référence d'abord ses sous-pages.
+
+    Args:
+        node: Nœud du dossier (son nom est le titre de la page).
+        module_path: Chemin du dossier en notation pointée
+            (ex: "Audit.Test"), qui sert aussi de nom de page.
+        symbol_index: Index des symboles optionnel (voir iter_local_members).
+        chunks: Symboles de chaque sous-page (issu de member_chunks), ou
+            None pour documenter tous les symboles sur la page.
+
+    Yields:
+        Lignes du fichier RST, sans caractère de fin de ligne.
+    """
+    yield node.name
+    yield UNDERLINE_CHARS[0] * len(node.name)
+    yield ""
+
+    if chunks:
+        yield from iter_summary_table(module_path, symbol_index.get(module_path, []))
+    elif node.has_m:
+        yield from iter_local_members(module_path, symbol_index)
+
+    entries = [part_page_name(module_path, number) for number in range(1, len(chunks or []) + 1)]
+    entries.extend(f"{module_path}.{child.name}" for child in node.children)
+    if entries:
+        yield ".. toctree::"
+        yield "   :maxdepth: 1"
+        yield ""
+        for entry in entries:
+            yield f"   {entry}"
+        yield ""
+
+
+def iter_part_page_lines(node: FolderNode,
+        module_path: str,
+        chunks: list[list[dict]],
+        number: int
+        ) -> Iterator[str]:
+    """
+    Produit les lignes d'une sous-page d'un dossier découpé.
+
+    Args:
+        node: Nœud du dossier.
+        module_path: Chemin du dossier en notation pointée.
+        chunks: Symboles de chaque sous-page (issu de member_chunks).
+        number: Numéro de la sous-page (à partir de 1).
+
+    Yields:
+        Lignes du fichier RST, sans caractère de fin de ligne.
+    """
+    symbols = chunks[number - 1]
+    title = f"{node.name} ({number}/{len(chunks)}) : {symbols[0]['name']} - {symbols[-1]['name']}"
+    yield title
+    yield UNDERLINE_CHARS[0] * len(title)
+    yield ""
+    yield from iter_member_directives(module_path, symbols)
+
+
+def measure_phase(metrics: BuildMetrics | None, name: str):
+    """
+    Mesure une phase de la génération si des mesures sont demandées.
+
+    Args:
+        metrics: Mesures optionnelles.
+        name: Nom de la phase.
+
+    Returns:
+        Gestionnaire de contexte (sans effet si metrics vaut None).
+    """
+    if metrics is None:
+        return nullcontext()
+    return metrics.phase(name)
+
+
+def _write_lines(path: str, lines: Iterator[str], metrics: BuildMetrics | None = None) -> bool:
+    """
+    Écrit un fichier RST produit au fil de l'eau (voir write_lines_if_changed).
+
+    Args:
+        path: Chemin du fichier à écrire.
+        lines: Lignes du fichier.
+        metrics: Mesures optionnelles: le temps de production des lignes est
+            attribué à la phase "emit", et les octets et fichiers écrits
+            sont comptés.
+
+    Returns:
+        True si le fichier a été créé ou modifié, False s'il était
+        déjà à jour.
+    """
+    if metrics is None:
+        return write_lines_if_changed(path, lines)
+
+    emitted = metrics.counters["bytes_emitted"]
+    changed = write_lines_if_changed(path, metrics.timed_lines("emit", lines, len(os.linesep)))
+    if changed:
+        metrics.count("files_written")
+        metrics.count("bytes_written", metrics.counters["bytes_emitted"] - emitted)
+    else:
+        metrics.count("files_unchanged")
+    return changed
+
+
+def generate_rst_pages(structure: FolderNode,
+        output_file: str,
+        title: str = "Code MATLAB",
+        symbol_index: dict | None = None,
+        metrics: BuildMetrics | None = None,
+        max_members: int | None = None
+        ) -> tuple[list[str], int, list[str]]:
+    """
+    Génère une page RST par dossier MATLAB et une page racine avec toctree.
+
+    Chaque dossier de la structure produit une page
+    <dossier des pages>/<chemin.en.notation.pointee>.rst. Seules les pages
+    dont le contenu change sont réécrites (voir write_lines_if_changed), et
+    les pages des dossiers disparus sont supprimées: lors d'une construction
+    incrémentale, Sphinx ne relit que les pages des dossiers modifiés.
+
+    Avec un index des symboles et max_members, un dossier de plus de
+    max_members symboles publics est découpé: sa page ne contient qu'un
+    tableau récapitulatif et ses symboles sont documentés dans des
+    sous-pages <chemin>-part<n>.rst d'au plus max_members symboles, ce qui
+    borne la taille et le temps de construction de chaque page.
+
+    Args:
+        structure: Nœud racine de la structure des dossiers (issu de
+            find_leaf_folders).
+        output_file: Chemin du fichier RST racine.
+        title: Titre de la page racine.
+        symbol_index: Index des symboles optionnel (voir iter_local_members).
+        metrics: Mesures optionnelles (voir _write_lines).
+        max_members: Nombre maximal de symboles documentés sur une page
+            (voir member_chunks), ou None pour ne jamais découper.
+
+    Returns:
+        Tuple (chemins des pages écrites, nombre de pages inchangées,
+        chemins des pages supprimées).
+    """
+    pages_dir = pages_dir_for(output_file)
+    os.makedirs(pages_dir, exist_ok=True)
+
+    written = []
+    unchanged = 0
+    generated = set()
+
+    for module_path, node in structure.iter_nodes():
+        chunks = member_chunks(module_path, symbol_index, max_members)
+        pages = [(module_path, iter_folder_page_lines(node, module_path, symbol_index, chunks))]
+        pages.extend(
+            (part_page_name(module_path, number), iter_part_page_lines(node, module_path, chunks, number))
+            for number in range(1, len(chunks) + 1)
+            )
+
+        for page_name, page_lines in pages:
+            generated.add(f"{page_name}.rst")
+            page_path = os.path.join(pages_dir, f"{page_name}.rst")
+            if _write_lines(page_path, page_lines, metrics):
+                written.append(page_path)
+            else:
+                unchanged += 1
+
+    index_lines = iter_index_page_lines(structure, os.path.basename(pages_dir), title)
+    if _write_lines(output_file, index_lines, metrics):
+        written.append(output_file)
+    else:
+        unchanged += 1
+
+    # Supprimer les pages des dossiers qui n'existent plus
+    removed = []
+    with os.scandir(pages_dir) as entries:
+        for entry in entries:
+            if entry.name.endswith('.rst') and entry.name not in generated:
+                os.unlink(entry.path)
+                removed.append(entry.path)
+
+    return written, unchanged, removed
+
+
+def write_documentation(structure: FolderNode,
+        output_file: str,
+        split_pages: bool = False,
+        symbol_index: dict | None = None,
+        metrics: BuildMetrics | None = None,
+        max_members: int | None = None
+        ) -> tuple[list[str], int, list[str]]:
+    """
+    Écrit les fichiers RST de la documentation d'une structure de dossiers.
+
+    Le contenu est produit au fil de l'eau et chaque fichier existant n'est
+    remplacé que si son contenu change, pour que Sphinx ne relise pas une
+    page identique.
+
+    Args:
+        structure: Nœud racine de la structure des dossiers (issu de
+            find_leaf_folders).
+        output_file: Chemin du fichier RST de sortie (page racine en mode
+            une page par dossier).
+        split_pages: Si True, génère une page par dossier (voir
+            generate_rst_pages) au lieu d'un fichier unique.
+        symbol_index: Index des symboles optionnel (voir iter_local_members).
+        metrics: Mesures optionnelles (voir _write_lines).
+        max_members: Découpage des dossiers volumineux en mode une page par
+            dossier (voir generate_rst_pages); sans effet sur le fichier
+            unique.
+
+    Returns:
+        Tuple (chemins des fichiers écrits, nombre de fichiers inchangés,
+        chemins des fichiers supprimés).
+    """
+    if split_pages:
+        return generate_rst_pages(
+            structure, output_file, symbol_index=symbol_index, metrics=metrics,
+            max_members=max_members
+            )
+
+    lines = iter_rst_lines(structure, symbol_index=symbol_index)
+    if _write_lines(output_file, lines, metrics):
+        return [output_file], 0, []
+    return [], 1, []
+
+
+def generate_hierarchical_rst(code_folder_path: str,
+        output_file: str = "documentation.rst",
+        use_cache: bool = True,
+        workers: int = 1,
+        split_pages: bool = False,
+        explicit_members: bool = False,
+        parse_cache_dir: str | None = None,
+        verbose: bool = True,
+        metrics: BuildMetrics | None = None,
+        rules: ScanRules | None = None,
+        max_members: int | None = None,
+        iterative: bool = False
+        ) -> FolderNode | None:
     """
     Génère un fichier RST documentant la hiérarchie complète d'un projet MATLAB.
 
@@ -146,36 +723,112 @@ def generate_hierarchical_rst(code_folder_path: str, output_file: str = "documen
     Args:
         code_folder_path: Chemin vers le dossier racine du code.
         output_file: Nom du fichier RST de sortie. Par défaut "documentation.rst".
+        use_cache: Si True, utilise le cache de parcours enregistré à côté
+            du fichier de sortie afin de ne relire que les dossiers modifiés
+            depuis la génération précédente.
+        workers: Nombre de dossiers lus simultanément (voir find_leaf_folders).
+        split_pages: Si True, génère une page par dossier (voir
+            generate_rst_pages) au lieu d'un fichier unique; output_file
+            devient alors la page racine contenant le toctree.
+        explicit_members: Si True, lit l'en-tête des fichiers .m pour
+            construire un index JSON des symboles (enregistré à côté du
+            fichier de sortie) et génère des directives autofunction/autoclass
+            explicites; les dossiers sans symbole public sont omis.
+        parse_cache_dir: Dossier du cache d'analyse des fichiers .m (voir
+            parse_cache.ParseCache), partagé entre versions. Par défaut,
+            les fichiers sont analysés sans cache.
+        verbose: Si True, affiche la structure détectée.
+        metrics: Mesures optionnelles des phases "scan", "symbols",
+            "write" (qui inclut la production des lignes, "emit") et
+            des compteurs du parcours et de l'écriture.
+        rules: Règles de parcours (voir scan_rules.ScanRules). Par défaut,
+            les motifs du fichier .matlabdocignore de la racine du code
+            s'il existe.
+        max_members: Nombre de symboles publics au-delà duquel la page d'un
+            dossier est découpée en un tableau récapitulatif et des
+            sous-pages (voir generate_rst_pages). Nécessite split_pages et
+            explicit_members.
+        iterative: Transmis à find_leaf_folders. Le parcours et
+            l'écriture n'utilisent pas la récursion: la profondeur de
+            l'arborescence n'est pas limitée.
+
+    Returns:
+        Nœud racine de la structure des dossiers documentés, ou None si
+        aucun dossier n'a été trouvé.
     """
-        
+
     # Vérifier que le dossier racine du code existe
     if not os.path.exists(code_folder_path):
         print(f"Erreur: Le dossier {code_folder_path} n'existe pas")
-        return
+        return None
     
+    if rules is None:
+        rules = ScanRules.from_options(code_folder_path)
+
+    if max_members is not None and not (split_pages and explicit_members):
+        print("Découpage des dossiers ignoré: il nécessite une page par dossier "
+              "et les directives explicites")
+
     # Phase 1: Analyser la structure du dossier racine
     print("Analyse de la structure des dossiers...")
-    folder_structure = find_leaf_folders(code_folder_path)
+    with measure_phase(metrics, "scan"):
+        cache = None
+        if use_cache:
+            cache = ScanCache(
+                cache_path_for(output_file), code_folder_path,
+                partial(scan_folder, metrics=metrics, follow_symlinks=rules.follow_symlinks),
+                metrics=metrics, rules=rules
+                )
+
+        folder_structure = find_leaf_folders(
+            code_folder_path, iterative=iterative, cache=cache, workers=workers,
+            metrics=metrics, rules=rules
+            )
+
+        if cache is not None:
+            cache.save()
+    if rules.excluded or rules.cycles:
+        print(f"Règles de parcours: {rules.excluded} dossier(s) exclu(s), "
+              f"{rules.cycles} boucle(s) de liens symboliques ignorée(s)")
+    if cache is not None:
+        print(f"Cache de parcours: {cache.hits} dossier(s) réutilisé(s), "
+              f"{cache.misses} dossier(s) relu(s)")
     
-    if not folder_structure:
+    if not folder_structure.children:
         print("Aucun dossier contenant des fichiers .m trouvé")
-        return
-    
-    # Phase 2: Générer le contenu du fichier .rst indiquant les dossiers à documenter
-    rst_content = []
-    # Ajouter la structure hierarchique des dossiers à documenter
-    hierarchical_content = generate_rst_content(folder_structure)
-    rst_content.extend(hierarchical_content)
+        return None
     
-    # Phase 3: Écriture du fichier
-    with open(output_file, 'w', encoding='utf-8') as f:
-        f.write('\n'.join(rst_content))
-    
-    print(f"Fichier {output_file} généré avec succès!")
-    print("Structure détectée:")
-    print_structure(folder_structure)
+    symbol_index = None
+    if explicit_members:
+        with measure_phase(metrics, "symbols"):
+            reader = read_header
+            if parse_cache_dir is not None:
+                reader = ParseCache(parse_cache_dir).read_header
+            symbol_index = build_symbol_index(code_folder_path, folder_structure, reader)
+            write_symbol_index(symbol_index, symbol_index_path_for(output_file))
+            folder_structure = prune_structure(folder_structure, symbol_index)
+
+    # Phase 2 et 3: Générer le contenu du fichier .rst indiquant les dossiers
+    # à documenter et l'écrire au fil de l'eau
+    with measure_phase(metrics, "write"):
+        written, unchanged, removed = write_documentation(
+            folder_structure, output_file, split_pages, symbol_index, metrics, max_members
+            )
+    if split_pages:
+        print(f"Pages générées dans {pages_dir_for(output_file)}: {len(written)} écrite(s), "
+              f"{unchanged} inchangée(s), {len(removed)} supprimée(s)")
+    elif written:
+        print(f"Fichier {output_file} généré avec succès!")
+    else:
+        print(f"Fichier {output_file} inchangé.")
 
-def print_structure(structure: dict, indent: int = 0) -> None:
+    if verbose:
+        print("Structure détectée:")
+        print_structure(folder_structure)
+
+    return folder_structure
+
+def print_structure(structure: FolderNode, indent: int = 0) -> None:
     """
     Affiche la structure des dossiers de manière lisible dans la console.
 
@@ -183,25 +836,94 @@ def print_structure(structure: dict, indent: int = 0) -> None:
     l'analyse des dossiers.
 
     Args:
-        structure: Dictionnaire de la structure à afficher.
-        indent: Niveau d'indentation actuel (usage interne pour la récursion).
+        structure: Nœud dont les sous-dossiers sont à afficher.
+        indent: Niveau d'indentation des dossiers de premier niveau.
     """
-    for name, content in structure.items():
-        print("  " * indent + f"- {name}")
-        if content != "LEAF":
-            print_structure(content, indent + 1)
-        else:
-            print("  " * (indent + 1) + "(contient des fichiers .m)")
+    stack = [(node, indent) for node in reversed(structure.children)]
+    while stack:
+        node, depth = stack.pop()
+        print("  " * depth + f"- {node.name}")
+        if node.has_m:
+            print("  " * (depth + 1) + "(contient des fichiers .m)")
+        stack.extend((child, depth + 1) for child in reversed(node.children))
 
 
-# Point d'entrée pour l'execution du code
-if __name__ == "__main__":
+def main() -> None:
+    """
+    Point d'entrée en ligne de commande.
+
+    Par défaut, documente le dossier code_matlab du dépôt dans
+    source/documentation_hierarchique.rst. La génération est aussi
+    réalisée automatiquement par l'extension Sphinx auto_doc_extension.
+    """
+    base_dir = os.path.dirname(os.path.abspath(__file__))
 
-    # Chemin vers le dossier racine du code MATLAB à documenter
-    code_path = r"C:\Projets\Interne\MAIF\Documentation_Git_Versioning\documentation_sphynx\code_matlab" 
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument(
+        "code_path", nargs="?",
+        default=os.path.join(base_dir, "..", "code_matlab"),
+        help="Dossier racine du code MATLAB à documenter")
+    parser.add_argument(
+        "output_path", nargs="?",
+        default=os.path.join(base_dir, "source", "documentation_hierarchique.rst"),
+        help="Fichier RST à générer")
+    parser.add_argument("--no-cache", action="store_true", help="Ignorer le cache de parcours")
+    parser.add_argument("--workers", type=int, default=1, help="Dossiers lus simultanément")
+    parser.add_argument("--split-pages", action="store_true", help="Une page par dossier")
+    parser.add_argument("--explicit-members", action="store_true",
+                        help="Directives autofunction/autoclass explicites")
+    parser.add_argument("--max-members", type=int,
+                        help="Symboles par page au-delà desquels un dossier est découpé "
+                             "(avec --split-pages et --explicit-members)")
+    parser.add_argument("--parse-cache-dir", help="Dossier du cache d'analyse des fichiers .m")
+    parser.add_argument("--exclude", action="append", default=[],
+                        help="Motif de dossiers à exclure (format .gitignore, répétable)")
+    parser.add_argument("--ignore-file",
+                        help="Fichier de motifs (par défaut: .matlabdocignore du code)")
+    parser.add_argument("--max-depth", type=int, help="Profondeur maximale du parcours")
+    parser.add_argument("--follow-symlinks", action="store_true",
+                        help="Suivre les liens symboliques vers des dossiers")
+    parser.add_argument("--iterative", action="store_true",
+                        help="Parcours non récursif (toujours le cas, conservé pour compatibilité)")
+    parser.add_argument("--show-structure", action="store_true",
+                        help="Afficher la structure détectée")
+    parser.add_argument("--metrics", help="Rapport JSON des mesures de la génération")
+    parser.add_argument("--profile", help="Fichier des statistiques cProfile")
+    parser.add_argument("--trace-memory", action="store_true",
+                        help="Mesurer la mémoire de chaque phase (tracemalloc)")
+    args = parser.parse_args()
 
-    # Chemin vers le dossier où enregistrer le fichier RST généré
-    output_path = r"C:\Projets\Interne\MAIF\Documentation_Git_Versioning\documentation_sphynx\sphynx_documentation\source\documentation_hierarchique.rst"
+    metrics = None
+    if args.metrics or args.profile or args.trace_memory:
+        metrics = BuildMetrics(trace_memory=args.trace_memory, profile_file=args.profile)
 
     # Générer le fichier RST documentant la hiérarchie du projet MATLAB
-    generate_hierarchical_rst(code_path, output_path)
+    with metrics.profile() if metrics is not None else nullcontext():
+        generate_hierarchical_rst(
+            args.code_path,
+            args.output_path,
+            use_cache=not args.no_cache,
+            workers=args.workers,
+            split_pages=args.split_pages,
+            explicit_members=args.explicit_members,
+            parse_cache_dir=args.parse_cache_dir,
+            verbose=args.show_structure,
+            metrics=metrics,
+            rules=ScanRules.from_options(
+                args.code_path, args.exclude, args.ignore_file, args.max_depth,
+                args.follow_symlinks
+                ),
+            max_members=args.max_members,
+            iterative=args.iterative,
+            )
+
+    if metrics is not None:
+        print(f"Mesures: {metrics.summary()}")
+        if args.metrics:
+            metrics.write_json(args.metrics)
+            print(f"Rapport des mesures enregistré dans {args.metrics}")
+
+
+# Point d'entrée pour l'execution du code
+if __name__ == "__main__":
+    main()
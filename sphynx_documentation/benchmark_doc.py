@@ -0,0 +1,365 @@
+"""
+Ce script mesure les performances de la chaîne de génération de la
+documentation sur des arborescences MATLAB synthétiques.
+
+Pour chaque configuration (profondeur, nombre de sous-dossiers par
+dossier, nombre de fichiers .m par dossier, proportion de dossiers
+parents contenant aussi des fichiers .m), une arborescence code_matlab
+est créée dans un dossier temporaire, puis chaque phase est chronométrée
+et sa consommation mémoire maximale mesurée avec tracemalloc:
+- find_leaf_folders (récursif, itératif, parallèle, cache de parcours);
+- generate_rst_content et write_documentation;
+- index_writer.generate_index_content;
+- optionnellement, la construction Sphinx complète (sphinx-build).
+
+Le rapport est enregistré au format JSON afin de comparer deux versions
+du code (option --compare).
+
+Exemple:
+    python benchmark_doc.py --preset large --output rapport.json
+    python benchmark_doc.py --preset large --compare rapport.json
+"""
+
+import argparse
+import json
+import os
+import platform
+import random
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime, timezone
+from pathlib import Path
+
+from auto_doc_matlab import find_leaf_folders, generate_rst_content, scan_folder, write_documentation
+from index_writer import generate_index_content
+from scan_cache import ScanCache
+
+# Configurations prédéfinies: (profondeur, sous-dossiers, fichiers .m, proportion de parents avec .m)
+PRESETS = {
+    "small": [(2, 5, 5, 0.2)],
+    "medium": [(3, 8, 10, 0.2), (4, 5, 10, 0.5)],
+    "large": [(3, 10, 10, 0.2), (4, 10, 10, 0.2), (5, 6, 10, 0.5)],
+}
+
+# Nombre maximal de fichiers .m d'une arborescence synthétique
+MAX_FILES = 100_000
+
+# Contenu des fichiers .m synthétiques
+_FUNCTION_TEMPLATE = """function y = {name}(x)
+% {name} Fonction synthétique générée pour les mesures de performance.
+%
+%   y = {name}(x) retourne x.
+y = x;
+end
+"""
+
+
+def make_synthetic_tree(root_path: str,
+        depth: int,
+        fanout: int,
+        files_per_folder: int,
+        parent_ratio: float = 0.0,
+        max_files: int = MAX_FILES,
+        seed: int = 0
+        ) -> dict:
+    """
+    Crée une arborescence MATLAB synthétique.
+
+    Chaque dossier de profondeur inférieure à 'depth' contient 'fanout'
+    sous-dossiers; les dossiers de profondeur 'depth' (feuilles) contiennent
+    'files_per_folder' fichiers .m. Une proportion 'parent_ratio' des
+    dossiers intermédiaires contient aussi des fichiers .m (dossiers mixtes).
+    La création des fichiers s'arrête à 'max_files'.
+
+    Args:
+        root_path: Dossier racine à créer.
+        depth: Profondeur de l'arborescence (1 = feuilles directement sous la racine).
+        fanout: Nombre de sous-dossiers par dossier intermédiaire.
+        files_per_folder: Nombre de fichiers .m par dossier qui en contient.
+        parent_ratio: Proportion de dossiers intermédiaires contenant des .m.
+        max_files: Nombre maximal de fichiers .m créés.
+        seed: Graine du tirage des dossiers mixtes (mesures reproductibles).
+
+    Returns:
+        Dictionnaire {"folders": nombre de dossiers, "files": nombre de fichiers .m}.
+    """
+    rng = random.Random(seed)
+    folders = 0
+    files = 0
+
+    stack = [(root_path, 0)]
+    while stack:
+        folder_path, level = stack.pop()
+        os.mkdir(folder_path)
+        folders += 1
+
+        is_leaf = level == depth
+        if level > 0 and (is_leaf or rng.random() < parent_ratio):
+            for index in range(min(files_per_folder, max_files - files)):
+                name = f"f{folders}_{index}"
+                with open(os.path.join(folder_path, f"{name}.m"), 'w', encoding='utf-8') as f:
+                    f.write(_FUNCTION_TEMPLATE.format(name=name))
+                files += 1
+
+        if not is_leaf:
+            for index in reversed(range(fanout)):
+                stack.append((os.path.join(folder_path, f"d{level}_{index}"), level + 1))
+
+    return {"folders": folders, "files": files}
+
+
+def make_synthetic_source(source_dir: str, pages_per_section: int) -> None:
+    """
+    Crée les dossiers doc_actuarielle et doc_technique d'un dossier source
+    Sphinx synthétique, lus par index_writer.
+
+    Args:
+        source_dir: Dossier source à compléter.
+        pages_per_section: Nombre de pages RST par dossier.
+    """
+    for section in ("doc_actuarielle", "doc_technique"):
+        section_dir = os.path.join(source_dir, section)
+        os.makedirs(section_dir, exist_ok=True)
+        for index in range(pages_per_section):
+            title = f"Page {index}"
+            with open(os.path.join(section_dir, f"page_{index:04d}.rst"), 'w', encoding='utf-8') as f:
+                f.write(f"{title}\n{'=' * len(title)}\n\nPage synthétique.\n")
+
+
+def measure(function, repeat: int = 3, memory: bool = True) -> tuple:
+    """
+    Chronomètre une fonction et mesure sa consommation mémoire maximale.
+
+    La fonction est exécutée 'repeat' fois sans tracemalloc pour le temps
+    (qui fausserait la mesure), puis une fois sous tracemalloc pour la
+    mémoire.
+
+    Args:
+        function: Fonction sans argument à mesurer.
+        repeat: Nombre d'exécutions chronométrées.
+        memory: Si False, la mémoire n'est pas mesurée.
+
+    Returns:
+        Tuple (résultat de la dernière exécution, mesures), les mesures étant
+        un dictionnaire {"seconds_min", "seconds_median", "peak_bytes"}.
+    """
+    durations = []
+    result = None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = function()
+        durations.append(time.perf_counter() - started)
+
+    peak = None
+    if memory:
+        tracemalloc.start()
+        try:
+            function()
+            _, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+
+    return result, {
+        "seconds_min": min(durations),
+        "seconds_median": statistics.median(durations),
+        "peak_bytes": peak,
+        }
+
+
+def run_sphinx_build(source_dir: str, code_path: str, build_dir: str, sphinx_build: str) -> dict:
+    """
+    Construit la documentation d'une arborescence synthétique avec Sphinx.
+
+    La configuration (conf.py, modèles, fichiers statiques) est celle du
+    projet; seul 'matlab_src_dir' est redéfini. Les fichiers RST étant déjà
+    générés, la génération par auto_doc_extension est désactivée.
+
+    Args:
+        source_dir: Dossier source synthétique.
+        code_path: Dossier du code MATLAB synthétique.
+        build_dir: Dossier de sortie.
+        sphinx_build: Commande sphinx-build.
+
+    Returns:
+        Dictionnaire {"seconds", "returncode"}; la mémoire du processus
+        Sphinx n'est pas mesurée par tracemalloc.
+    """
+    conf_dir = os.path.join(os.path.dirname(os.path.abspath(__file__)), "source")
+    for name in ("_static", "_templates"):
+        if os.path.isdir(os.path.join(conf_dir, name)):
+            shutil.copytree(os.path.join(conf_dir, name), os.path.join(source_dir, name),
+                            dirs_exist_ok=True)
+
+    command = [
+        sphinx_build, "-q", "-b", "html", "-c", conf_dir, source_dir, build_dir,
+        "-D", f"matlab_src_dir={code_path}",
+        "-D", "matlab_autogen_enabled=0",
+        ]
+    started = time.perf_counter()
+    returncode = subprocess.run(command, stdout=subprocess.DEVNULL).returncode
+    return {"seconds": time.perf_counter() - started, "returncode": returncode}
+
+
+def benchmark_tree(params: dict, repeat: int = 3, memory: bool = True,
+        sphinx_build: str | None = None, workers: int = 8) -> dict:
+    """
+    Mesure chaque phase de la génération sur une arborescence synthétique.
+
+    Args:
+        params: Paramètres de make_synthetic_tree ("depth", "fanout",
+            "files_per_folder", "parent_ratio").
+        repeat: Nombre d'exécutions chronométrées par phase.
+        memory: Si False, la mémoire n'est pas mesurée.
+        sphinx_build: Commande sphinx-build; None pour ne pas construire.
+        workers: Nombre de dossiers lus simultanément pour la phase parallèle.
+
+    Returns:
+        Dictionnaire {"params", "tree", "phases"} du rapport.
+    """
+    with tempfile.TemporaryDirectory(prefix="benchmark_doc_") as tmp_dir:
+        code_path = os.path.join(tmp_dir, "code_matlab")
+        source_dir = os.path.join(tmp_dir, "source")
+        tree = make_synthetic_tree(code_path, **params)
+        make_synthetic_source(source_dir, pages_per_section=max(1, tree["folders"] // 100))
+
+        phases = {}
+        structure, phases["find_leaf_folders"] = measure(
+            lambda: find_leaf_folders(code_path), repeat, memory)
+        _, phases["find_leaf_folders_iterative"] = measure(
+            lambda: find_leaf_folders(code_path, iterative=True), repeat, memory)
+        _, phases["find_leaf_folders_parallel"] = measure(
+            lambda: find_leaf_folders(code_path, workers=workers), repeat, memory)
+
+        # Cache de parcours déjà rempli: seules les dates des dossiers sont relues
+        warm_cache = ScanCache(None, code_path, scan_folder)
+        find_leaf_folders(code_path, cache=warm_cache)
+        _, phases["find_leaf_folders_cached"] = measure(
+            lambda: find_leaf_folders(
+                code_path, cache=ScanCache(None, code_path, scan_folder, entries=warm_cache.entries)
+                ),
+            repeat, memory)
+
+        _, phases["generate_rst_content"] = measure(
+            lambda: generate_rst_content(structure), repeat, memory)
+
+        output_file = os.path.join(source_dir, "documentation_hierarchique.rst")
+        _, phases["write_documentation"] = measure(
+            lambda: write_documentation(structure, output_file), repeat, memory)
+
+        index_content, phases["generate_index_content"] = measure(
+            lambda: generate_index_content(Path(source_dir)), repeat, memory)
+
+        if sphinx_build:
+            with open(os.path.join(source_dir, "index.rst"), 'w', encoding='utf-8') as f:
+                f.write(index_content)
+                f.write("\n.. toctree::\n\n   documentation_hierarchique\n")
+            phases["sphinx_build"] = run_sphinx_build(
+                source_dir, code_path, os.path.join(tmp_dir, "build"), sphinx_build
+                )
+
+    return {"params": params, "tree": tree, "phases": phases}
+
+
+def compare_reports(previous: dict, current: dict) -> None:
+    """
+    Affiche l'évolution des temps entre deux rapports.
+
+    Les configurations sont associées par leurs paramètres; le rapport
+    affiche, pour chaque phase, le temps médian précédent, le temps médian
+    actuel et leur rapport.
+
+    Args:
+        previous: Rapport de référence.
+        current: Rapport à comparer.
+    """
+    previous_runs = {json.dumps(run["params"], sort_keys=True): run for run in previous["runs"]}
+
+    for run in current["runs"]:
+        reference = previous_runs.get(json.dumps(run["params"], sort_keys=True))
+        if reference is None:
+            continue
+        print(f"{run['params']} ({run['tree']['files']} fichiers .m)")
+        for phase, values in run["phases"].items():
+            old_values = reference["phases"].get(phase)
+            if old_values is None:
+                continue
+            old = old_values.get("seconds_median", old_values.get("seconds"))
+            new = values.get("seconds_median", values.get("seconds"))
+            ratio = new / old if old else float("inf")
+            print(f"  {phase:<30} {old:9.4f} s -> {new:9.4f} s  (x{ratio:.2f})")
+
+
+def main() -> None:
+    """
+    Point d'entrée en ligne de commande.
+    """
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--preset", choices=sorted(PRESETS),
+                        help="Configurations prédéfinies (small, medium, large)")
+    parser.add_argument("--depth", type=int, default=3, help="Profondeur de l'arborescence")
+    parser.add_argument("--fanout", type=int, default=5, help="Sous-dossiers par dossier")
+    parser.add_argument("--files", type=int, default=10, help="Fichiers .m par dossier")
+    parser.add_argument("--parent-ratio", type=float, default=0.2,
+                        help="Proportion de dossiers parents contenant des .m")
+    parser.add_argument("--max-files", type=int, default=MAX_FILES,
+                        help="Nombre maximal de fichiers .m")
+    parser.add_argument("--repeat", type=int, default=3, help="Exécutions chronométrées par phase")
+    parser.add_argument("--no-memory", action="store_true", help="Ne pas mesurer la mémoire")
+    parser.add_argument("--workers", type=int, default=8,
+                        help="Dossiers lus simultanément (phase parallèle)")
+    parser.add_argument("--sphinx", action="store_true", help="Mesurer aussi sphinx-build")
+    parser.add_argument("--sphinx-build", default="sphinx-build", help="Commande sphinx-build")
+    parser.add_argument("--output", default="benchmark_doc.json", help="Rapport JSON à écrire")
+    parser.add_argument("--compare", help="Rapport JSON de référence à comparer")
+    args = parser.parse_args()
+
+    if args.preset:
+        configurations = PRESETS[args.preset]
+    else:
+        configurations = [(args.depth, args.fanout, args.files, args.parent_ratio)]
+
+    report = {
+        "created": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "python": sys.version.split()[0],
+        "platform": platform.platform(),
+        "runs": [],
+        }
+    for depth, fanout, files_per_folder, parent_ratio in configurations:
+        params = {
+            "depth": depth,
+            "fanout": fanout,
+            "files_per_folder": files_per_folder,
+            "parent_ratio": parent_ratio,
+            "max_files": args.max_files,
+            }
+        run = benchmark_tree(
+            params,
+            repeat=args.repeat,
+            memory=not args.no_memory,
+            sphinx_build=args.sphinx_build if args.sphinx else None,
+            workers=args.workers,
+            )
+        report["runs"].append(run)
+        print(f"{run['tree']['folders']} dossiers, {run['tree']['files']} fichiers .m:")
+        for phase, values in run["phases"].items():
+            seconds = values.get("seconds_median", values.get("seconds"))
+            peak = values.get("peak_bytes")
+            memory_text = f", pic mémoire {peak / 1024 ** 2:.1f} Mio" if peak is not None else ""
+            print(f"  {phase:<30} {seconds:9.4f} s{memory_text}")
+
+    with open(args.output, 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=2)
+    print(f"Rapport enregistré dans {args.output}")
+
+    if args.compare:
+        with open(args.compare, 'r', encoding='utf-8') as f:
+            compare_reports(json.load(f), report)
+
+
+if __name__ == "__main__":
+    main()
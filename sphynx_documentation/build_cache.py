@@ -0,0 +1,311 @@
+"""
+Ce module conserve l'environnement Sphinx (environment.pickle et fichiers
+.doctree) d'une construction à l'autre, dans un dossier de cache qu'une
+étape de cache de l'intégration continue peut sauvegarder et restaurer.
+
+Les entrées sont adressées par une clé calculée à partir des versions de
+Python, de Sphinx et des extensions chargées par conf.py, de la
+configuration locale (conf.py, modèles, fichiers statiques, extensions
+locales) et du constructeur: un environnement n'est jamais réutilisé avec
+une autre configuration. Chaque entrée enregistre aussi l'empreinte et la
+date de modification des fichiers sources lus par Sphinx. A la
+restauration, les fichiers dont le contenu est inchangé retrouvent leur
+date enregistrée et les autres reçoivent la date courante: après un
+checkout ou une extraction qui a modifié toutes les dates, Sphinx ne relit
+que les documents réellement modifiés.
+
+Exemple (autour d'une construction 'make html'):
+    python build_cache.py restore --doctree-dir build/doctrees
+    make html
+    python build_cache.py save --doctree-dir build/doctrees
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import runpy
+import shutil
+import sys
+import time
+from importlib import metadata
+
+from rst_writer import file_digest
+
+# Version du format des entrées du cache
+CACHE_VERSION = 1
+
+# Nombre de clés conservées dans le cache (les plus récemment utilisées)
+KEEP_KEYS = 3
+
+# Nom du fichier des empreintes des sources, dans chaque entrée
+SOURCES_NAME = "sources.json"
+
+
+def load_config(conf_dir: str) -> dict:
+    """
+    Lit les options de conf.py.
+
+    Args:
+        conf_dir: Dossier contenant conf.py.
+
+    Returns:
+        Variables définies par conf.py.
+    """
+    return runpy.run_path(os.path.join(conf_dir, "conf.py"))
+
+
+def local_digest(conf_dir: str) -> str:
+    """
+    Calcule l'empreinte de la configuration locale utilisée pour toutes les versions.
+
+    L'empreinte couvre les fichiers du dossier de configuration (conf.py,
+    _templates, _static) et les modules Python et scripts JavaScript du
+    dossier parent (extensions locales chargées par conf.py).
+
+    Args:
+        conf_dir: Dossier contenant conf.py.
+
+    Returns:
+        Empreinte SHA-256 hexadécimale.
+    """
+    paths = [os.path.join(conf_dir, "conf.py")]
+    for name in ("_templates", "_static"):
+        for folder_path, folders, files in os.walk(os.path.join(conf_dir, name)):
+            folders.sort()
+            paths.extend(os.path.join(folder_path, filename) for filename in sorted(files))
+
+    tools_dir = os.path.dirname(os.path.abspath(conf_dir))
+    with os.scandir(tools_dir) as entries:
+        paths.extend(sorted(entry.path for entry in entries if entry.name.endswith(('.py', '.js'))))
+
+    digest = hashlib.sha256()
+    for path in paths:
+        digest.update(os.path.relpath(path, tools_dir).replace(os.sep, '/').encode('utf-8'))
+        digest.update(b'\0')
+        with open(path, 'rb') as f:
+            digest.update(hashlib.sha256(f.read()).digest())
+    return digest.hexdigest()
+
+
+def package_versions(extensions) -> dict[str, str]:
+    """
+    Détermine les versions installées de Sphinx et des extensions.
+
+    Les extensions locales (sans distribution installée) sont couvertes
+    par local_digest.
+
+    Args:
+        extensions: Modules d'extension de conf.py (ex: 'sphinxcontrib.matlab').
+
+    Returns:
+        Dictionnaire {nom de la distribution: version}.
+    """
+    distributions = metadata.packages_distributions()
+    versions = {}
+    for module in ["sphinx", *extensions]:
+        for name in distributions.get(module.split('.')[0], []):
+            try:
+                versions[name] = metadata.version(name)
+            except metadata.PackageNotFoundError:
+                continue
+    return versions
+
+
+def cache_key(conf_dir: str, builder: str = "html", config: dict | None = None) -> str:
+    """
+    Calcule la clé des entrées du cache pour une configuration.
+
+    Args:
+        conf_dir: Dossier contenant conf.py.
+        builder: Constructeur Sphinx.
+        config: Options de conf.py déjà lues (voir load_config), ou None.
+
+    Returns:
+        Empreinte SHA-256 hexadécimale.
+    """
+    if config is None:
+        config = load_config(conf_dir)
+    parts = {
+        "cache_version": CACHE_VERSION,
+        "python": f"{sys.version_info.major}.{sys.version_info.minor}",
+        "packages": package_versions(config.get("extensions", [])),
+        "local": local_digest(conf_dir),
+        "builder": builder,
+    }
+    return hashlib.sha256(json.dumps(parts, sort_keys=True).encode('utf-8')).hexdigest()
+
+
+def snapshot_sources(roots: dict[str, str]) -> dict[str, dict[str, list]]:
+    """
+    Relève l'empreinte et la date de modification des fichiers sources.
+
+    Args:
+        roots: Dictionnaire {nom: dossier} des arborescences lues par Sphinx
+            (dossier source, code MATLAB).
+
+    Returns:
+        Dictionnaire {nom: {chemin relatif (séparateur '/'): [empreinte,
+        date de modification en nanosecondes]}}.
+    """
+    snapshot = {}
+    for label, root in roots.items():
+        files = snapshot[label] = {}
+        for folder_path, folders, filenames in os.walk(root):
+            folders[:] = [name for name in folders if not name.startswith('.')]
+            for filename in filenames:
+                path = os.path.join(folder_path, filename)
+                digest = file_digest(path)
+                if digest is None:
+                    continue
+                relative = os.path.relpath(path, root).replace(os.sep, '/')
+                files[relative] = [digest, os.stat(path).st_mtime_ns]
+    return snapshot
+
+
+class BuildCache:
+    """
+    Entrée du cache d'environnement Sphinx d'une construction.
+
+    Attributes:
+        entry_dir: Dossier de l'entrée (<cache_dir>/<clé>/<nom>).
+        doctree_dir: Dossier des doctrees utilisé par Sphinx (option -d).
+        roots: Dictionnaire {nom: dossier} des arborescences sources.
+        unchanged: Nombre de fichiers inchangés lors de la restauration.
+        changed: Nombre de fichiers modifiés ou ajoutés depuis l'entrée.
+    """
+
+    def __init__(self, cache_dir: str, key: str, name: str, doctree_dir: str, roots: dict[str, str]) -> None:
+        """
+        Args:
+            cache_dir: Dossier du cache, sauvegardé par l'intégration continue.
+            key: Clé de la configuration (voir cache_key).
+            name: Nom de la construction (ex: nom de la version).
+            doctree_dir: Dossier des doctrees utilisé par Sphinx.
+            roots: Arborescences sources, avec des chemins identiques d'une
+                construction à l'autre (Sphinx reconstruit tout si le
+                dossier source change).
+        """
+        self.cache_dir = cache_dir
+        self.key_dir = os.path.join(cache_dir, key)
+        self.entry_dir = os.path.join(self.key_dir, name)
+        self.doctree_dir = doctree_dir
+        self.roots = roots
+        self.unchanged = 0
+        self.changed = 0
+
+    def restore(self) -> bool:
+        """
+        Restaure les doctrees et les dates des sources inchangées.
+
+        Returns:
+            True si une entrée a été restaurée, False si le cache ne contient
+            pas d'entrée pour cette clé et ce nom.
+        """
+        try:
+            with open(os.path.join(self.entry_dir, SOURCES_NAME), 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return False
+        if not isinstance(data, dict) or data.get("version") != CACHE_VERSION:
+            return False
+
+        shutil.rmtree(self.doctree_dir, ignore_errors=True)
+        shutil.copytree(os.path.join(self.entry_dir, "doctrees"), self.doctree_dir)
+
+        now = time.time_ns()
+        recorded = data.get("sources", {})
+        for label, root in self.roots.items():
+            files = recorded.get(label, {})
+            for folder_path, folders, filenames in os.walk(root):
+                folders[:] = [name for name in folders if not name.startswith('.')]
+                for filename in filenames:
+                    path = os.path.join(folder_path, filename)
+                    relative = os.path.relpath(path, root).replace(os.sep, '/')
+                    previous = files.get(relative)
+                    if previous is not None and previous[0] == file_digest(path):
+                        os.utime(path, ns=(previous[1], previous[1]))
+                        self.unchanged += 1
+                    else:
+                        os.utime(path, ns=(now, now))
+                        self.changed += 1
+
+        os.utime(self.key_dir)
+        return True
+
+    def save(self) -> None:
+        """
+        Enregistre les doctrees et l'empreinte des sources après une
+        construction réussie, puis supprime les clés les plus anciennes.
+        """
+        tmp_dir = f"{self.entry_dir}.tmp{os.getpid()}"
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+        shutil.copytree(self.doctree_dir, os.path.join(tmp_dir, "doctrees"))
+        with open(os.path.join(tmp_dir, SOURCES_NAME), 'w', encoding='utf-8') as f:
+            json.dump({"version": CACHE_VERSION, "sources": snapshot_sources(self.roots)}, f)
+
+        shutil.rmtree(self.entry_dir, ignore_errors=True)
+        os.replace(tmp_dir, self.entry_dir)
+        os.utime(self.key_dir)
+        prune_cache(self.cache_dir)
+
+
+def prune_cache(cache_dir: str, keep: int = KEEP_KEYS) -> list[str]:
+    """
+    Supprime les clés du cache les moins récemment utilisées.
+
+    Args:
+        cache_dir: Dossier du cache.
+        keep: Nombre de clés conservées.
+
+    Returns:
+        Clés supprimées.
+    """
+    try:
+        with os.scandir(cache_dir) as entries:
+            keys = [entry for entry in entries if entry.is_dir()]
+    except OSError:
+        return []
+    keys.sort(key=lambda entry: entry.stat().st_mtime, reverse=True)
+    for entry in keys[keep:]:
+        shutil.rmtree(entry.path, ignore_errors=True)
+    return [entry.name for entry in keys[keep:]]
+
+
+def main() -> None:
+    """
+    Point d'entrée en ligne de commande.
+    """
+    base_dir = os.path.dirname(os.path.abspath(__file__))
+
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("action", choices=["restore", "save"], help="Opération sur le cache")
+    parser.add_argument("--source-dir", default=os.path.join(base_dir, "source"),
+                        help="Dossier source Sphinx (contenant conf.py)")
+    parser.add_argument("--doctree-dir", default=os.path.join(base_dir, "build", "doctrees"),
+                        help="Dossier des doctrees de Sphinx")
+    parser.add_argument("--cache-dir", default=os.path.join(base_dir, ".build_cache", "entries"),
+                        help="Dossier du cache")
+    parser.add_argument("--name", default="default", help="Nom de la construction")
+    parser.add_argument("--builder", default="html", help="Constructeur Sphinx")
+    args = parser.parse_args()
+
+    config = load_config(args.source_dir)
+    roots = {"source": os.path.abspath(args.source_dir)}
+    if config.get("matlab_src_dir"):
+        roots["code"] = os.path.abspath(config["matlab_src_dir"])
+    key = cache_key(args.source_dir, args.builder, config)
+    cache = BuildCache(args.cache_dir, key, args.name, args.doctree_dir, roots)
+
+    if args.action == "save":
+        cache.save()
+        print(f"Environnement enregistré (clé {key[:12]})")
+    elif cache.restore():
+        print(f"Environnement restauré (clé {key[:12]}): {cache.unchanged} fichier(s) "
+              f"inchangé(s), {cache.changed} modifié(s)")
+    else:
+        print(f"Aucun environnement en cache pour la clé {key[:12]}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,242 @@
+"""
+Ce module mesure les phases de la génération de la documentation MATLAB.
+
+Un objet BuildMetrics est transmis aux fonctions de auto_doc_matlab
+(parcours, production et écriture des fichiers RST). Il collecte la durée
+de chaque phase et des compteurs (dossiers visités, appels à os.scandir
+et os.stat, fichiers .m trouvés, octets écrits), et peut en option
+profiler la génération avec cProfile et mesurer la mémoire maximale de
+chaque phase avec tracemalloc. Le rapport est enregistré au format JSON.
+"""
+
+import cProfile
+import io
+import json
+import pstats
+import threading
+import time
+import tracemalloc
+from collections.abc import Iterable, Iterator
+from contextlib import contextmanager
+
+# Version du format du rapport JSON
+REPORT_VERSION = 1
+
+# Nombre de fonctions retenues dans le rapport lorsque cProfile est activé
+PROFILE_TOP = 25
+
+
+class BuildMetrics:
+    """
+    Mesures d'une génération de la documentation.
+
+    Les compteurs peuvent être incrémentés depuis plusieurs threads
+    (parcours parallèle des dossiers).
+
+    Attributes:
+        phases: Dictionnaire {nom de phase: mesures}, les mesures étant
+            {"seconds"} et, avec tracemalloc, {"peak_bytes"}.
+        counters: Dictionnaire {nom du compteur: valeur}.
+        trace_memory: True si la mémoire est mesurée avec tracemalloc.
+        profile_file: Fichier de statistiques cProfile, ou None.
+    """
+
+    def __init__(self, trace_memory: bool = False, profile_file: str | None = None) -> None:
+        """
+        Args:
+            trace_memory: Si True, mesure la mémoire maximale de chaque phase
+                avec tracemalloc (ralentit la génération).
+            profile_file: Si défini, profile la génération avec cProfile
+                (voir profile) et y enregistre les statistiques.
+        """
+        self.phases = {}
+        self.counters = {
+            "dirs_visited": 0,
+            "listdir_calls": 0,
+            "stat_calls": 0,
+            "files_matched": 0,
+            "files_written": 0,
+            "files_unchanged": 0,
+            "rst_lines": 0,
+            "bytes_emitted": 0,
+            "bytes_written": 0,
+        }
+        self.trace_memory = trace_memory
+        self.profile_file = profile_file
+        self._profile_top = None
+        self._lock = threading.Lock()
+
+    def count(self, name: str, value: int = 1) -> None:
+        """
+        Incrémente un compteur.
+
+        Args:
+            name: Nom du compteur.
+            value: Valeur à ajouter.
+        """
+        with self._lock:
+            self.counters[name] = self.counters.get(name, 0) + value
+
+    def add_time(self, name: str, seconds: float) -> None:
+        """
+        Ajoute une durée à une phase.
+
+        Args:
+            name: Nom de la phase.
+            seconds: Durée en secondes.
+        """
+        with self._lock:
+            values = self.phases.setdefault(name, {"seconds": 0.0})
+            values["seconds"] += seconds
+
+    @contextmanager
+    def phase(self, name: str) -> Iterator[None]:
+        """
+        Mesure la durée (et la mémoire maximale) d'un bloc de code.
+
+        Args:
+            name: Nom de la phase. Plusieurs blocs de même nom cumulent
+                leur durée.
+        """
+        if self.trace_memory:
+            if tracemalloc.is_tracing():
+                tracemalloc.reset_peak()
+            else:
+                tracemalloc.start()
+
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add_time(name, time.perf_counter() - started)
+            if self.trace_memory:
+                _, peak = tracemalloc.get_traced_memory()
+                values = self.phases[name]
+                values["peak_bytes"] = max(values.get("peak_bytes", 0), peak)
+
+    def timed_lines(self, name: str, lines: Iterable[str], separator_size: int = 1) -> Iterator[str]:
+        """
+        Mesure la production des lignes d'un fichier RST.
+
+        Le temps passé dans le générateur est attribué à la phase 'name',
+        distincte de l'écriture des lignes sur le disque.
+
+        Args:
+            name: Nom de la phase (ex: "emit").
+            lines: Lignes produites (ex: auto_doc_matlab.iter_rst_lines).
+            separator_size: Taille en octets du séparateur de fin de ligne.
+
+        Yields:
+            Les lignes de 'lines', inchangées.
+        """
+        iterator = iter(lines)
+        seconds = 0.0
+        count = 0
+        size = 0
+        try:
+            while True:
+                started = time.perf_counter()
+                try:
+                    line = next(iterator)
+                except StopIteration:
+                    break
+                finally:
+                    seconds += time.perf_counter() - started
+                count += 1
+                size += len(line.encode('utf-8')) + separator_size
+                yield line
+        finally:
+            self.add_time(name, seconds)
+            self.count("rst_lines", count)
+            self.count("bytes_emitted", max(size - separator_size, 0))
+
+    def wrap_lister(self, lister):
+        """
+        Compte les dossiers visités par une fonction de lecture de dossier.
+
+        Args:
+            lister: Fonction de lecture d'un dossier, de même signature que
+                auto_doc_matlab.scan_folder.
+
+        Returns:
+            Fonction de même signature incrémentant 'dirs_visited'.
+        """
+        def counting_lister(folder_path: str) -> tuple[list[str], bool]:
+            self.count("dirs_visited")
+            return lister(folder_path)
+
+        return counting_lister
+
+    @contextmanager
+    def profile(self) -> Iterator[None]:
+        """
+        Profile un bloc de code avec cProfile si profile_file est défini.
+
+        Les statistiques sont enregistrées dans profile_file (lisible avec
+        pstats ou snakeviz) et les fonctions les plus coûteuses (temps
+        cumulé) sont ajoutées au rapport.
+        """
+        if self.profile_file is None:
+            yield
+            return
+
+        profiler = cProfile.Profile()
+        profiler.enable()
+        try:
+            yield
+        finally:
+            profiler.disable()
+            profiler.dump_stats(self.profile_file)
+
+            stream = io.StringIO()
+            stats = pstats.Stats(profiler, stream=stream)
+            stats.sort_stats("cumulative")
+            self._profile_top = [
+                {
+                    "function": f"{filename}:{line}({name})",
+                    "calls": calls,
+                    "total_seconds": total,
+                    "cumulative_seconds": cumulative,
+                }
+                for (filename, line, name), (_, calls, total, cumulative, _)
+                in sorted(stats.stats.items(), key=lambda item: item[1][3], reverse=True)[:PROFILE_TOP]
+                ]
+
+    def to_dict(self) -> dict:
+        """
+        Construit le rapport des mesures.
+
+        Returns:
+            Dictionnaire sérialisable en JSON.
+        """
+        report = {
+            "version": REPORT_VERSION,
+            "phases": self.phases,
+            "counters": self.counters,
+        }
+        if self._profile_top is not None:
+            report["profile"] = {"file": self.profile_file, "top": self._profile_top}
+        return report
+
+    def write_json(self, report_file: str) -> None:
+        """
+        Enregistre le rapport au format JSON.
+
+        Args:
+            report_file: Chemin du fichier à écrire.
+        """
+        with open(report_file, 'w', encoding='utf-8') as f:
+            json.dump(self.to_dict(), f, indent=2)
+
+    def summary(self) -> str:
+        """
+        Résume les mesures sur une ligne.
+
+        Returns:
+            Durée de chaque phase et principaux compteurs.
+        """
+        phases = ", ".join(f"{name} {values['seconds']:.3f} s" for name, values in self.phases.items())
+        counters = self.counters
+        return (f"{phases} | {counters['dirs_visited']} dossier(s), "
+                f"{counters['files_matched']} fichier(s) .m, "
+                f"{counters['bytes_written']} octet(s) écrit(s)")
@@ -0,0 +1,451 @@
+"""
+Ce script construit la documentation de toutes les versions (tags et
+branches) retenues par la configuration de sphinx-multiversion, en ne
+reconstruisant que les versions qui ont changé.
+
+Les versions sont sélectionnées comme le fait sphinx-multiversion
+(smv_tag_whitelist, smv_branch_whitelist, smv_remote_whitelist et
+smv_released_pattern de conf.py). Pour chaque version, une empreinte est
+calculée à partir de l'arbre git de la version, de la configuration locale
+(conf.py, modèles, fichiers statiques, extensions locales) et des versions
+installées de Sphinx et des extensions. Une version dont
+l'empreinte est identique à celle de la construction précédente
+(manifeste build/.build_versions.json) n'est pas reconstruite; les autres
+sont construites en parallèle, chacune par un processus 'python -m sphinx'
+distinct (l'état global de Sphinx et des extensions, dont sys.path et les
+modules MATLAB découverts, n'est jamais partagé entre deux versions), dans
+la même arborescence build/<version>/ que sphinx-multiversion. L'environnement
+Sphinx de chaque version est conservé dans .build_cache/entries (voir
+build_cache): une version modifiée est reconstruite de façon incrémentale.
+Les fichiers statiques de toutes les versions sont ensuite regroupés dans
+un dossier commun build/_assets (voir static_assets).
+
+La liste des versions n'est pas intégrée aux pages: elle est écrite dans
+build/versions.json, lu par le sélecteur de version (modèle versions.html).
+Publier un nouveau tag ne demande donc de construire que ce tag.
+
+Exemple:
+    python build_versions.py --workers 4
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import re
+import shutil
+import subprocess
+import sys
+import tarfile
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from io import BytesIO
+
+from build_cache import BuildCache, cache_key, load_config, local_digest, package_versions
+from git_tree import run_git
+from rst_writer import write_text_if_changed
+from static_assets import optimize_site
+
+# Version du format du manifeste
+MANIFEST_VERSION = 1
+
+# Nom du manifeste des versions construites, dans le dossier de sortie
+MANIFEST_NAME = ".build_versions.json"
+
+# Liste des versions lue par le sélecteur de version, à la racine du site
+VERSIONS_INDEX_NAME = "versions.json"
+
+
+def list_versions(repo_path: str, config: dict) -> list[dict]:
+    """
+    Sélectionne les versions à construire selon les options de sphinx-multiversion.
+
+    Args:
+        repo_path: Chemin du dépôt git.
+        config: Options de conf.py (voir load_config).
+
+    Returns:
+        Liste de dictionnaires {"name", "refname", "commit", "source",
+        "creatordate", "is_released"}, triée par nom. La date est au format
+        de 'git for-each-ref' (%Y-%m-%d %H:%M:%S %z), celui qu'attend
+        l'extension sphinx_multiversion.
+    """
+    tag_whitelist = re.compile(config.get("smv_tag_whitelist", r"^.*$"))
+    branch_whitelist = re.compile(config.get("smv_branch_whitelist", r"^.*$"))
+    remote_whitelist = config.get("smv_remote_whitelist")
+    released_pattern = re.compile(config.get("smv_released_pattern", r"^tags/.*$"))
+
+    output = run_git(
+        repo_path, "for-each-ref",
+        # Commit pointé (les tags annotés sont déréférencés)
+        "--format=%(if)%(*objectname)%(then)%(*objectname)%(else)%(objectname)%(end)"
+        "\t%(refname)\t%(creatordate:iso)",
+        "refs/tags", "refs/heads", "refs/remotes",
+        ).decode('utf-8')
+
+    versions = {}
+    for line in output.splitlines():
+        commit, refname, creatordate = line.split('\t')
+        refname = refname[len("refs/"):]
+        source, name = refname.split('/', 1)
+
+        if source == "tags":
+            if not tag_whitelist.match(name):
+                continue
+        elif source == "heads":
+            if not branch_whitelist.match(name):
+                continue
+        else:
+            remote, _, name = name.partition('/')
+            if (not remote_whitelist or not re.match(remote_whitelist, remote)
+                    or name == "HEAD" or not branch_whitelist.match(name)):
+                continue
+
+        # Une branche locale l'emporte sur la branche distante de même nom
+        if name in versions and versions[name]["source"] != "remotes":
+            continue
+        versions[name] = {
+            "name": name,
+            "refname": refname,
+            "commit": commit,
+            "source": source,
+            "creatordate": creatordate,
+            "is_released": bool(released_pattern.match(refname)),
+        }
+
+    return [versions[name] for name in sorted(versions)]
+
+
+def version_digest(repo_path: str, version: dict, local: str, packages: dict[str, str] | None = None) -> str:
+    """
+    Calcule l'empreinte d'une version.
+
+    Args:
+        repo_path: Chemin du dépôt git.
+        version: Version (voir list_versions).
+        local: Empreinte de la configuration locale (voir local_digest).
+        packages: Versions installées de Sphinx et des extensions (voir
+            build_cache.package_versions): une mise à jour reconstruit
+            toutes les versions.
+
+    Returns:
+        Empreinte SHA-256 hexadécimale.
+    """
+    tree = run_git(repo_path, "rev-parse", f"{version['commit']}^{{tree}}").decode().strip()
+    installed = json.dumps(packages or {}, sort_keys=True)
+    digest = hashlib.sha256()
+    for part in (tree, local, installed, version["name"]):
+        digest.update(part.encode('utf-8'))
+        digest.update(b'\0')
+    return digest.hexdigest()
+
+
+def version_docnames(repo_path: str, commit: str, source_prefix: str) -> list[str]:
+    """
+    Liste les documents RST d'une version sans l'extraire.
+
+    Args:
+        repo_path: Chemin du dépôt git.
+        commit: Commit de la version.
+        source_prefix: Dossier source Sphinx relatif au dépôt (séparateur '/').
+
+    Returns:
+        Noms des documents (chemins relatifs au dossier source, sans extension).
+    """
+    output = run_git(
+        repo_path, "ls-tree", "-r", "-z", "--name-only", commit, "--", f"{source_prefix}/"
+        ).decode('utf-8')
+    return sorted(
+        path[len(source_prefix) + 1:-len(".rst")]
+        for path in output.split('\0') if path.endswith(".rst")
+        )
+
+
+def build_version(job: dict) -> dict:
+    """
+    Construit la documentation d'une version (exécuté dans un processus du pool).
+
+    La version est extraite avec 'git archive' dans un dossier de travail
+    propre à la version (<cache_dir>/work/<version>), dont le chemin reste
+    identique d'une construction à l'autre, puis construite par un nouveau
+    processus 'python -m sphinx', avec la configuration locale et les
+    métadonnées de sphinx_multiversion: un processus du pool réutilisé pour
+    plusieurs versions ne leur transmet aucun état de Sphinx. L'environnement Sphinx de la construction
+    précédente est restauré depuis le cache (voir build_cache) avant la
+    construction, et enregistré après une construction réussie.
+
+    Args:
+        job: Dictionnaire {"repo", "name", "commit", "conf_dir", "source_prefix",
+            "code_prefix", "outputdir", "metadata_path", "builder",
+            "cache_dir", "cache_key"}.
+
+    Returns:
+        Dictionnaire {"name", "returncode", "seconds", "warm"}, 'warm' étant
+        True si l'environnement a été restauré depuis le cache.
+    """
+    started = time.perf_counter()
+    work_dir = os.path.join(job["cache_dir"], "work", job["name"])
+    src_dir = os.path.join(work_dir, "src")
+    shutil.rmtree(src_dir, ignore_errors=True)
+    os.makedirs(src_dir)
+    archive = run_git(job["repo"], "archive", "--format=tar", job["commit"])
+    with tarfile.open(fileobj=BytesIO(archive)) as tar:
+        tar.extractall(src_dir)
+
+    roots = {"source": os.path.join(src_dir, job["source_prefix"])}
+    if job["code_prefix"] is not None:
+        roots["code"] = os.path.join(src_dir, job["code_prefix"])
+    doctree_dir = os.path.join(work_dir, "doctrees")
+    cache = BuildCache(
+        os.path.join(job["cache_dir"], "entries"), job["cache_key"], job["name"], doctree_dir, roots
+        )
+    warm = cache.restore()
+
+    command = [
+        sys.executable, "-m", "sphinx",
+        "-q", "-b", job["builder"], "-c", job["conf_dir"], "-d", doctree_dir,
+        roots["source"], job["outputdir"],
+        "-D", f"smv_metadata_path={job['metadata_path']}",
+        "-D", f"smv_current_version={job['name']}",
+        ]
+    if "code" in roots:
+        command += ["-D", f"matlab_src_dir={roots['code']}"]
+    returncode = subprocess.run(command).returncode
+    if returncode == 0:
+        cache.save()
+
+    return {
+        "name": job["name"],
+        "returncode": returncode,
+        "seconds": time.perf_counter() - started,
+        "warm": warm,
+    }
+
+
+def write_versions_index(build_dir: str, metadata: dict, latest: str | None = None) -> bool:
+    """
+    Écrit la liste des versions lue par le sélecteur de version.
+
+    Args:
+        build_dir: Dossier de sortie.
+        metadata: Métadonnées des versions {nom: {"source", "is_released",
+            "docnames", ...}}.
+        latest: Nom de la dernière version publiée (smv_latest_version).
+
+    Returns:
+        True si le fichier a été créé ou modifié.
+    """
+    versions = [
+        {
+            "name": name,
+            "source": values["source"],
+            "is_released": values["is_released"],
+            "docnames": values["docnames"],
+        }
+        for name, values in sorted(metadata.items())
+        ]
+    return write_text_if_changed(
+        os.path.join(build_dir, VERSIONS_INDEX_NAME),
+        json.dumps({"latest": latest, "versions": versions}, ensure_ascii=False, separators=(',', ':')),
+        )
+
+
+def load_manifest(manifest_path: str) -> dict:
+    """
+    Lit le manifeste des versions construites.
+
+    Args:
+        manifest_path: Chemin du manifeste.
+
+    Returns:
+        Dictionnaire {nom de version: empreinte}; vide si le manifeste est
+        absent, illisible ou d'un autre format.
+    """
+    try:
+        with open(manifest_path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    if not isinstance(data, dict) or data.get("version") != MANIFEST_VERSION:
+        return {}
+    return data.get("versions", {})
+
+
+def save_manifest(manifest_path: str, versions: dict) -> None:
+    """
+    Enregistre le manifeste des versions construites.
+
+    Args:
+        manifest_path: Chemin du manifeste.
+        versions: Dictionnaire {nom de version: empreinte}.
+    """
+    tmp_path = f"{manifest_path}.tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump({"version": MANIFEST_VERSION, "versions": versions}, f, indent=2, sort_keys=True)
+    os.replace(tmp_path, manifest_path)
+
+
+def build_versions(conf_dir: str,
+        build_dir: str,
+        workers: int = 1,
+        force: bool = False,
+        builder: str = "html",
+        cache_dir: str | None = None,
+        compress: bool = True
+        ) -> bool:
+    """
+    Construit les versions modifiées depuis la construction précédente.
+
+    Args:
+        conf_dir: Dossier source Sphinx local (contenant conf.py).
+        build_dir: Dossier de sortie (une sous-arborescence par version).
+        workers: Nombre de versions construites simultanément.
+        force: Si True, reconstruit toutes les versions.
+        builder: Constructeur Sphinx.
+        cache_dir: Dossier de travail et du cache d'environnement Sphinx
+            (voir build_cache); par défaut, .build_cache à côté du dossier
+            de configuration. Seul son sous-dossier 'entries' doit être
+            conservé entre deux exécutions.
+        compress: Si True, des copies compressées des fichiers HTML, JS et
+            CSS sont écrites après le regroupement des fichiers statiques
+            (voir static_assets).
+
+    Returns:
+        True si toutes les versions ont été construites avec succès.
+    """
+    conf_dir = os.path.abspath(conf_dir)
+    build_dir = os.path.abspath(build_dir)
+    if cache_dir is None:
+        cache_dir = os.path.join(os.path.dirname(conf_dir), ".build_cache")
+    cache_dir = os.path.abspath(cache_dir)
+    repo_path = run_git(conf_dir, "rev-parse", "--show-toplevel").decode().strip()
+    config = load_config(conf_dir)
+
+    source_prefix = os.path.relpath(conf_dir, repo_path).replace(os.sep, '/')
+    code_prefix = None
+    if config.get("matlab_src_dir"):
+        code_prefix = os.path.relpath(
+            os.path.abspath(config["matlab_src_dir"]), repo_path
+            ).replace(os.sep, '/')
+
+    versions = list_versions(repo_path, config)
+    if not versions:
+        print("Aucune version ne correspond à smv_tag_whitelist / smv_branch_whitelist")
+        return True
+
+    names = [version["name"] for version in versions]
+    local = local_digest(conf_dir)
+    packages = package_versions(config.get("extensions", []))
+    key = cache_key(conf_dir, builder, config)
+    manifest_path = os.path.join(build_dir, MANIFEST_NAME)
+    previous = load_manifest(manifest_path)
+    manifest = {name: previous[name] for name in names if name in previous}
+
+    # Métadonnées lues par l'extension sphinx_multiversion (sélecteur de version)
+    metadata = {}
+    for version in versions:
+        metadata[version["name"]] = {
+            "name": version["name"],
+            "version": config.get("version", ""),
+            "release": config.get("release", ""),
+            "rst_prolog": config.get("rst_prolog"),
+            "is_released": version["is_released"],
+            "source": version["source"],
+            "creatordate": version["creatordate"],
+            "basedir": repo_path,
+            "sourcedir": os.path.join(repo_path, source_prefix),
+            "outputdir": os.path.join(build_dir, version["name"]),
+            "confdir": conf_dir,
+            "docnames": version_docnames(repo_path, version["commit"], source_prefix),
+        }
+
+    jobs = []
+    for version in versions:
+        digest = version_digest(repo_path, version, local, packages)
+        outputdir = os.path.join(build_dir, version["name"])
+        if not force and previous.get(version["name"]) == digest and os.path.isdir(outputdir):
+            print(f"{version['name']}: inchangée, non reconstruite")
+            continue
+        jobs.append(({
+            "repo": repo_path,
+            "name": version["name"],
+            "commit": version["commit"],
+            "conf_dir": conf_dir,
+            "source_prefix": source_prefix,
+            "code_prefix": code_prefix,
+            "outputdir": outputdir,
+            "metadata_path": None,
+            "builder": builder,
+            "cache_dir": cache_dir,
+            "cache_key": key,
+        }, digest))
+
+    # Supprimer les versions qui ne sont plus retenues
+    for name in previous.keys() - set(names):
+        shutil.rmtree(os.path.join(build_dir, name), ignore_errors=True)
+        print(f"{name}: version retirée, dossier supprimé")
+
+    os.makedirs(build_dir, exist_ok=True)
+    # Chemin stable: l'environnement restauré reste valide d'une exécution à l'autre
+    metadata_path = os.path.join(cache_dir, "work", "versions.json")
+    os.makedirs(os.path.dirname(metadata_path), exist_ok=True)
+    with open(metadata_path, 'w', encoding='utf-8') as f:
+        json.dump(metadata, f, indent=2)
+
+    success = True
+    digests = {}
+    with ProcessPoolExecutor(max_workers=max(1, workers)) as executor:
+        futures = []
+        for job, digest in jobs:
+            job["metadata_path"] = metadata_path
+            digests[job["name"]] = digest
+            futures.append(executor.submit(build_version, job))
+
+        for future in as_completed(futures):
+            result = future.result()
+            if result["returncode"] == 0:
+                manifest[result["name"]] = digests[result["name"]]
+                mode = "incrémentale" if result["warm"] else "complète"
+                print(f"{result['name']}: construite en {result['seconds']:.1f} s ({mode})")
+            else:
+                manifest.pop(result["name"], None)
+                success = False
+                print(f"{result['name']}: échec de la construction "
+                      f"(code {result['returncode']})")
+            save_manifest(manifest_path, manifest)
+
+    save_manifest(manifest_path, manifest)
+    write_versions_index(build_dir, metadata, config.get("smv_latest_version"))
+    optimize_site(build_dir, compress)
+    print(f"{len(jobs)} version(s) construite(s), {len(versions) - len(jobs)} inchangée(s)")
+    return success
+
+
+def main() -> None:
+    """
+    Point d'entrée en ligne de commande.
+    """
+    base_dir = os.path.dirname(os.path.abspath(__file__))
+
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--source-dir", default=os.path.join(base_dir, "source"),
+                        help="Dossier source Sphinx local (contenant conf.py)")
+    parser.add_argument("--build-dir", default=os.path.join(base_dir, "build"),
+                        help="Dossier de sortie")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1,
+                        help="Versions construites simultanément")
+    parser.add_argument("--force", action="store_true", help="Reconstruire toutes les versions")
+    parser.add_argument("--builder", default="html", help="Constructeur Sphinx")
+    parser.add_argument("--no-compress", action="store_true",
+                        help="Ne pas écrire de copies compressées des fichiers HTML, JS et CSS")
+    parser.add_argument("--cache-dir", default=os.path.join(base_dir, ".build_cache"),
+                        help="Dossier de travail et du cache d'environnement Sphinx")
+    args = parser.parse_args()
+
+    if not build_versions(args.source_dir, args.build_dir, args.workers, args.force,
+                          args.builder, args.cache_dir, not args.no_compress):
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,143 @@
+"""
+Ce module définit la représentation de l'arborescence des dossiers MATLAB
+partagée par le parcours (auto_doc_matlab.find_leaf_folders), la
+production des fichiers RST et l'index des symboles.
+
+Chaque dossier est un FolderNode: son nom, la présence de fichiers .m et
+le tuple de ses sous-dossiers à documenter. Un dossier terminal contient
+uniquement des fichiers .m, un dossier parent uniquement des
+sous-dossiers, et un dossier mixte les deux. La racine est un nœud sans
+nom dont les enfants sont les dossiers de premier niveau.
+"""
+
+import os
+import sys
+from collections.abc import Iterator
+
+# Sous-dossiers d'un dossier terminal: tuple vide partagé par tous les nœuds
+_NO_CHILDREN = ()
+
+
+class FolderNode:
+    """
+    Dossier de l'arborescence MATLAB à documenter.
+
+    Les nœuds sont construits une fois leurs sous-dossiers connus (parcours
+    post-ordre) et ne sont plus modifiés ensuite: un dossier terminal ne
+    stocke qu'un nom et un booléen.
+
+    Attributes:
+        name: Nom du dossier (chaîne internée, vide pour la racine).
+        has_m: True si le dossier contient des fichiers .m.
+        children: Sous-dossiers à documenter, triés alphabétiquement.
+    """
+
+    __slots__ = ("name", "has_m", "children")
+
+    def __init__(self, name: str, has_m: bool = False, children: tuple = _NO_CHILDREN) -> None:
+        """
+        Args:
+            name: Nom du dossier.
+            has_m: True si le dossier contient des fichiers .m.
+            children: Sous-dossiers à documenter (FolderNode), triés.
+        """
+        self.name = sys.intern(name)
+        self.has_m = has_m
+        self.children = tuple(children) or _NO_CHILDREN
+
+    @property
+    def is_leaf(self) -> bool:
+        """True pour un dossier terminal (fichiers .m sans sous-dossier)."""
+        return not self.children
+
+    def __repr__(self) -> str:
+        return f"FolderNode({self.name!r}, has_m={self.has_m}, children={len(self.children)})"
+
+    def __eq__(self, other) -> bool:
+        if not isinstance(other, FolderNode):
+            return NotImplemented
+        return self.to_data() == other.to_data()
+
+    def iter_nodes(self, parent_path: str = "") -> Iterator[tuple[str, "FolderNode"]]:
+        """
+        Parcourt les sous-dossiers en profondeur (préordre), sans récursion.
+
+        Args:
+            parent_path: Chemin en notation pointée du nœud (vide pour la racine).
+
+        Yields:
+            Tuples (chemin en notation pointée, nœud) de chaque descendant,
+            dans l'ordre de la documentation générée.
+        """
+        stack = [(child, parent_path) for child in reversed(self.children)]
+        while stack:
+            node, parent = stack.pop()
+            module_path = f"{parent}.{node.name}" if parent else node.name
+            yield module_path, node
+            stack.extend((child, module_path) for child in reversed(node.children))
+
+    def iter_folders(self, parent_path: str = "", parent_folder: str = "") -> Iterator[tuple[str, str, "FolderNode"]]:
+        """
+        Parcourt les sous-dossiers comme iter_nodes, avec leur chemin relatif.
+
+        Le chemin relatif est construit à partir des noms des dossiers: il
+        reste exact pour un nom de dossier contenant un point, que la
+        notation pointée ne permet pas de distinguer d'un sous-dossier.
+
+        Args:
+            parent_path: Chemin en notation pointée du nœud (vide pour la racine).
+            parent_folder: Chemin relatif du nœud (vide pour la racine).
+
+        Yields:
+            Tuples (chemin en notation pointée, chemin relatif avec le
+            séparateur du système, nœud) de chaque descendant.
+        """
+        stack = [(child, parent_path, parent_folder) for child in reversed(self.children)]
+        while stack:
+            node, parent, folder = stack.pop()
+            module_path = f"{parent}.{node.name}" if parent else node.name
+            relative_folder = os.path.join(folder, node.name) if folder else node.name
+            yield module_path, relative_folder, node
+            stack.extend((child, module_path, relative_folder) for child in reversed(node.children))
+
+    def to_data(self) -> list:
+        """
+        Sérialise la sous-arborescence dans un format compact compatible JSON.
+
+        Les nœuds sont listés en préordre sous la forme
+        [nom, has_m, nombre de sous-dossiers], sans imbrication: la
+        sérialisation et la désérialisation ne sont pas récursives.
+
+        Returns:
+            Liste des nœuds, la racine en premier.
+        """
+        data = []
+        stack = [self]
+        while stack:
+            node = stack.pop()
+            data.append([node.name, node.has_m, len(node.children)])
+            stack.extend(reversed(node.children))
+        return data
+
+    @classmethod
+    def from_data(cls, data: list) -> "FolderNode":
+        """
+        Reconstruit une arborescence sérialisée par to_data.
+
+        Args:
+            data: Liste des nœuds en préordre.
+
+        Returns:
+            Nœud racine.
+        """
+        # Cadres en attente de leurs sous-dossiers: [nom, has_m, restants, enfants]
+        stack = []
+        for name, has_m, child_count in data:
+            stack.append([name, has_m, child_count, []])
+            while stack and stack[-1][2] == len(stack[-1][3]):
+                name, has_m, _, children = stack.pop()
+                node = cls(name, has_m, children)
+                if not stack:
+                    return node
+                stack[-1][3].append(node)
+        raise ValueError("Arborescence sérialisée incomplète")
@@ -0,0 +1,365 @@
+"""
+Ce module construit la structure des dossiers MATLAB d'une version (tag,
+branche ou commit) directement depuis les objets git, sans copie de
+travail.
+
+Les arbres sont lus avec 'git ls-tree -r -t' et indexés par leur
+identifiant d'objet (OID): un dossier identique d'une version à l'autre a
+le même OID, il n'est donc décrit qu'une seule fois en mémoire, et deux
+versions dont l'arbre du code est identique partagent la même structure
+et le même contenu RST. La comparaison de deux versions (changed_folders)
+ignore les sous-arbres identiques sans les parcourir.
+
+Le dossier du code (--prefix) est relatif à la racine du dépôt, quel que
+soit le dossier du dépôt passé avec --repo. La structure obtenue est celle
+de find_leaf_folders sur une copie de travail de la version, aux
+différences près des entrées que git ne décrit pas comme des arbres:
+- les liens symboliques vers des dossiers sont ignorés, comme par défaut
+  sur le système de fichiers (voir scan_rules.ScanRules.follow_symlinks);
+- les sous-modules (entrées 'commit') sont ignorés et comptés: pour une
+  sortie identique, les exclure aussi du parcours des copies de travail
+  (.matlabdocignore ou --exclude).
+
+Exemple:
+    python git_tree.py 0.0.1 0.0.2 --prefix code_matlab --output-dir build/rst
+"""
+
+import argparse
+import os
+import posixpath
+import subprocess
+
+from auto_doc_matlab import find_leaf_folders, generate_rst_content, write_documentation
+from folder_tree import FolderNode
+from rst_writer import write_lines_if_changed
+from scan_rules import IGNORE_FILENAME, ScanRules
+
+
+def run_git(repo_path: str, *args: str, stdin: bytes | None = None) -> bytes:
+    """
+    Exécute une commande git dans un dépôt.
+
+    Args:
+        repo_path: Chemin du dépôt.
+        *args: Arguments de la commande git.
+        stdin: Données transmises sur l'entrée standard, ou None.
+
+    Returns:
+        Sortie standard de la commande.
+
+    Raises:
+        subprocess.CalledProcessError: Si la commande échoue.
+    """
+    return subprocess.run(
+        ["git", "-C", repo_path, *args], input=stdin, check=True, capture_output=True
+        ).stdout
+
+
+class GitTreeScanner:
+    """
+    Lecture des dossiers MATLAB depuis les objets git d'un dépôt.
+
+    Attributes:
+        repo_path: Chemin du dépôt git.
+        exclude: Motifs d'exclusion (voir scan_rules), en plus du fichier
+            .matlabdocignore présent dans l'arbre de chaque version.
+        max_depth: Profondeur maximale du parcours, ou None sans limite.
+        trees_read: Nombre d'arbres git décrits (OID distincts).
+        submodules: Nombre de sous-modules ignorés dans les arbres décrits.
+        structures_reused: Nombre de versions dont la structure a été
+            réutilisée car leur arbre était déjà connu.
+    """
+
+    def __init__(self, repo_path: str = ".", exclude=(), max_depth: int | None = None) -> None:
+        """
+        Args:
+            repo_path: Chemin du dépôt git.
+            exclude: Motifs d'exclusion supplémentaires.
+            max_depth: Profondeur maximale du parcours.
+        """
+        self.repo_path = repo_path
+        self.exclude = list(exclude)
+        self.max_depth = max_depth
+        self.trees_read = 0
+        self.submodules = 0
+        self.structures_reused = 0
+        # OID d'un arbre -> (sous-dossiers triés, présence de .m, {nom: OID})
+        self._listings = {}
+        # OID de l'arbre du code -> structure des dossiers
+        self._structures = {}
+
+    def tree_oid(self, ref: str, prefix: str = "") -> str | None:
+        """
+        Détermine l'OID de l'arbre d'un dossier dans une version.
+
+        Args:
+            ref: Tag, branche ou commit.
+            prefix: Chemin du dossier relatif à la racine du dépôt (vide
+                pour la racine).
+
+        Returns:
+            OID de l'arbre, ou None si la version n'existe pas ou si le
+            chemin n'y désigne pas un dossier.
+        """
+        try:
+            output = run_git(
+                self.repo_path, "rev-parse", "--verify", "--quiet", f"{ref}^{{tree}}:{prefix}"
+                )
+            oid = output.decode('ascii').strip()
+            if prefix:
+                # Un fichier a aussi un OID: vérifier qu'il s'agit d'un arbre
+                run_git(self.repo_path, "rev-parse", "--verify", "--quiet", f"{oid}^{{tree}}")
+        except subprocess.CalledProcessError:
+            return None
+        return oid
+
+    def _load(self, root_oid: str) -> None:
+        """
+        Décrit tous les arbres contenus dans un arbre avec 'git ls-tree'.
+
+        Seuls les arbres dont l'OID est inconnu sont ajoutés à l'index.
+        L'option --full-tree évite que git ne limite la liste au dossier du
+        dépôt passé avec -C lorsqu'il ne s'agit pas de sa racine.
+
+        Args:
+            root_oid: OID de l'arbre racine du code.
+        """
+        if root_oid in self._listings:
+            return
+
+        output = run_git(self.repo_path, "ls-tree", "-r", "-t", "-z", "--full-tree", root_oid)
+
+        tree_oids = {"": root_oid}
+        children = {"": {}}
+        has_m = set()
+        for record in output.split(b'\0'):
+            if not record:
+                continue
+            header, path = record.split(b'\t', 1)
+            _, object_type, oid = header.split(b' ')
+            path = path.decode('utf-8', errors='surrogateescape')
+            parent, name = posixpath.split(path)
+
+            if object_type == b"tree":
+                tree_oids[path] = oid.decode('ascii')
+                children[path] = {}
+                children[parent][name] = tree_oids[path]
+            elif object_type == b"blob" and name.endswith('.m'):
+                has_m.add(parent)
+            elif object_type == b"commit":
+                self.submodules += 1
+
+        for path, oid in tree_oids.items():
+            if oid not in self._listings:
+                self._listings[oid] = (sorted(children[path]), path in has_m, children[path])
+                self.trees_read += 1
+
+    def lister(self, root_path: str, root_oid: str):
+        """
+        Construit une fonction de lecture des dossiers d'un arbre git.
+
+        Args:
+            root_path: Chemin attribué à la racine de l'arbre, utilisé comme
+                racine du parcours par find_leaf_folders.
+            root_oid: OID de l'arbre racine (déjà décrit par _load).
+
+        Returns:
+            Fonction de même signature que auto_doc_matlab.scan_folder.
+        """
+        paths = {os.path.normpath(root_path): root_oid}
+
+        def git_lister(folder_path: str) -> tuple[list[str], bool]:
+            folder_path = os.path.normpath(folder_path)
+            oid = paths.get(folder_path)
+            if oid is None:
+                return [], False
+            folders, has_m, oids = self._listings[oid]
+            for name in folders:
+                paths[os.path.join(folder_path, name)] = oids[name]
+            return list(folders), has_m
+
+        return git_lister
+
+    def rules_for(self, ref: str, prefix: str = "") -> ScanRules:
+        """
+        Construit les règles de parcours d'une version.
+
+        Le fichier .matlabdocignore est lu dans l'arbre de la version.
+
+        Args:
+            ref: Tag, branche ou commit.
+            prefix: Chemin du dossier du code dans le dépôt.
+
+        Returns:
+            Règles de parcours.
+        """
+        patterns = []
+        try:
+            content = run_git(
+                self.repo_path, "show", f"{ref}:{posixpath.join(prefix, IGNORE_FILENAME)}"
+                )
+            patterns.extend(content.decode('utf-8').splitlines())
+        except subprocess.CalledProcessError:
+            pass
+        return ScanRules([*patterns, *self.exclude], self.max_depth)
+
+    def structure(self, ref: str, prefix: str = "") -> FolderNode | None:
+        """
+        Construit la structure des dossiers MATLAB d'une version.
+
+        Args:
+            ref: Tag, branche ou commit.
+            prefix: Chemin du dossier du code dans le dépôt.
+
+        Returns:
+            Nœud racine, identique à celui que find_leaf_folders produirait
+            sur une copie de travail de la version, ou None si le dossier
+            n'existe pas dans cette version.
+        """
+        root_oid = self.tree_oid(ref, prefix)
+        if root_oid is None:
+            return None
+        if root_oid in self._structures:
+            self.structures_reused += 1
+            return self._structures[root_oid]
+
+        self._load(root_oid)
+        root_path = prefix or os.curdir
+        lister = self.rules_for(ref, prefix).wrap_lister(
+            self.lister(root_path, root_oid), root_path, check_cycles=False
+            )
+        structure = find_leaf_folders(root_path, lister=lister)
+        self._structures[root_oid] = structure
+        return structure
+
+    def changed_folders(self, old_ref: str, new_ref: str, prefix: str = "") -> list[str]:
+        """
+        Liste les dossiers dont le contenu diffère entre deux versions.
+
+        Les sous-arbres de même OID sont identiques et ne sont pas parcourus.
+
+        Args:
+            old_ref: Version de référence.
+            new_ref: Version à comparer.
+            prefix: Chemin du dossier du code dans le dépôt.
+
+        Returns:
+            Chemins relatifs (séparateur '/') des dossiers ajoutés, supprimés
+            ou modifiés, triés; "" désigne la racine du code.
+        """
+        old_oid = self.tree_oid(old_ref, prefix)
+        new_oid = self.tree_oid(new_ref, prefix)
+        for oid in (old_oid, new_oid):
+            if oid is not None:
+                self._load(oid)
+
+        changed = []
+        stack = [("", old_oid, new_oid)]
+        while stack:
+            path, old, new = stack.pop()
+            if old == new:
+                continue
+            changed.append(path)
+
+            old_children = self._listings[old][2] if old is not None else {}
+            new_children = self._listings[new][2] if new is not None else {}
+            for name in old_children.keys() | new_children.keys():
+                stack.append((
+                    posixpath.join(path, name) if path else name,
+                    old_children.get(name),
+                    new_children.get(name),
+                    ))
+        return sorted(changed)
+
+
+def write_versions(scanner: GitTreeScanner,
+        refs: list[str],
+        prefix: str,
+        output_dir: str,
+        output_name: str = "documentation_hierarchique.rst",
+        split_pages: bool = False
+        ) -> dict[str, str | None]:
+    """
+    Génère la documentation RST de plusieurs versions depuis les objets git.
+
+    Chaque version est écrite dans <output_dir>/<version>/<output_name>.
+    En mode fichier unique, le contenu RST est mémorisé par OID de l'arbre
+    du code: une version identique à une précédente n'est pas regénérée.
+
+    Args:
+        scanner: Lecteur des objets git.
+        refs: Versions à documenter.
+        prefix: Chemin du dossier du code dans le dépôt.
+        output_dir: Dossier de sortie.
+        output_name: Nom du fichier RST de chaque version.
+        split_pages: Si True, une page par dossier (voir write_documentation).
+
+    Returns:
+        Dictionnaire {version: OID de l'arbre du code, ou None si le dossier
+        n'existe pas dans la version}.
+    """
+    oids = {}
+    rst_lines = {}
+
+    for ref in refs:
+        oid = scanner.tree_oid(ref, prefix)
+        oids[ref] = oid
+        if oid is None:
+            print(f"{ref}: dossier {prefix or '.'} absent, version ignorée")
+            continue
+
+        structure = scanner.structure(ref, prefix)
+        output_file = os.path.join(output_dir, ref, output_name)
+        os.makedirs(os.path.dirname(output_file), exist_ok=True)
+
+        if split_pages:
+            written, _, _ = write_documentation(structure, output_file, split_pages=True)
+            changed = bool(written)
+        else:
+            if oid not in rst_lines:
+                rst_lines[oid] = generate_rst_content(structure)
+            changed = write_lines_if_changed(output_file, rst_lines[oid])
+
+        print(f"{ref}: arbre {oid[:12]}, {'écrit' if changed else 'inchangé'}")
+
+    return oids
+
+
+def main() -> None:
+    """
+    Point d'entrée en ligne de commande.
+    """
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("refs", nargs="+", help="Versions à documenter (tags, branches, commits)")
+    parser.add_argument("--repo", default=".", help="Chemin du dépôt git")
+    parser.add_argument("--prefix", default="code_matlab",
+                        help="Dossier du code MATLAB, relatif à la racine du dépôt")
+    parser.add_argument("--output-dir", default="rst_versions", help="Dossier de sortie")
+    parser.add_argument("--split-pages", action="store_true", help="Une page par dossier")
+    parser.add_argument("--exclude", action="append", default=[],
+                        help="Motif de dossiers à exclure (format .gitignore, répétable)")
+    parser.add_argument("--max-depth", type=int, help="Profondeur maximale du parcours")
+    args = parser.parse_args()
+
+    scanner = GitTreeScanner(args.repo, args.exclude, args.max_depth)
+    oids = write_versions(
+        scanner, args.refs, args.prefix, args.output_dir, split_pages=args.split_pages
+        )
+
+    refs = [ref for ref in args.refs if oids[ref] is not None]
+    if not refs:
+        print(f"Erreur: Le dossier {args.prefix} n'existe dans aucune des versions "
+              f"(chemin relatif à la racine du dépôt)")
+        raise SystemExit(1)
+    for old_ref, new_ref in zip(refs, refs[1:]):
+        changed = scanner.changed_folders(old_ref, new_ref, args.prefix)
+        print(f"{old_ref} -> {new_ref}: {len(changed)} dossier(s) modifié(s)")
+
+    print(f"{scanner.trees_read} arbre(s) git décrit(s), "
+          f"{scanner.structures_reused} structure(s) réutilisée(s)")
+    if scanner.submodules:
+        print(f"{scanner.submodules} sous-module(s) ignoré(s)")
+
+
+if __name__ == "__main__":
+    main()
@@ -2,101 +2,194 @@
 """
 Ce script génère un fichier index.rst pour la documentation avec Sphinx.
 
-Ce script parcourt les sous-dossiers .\source\doc_actuarielle et .\source\doc_technique
-et génère automatiquement un fichier .\source\index.rst contenant un toctree
-référençant tous les fichiers .rst à documenter avec Sphinx.
+Les sections de l'index sont déclarées dans SECTIONS (ou dans l'option
+matlab_autogen_index_sections de conf.py): un dossier du dossier source,
+le titre de son toctree et les options de la directive. Les dossiers des
+sections sont parcourus en une seule passe (os.scandir), sous-dossiers
+compris, et le fichier .\source\index.rst contient un toctree par section
+référençant les fichiers .rst trouvés. Le fichier n'est réécrit que si la
+liste ordonnée des entrées change: ajouter du contenu à une page existante
+ne modifie pas index.rst et ne déclenche pas la reconstruction de la
+navigation de toutes les pages.
 """
 
 import os
+from collections.abc import Iterator
 from pathlib import Path
 
+from rst_writer import write_text_if_changed
+
+# Titre principal de index.rst
+TITLE = "Documentation Complète"
+
+# Sections de index.rst: dossier relatif au dossier source, titre du
+# toctree et options de la directive (True pour une option sans valeur)
+SECTIONS = [
+    {
+        "folder": "doc_actuarielle",
+        "caption": "Documentation Actuarielle",
+        "options": {"maxdepth": 2, "numbered": True},
+    },
+    {
+        "folder": "doc_technique",
+        "caption": "Documentation Technique",
+        "options": {"maxdepth": 2},
+    },
+]
+
+
+def discover_documents(source_dir: Path, folders: list[str]) -> dict[str, list[str]]:
+    """
+    Recherche les fichiers reStructuredText des dossiers des sections.
+
+    Chaque dossier est lu une seule fois avec os.scandir. Les documents d'un
+    dossier précèdent ceux de ses sous-dossiers, chaque niveau étant trié
+    alphabétiquement. Le fichier index.rst d'un dossier de section est
+    exclu; un sous-dossier contenant un index.rst est référencé par ce seul
+    fichier (qui décrit lui-même son contenu). Les dossiers cachés ou
+    commençant par '_' sont ignorés.
+
+    Args:
+        source_dir: Chemin vers le dossier 'source' du projet Sphinx.
+        folders: Dossiers des sections, relatifs au dossier source
+            (séparateur '/').
+
+    Returns:
+        Dictionnaire {dossier de section: noms des documents relatifs au
+        dossier source, sans extension}; une liste vide si le dossier
+        n'existe pas.
+    """
+    documents = {folder: [] for folder in folders}
+    sections = set(folders)
+
+    for folder in folders:
+        stack = [folder]
+        while stack:
+            relative = stack.pop()
+            try:
+                with os.scandir(os.path.join(source_dir, relative)) as entries:
+                    entries = sorted(entries, key=lambda entry: entry.name)
+            except OSError:
+                continue
+
+            files = [entry.name for entry in entries if entry.is_file() and entry.name.endswith('.rst')]
+            if relative != folder and "index.rst" in files:
+                documents[folder].append(f"{relative}/index")
+                continue
+
+            documents[folder].extend(
+                f"{relative}/{name[:-len('.rst')]}" for name in files if name != "index.rst"
+                )
+            stack.extend(
+                f"{relative}/{entry.name}" for entry in reversed(entries)
+                if entry.is_dir() and not entry.name.startswith(('.', '_'))
+                and f"{relative}/{entry.name}" not in sections
+                )
+
+    return documents
+
 
 def get_rst_files(directory: Path) -> list[str]:
     """
     Récupère la liste des fichiers reStructuredText d'un dossier.
 
-    Parcourt le dossier spécifié et retourne les noms (sans extension)
-    de tous les fichiers .rst trouvés, triés alphabétiquement.
-    Le fichier index.rst est automatiquement exclu s'il existe.
+    Les fichiers sont recherchés comme pour une section de l'index (voir
+    discover_documents), sous-dossiers compris. Le fichier index.rst du
+    dossier est exclu.
 
     Args:
         directory: Chemin vers le dossier à analyser. Peut être un chemin
             absolu ou relatif sous forme d'objet Path.
 
     Returns:
-        Liste des noms de fichiers .rst sans leur extension, triés
-        alphabétiquement. Retourne une liste vide si le dossier
-        n'existe pas ou ne contient aucun fichier .rst.
+        Noms des fichiers .rst relatifs au dossier (séparateur '/'), sans
+        leur extension. Retourne une liste vide si le dossier n'existe pas
+        ou ne contient aucun fichier .rst.
     """
+    directory = Path(directory)
     if not directory.exists():
         print(f"Le dossier {directory} n'existe pas.")
         return []
-    
-    rst_files = []
-    for file in sorted(directory.glob("*.rst")):
-        # On exclut index.rst s'il existe dans le sous-dossier
-        if file.stem != "index":
-            rst_files.append(file.stem)
-    
-    return rst_files
+
+    documents = discover_documents(directory.parent, [directory.name])[directory.name]
+    return [name[len(directory.name) + 1:] for name in documents]
 
 
-def generate_index_content(source_dir: Path) -> str:
+def iter_index_lines(title: str, sections: list[dict], documents: dict[str, list[str]]) -> Iterator[str]:
+    """
+    Produit les lignes du fichier index.rst.
+
+    Les sections sans document sont omises.
+
+    Args:
+        title: Titre principal.
+        sections: Sections déclarées (voir SECTIONS).
+        documents: Documents de chaque section (voir discover_documents).
+
+    Yields:
+        Lignes du fichier, sans fin de ligne.
+    """
+    yield title
+    yield "=" * len(title)
+
+    for section in sections:
+        entries = documents.get(section["folder"])
+        if not entries:
+            continue
+
+        yield ""
+        yield ".. toctree::"
+        for name, value in section.get("options", {}).items():
+            if value is True:
+                yield f"   :{name}:"
+            elif value is not False and value is not None:
+                yield f"   :{name}: {value}"
+        if section.get("caption"):
+            yield f"   :caption: {section['caption']}"
+        yield ""
+        for entry in entries:
+            yield f"   {entry}"
+
+    yield ""
+
+
+def generate_index_content(source_dir: Path, sections: list[dict] | None = None, title: str = TITLE) -> str:
     """
     Génère le contenu complet du fichier index.rst.
 
-    Construit un fichier index.rst valide pour Sphinx contenant:
-    - Un titre principal "Documentation Complète"
-    - Un toctree pour la documentation actuarielle
-    - Un toctree pour la documentation technique
+    Construit un fichier index.rst valide pour Sphinx contenant un titre
+    principal et un toctree par section déclarée.
 
     Args:
         source_dir: Chemin vers le dossier 'source' du projet Sphinx.
-            Ce dossier doit contenir les sous-dossiers 'doc_actuarielle'
-            et 'doc_technique'.
+        sections: Sections de l'index; par défaut SECTIONS.
+        title: Titre principal.
 
     Returns:
         Chaîne de caractères contenant le contenu RST complet,
         prêt à être écrit dans un fichier.
     """
-    
-    # Définir les chemins
-    doc_actuarielle_dir = source_dir / "doc_actuarielle"
-    doc_technique_dir = source_dir / "doc_technique"
-    
-    # Récupérer les fichiers .rst de chaque dossier
-    actuarielle_files = get_rst_files(doc_actuarielle_dir)
-    technique_files = get_rst_files(doc_technique_dir)
-    
-    # Construire l'en-tête du fichier index.rst
-    content = """Documentation Complète
-======================
-
-.. toctree::
-    :maxdepth: 2
-    :caption: Documentation Actuarielle
-    :numbered:                                
+    if sections is None:
+        sections = SECTIONS
+    documents = discover_documents(source_dir, [section["folder"] for section in sections])
+    return "\n".join(iter_index_lines(title, sections, documents))
 
-"""
-    
-    # Ajouter les entrées pour la documentation actuarielle
-    for filename in actuarielle_files:
-        content += f"   doc_actuarielle/{filename}\n"
-    
-    # Ajouter la section documentation technique
-    content += """
-.. toctree::
-    :maxdepth: 2
-    :caption: Documentation Technique
-                                  
 
-"""
-    
-    # Ajouter les entrées pour la documentation technique
-    for filename in technique_files:
-        content += f"   doc_technique/{filename}\n"
-    
-    return content
+def write_index(source_dir: Path, sections: list[dict] | None = None, title: str = TITLE) -> bool:
+    """
+    Écrit index.rst dans le dossier source si son contenu a changé.
+
+    Args:
+        source_dir: Chemin vers le dossier 'source' du projet Sphinx.
+        sections: Sections de l'index; par défaut SECTIONS.
+        title: Titre principal.
+
+    Returns:
+        True si le fichier a été créé ou modifié.
+    """
+    return write_text_if_changed(
+        os.path.join(source_dir, "index.rst"), generate_index_content(source_dir, sections, title)
+        )
 
 
 def main()-> None:
@@ -106,37 +199,38 @@ def main()-> None:
     Orchestre la génération du fichier index.rst:
     1. Vérifie l'existence du dossier source
     2. Génère le contenu du fichier index.rst
-    3. Écrit le fichier sur le disque
+    3. Écrit le fichier sur le disque s'il a changé
     4. Affiche un récapitulatif à l'utilisateur
     """
     # Configuration du chemin du dossier source
     # Par défaut: relatif au répertoire d'exécution
     source_dir = Path("source")
-    
+
     # Alternative: chemin absolu (décommenter si nécessaire)
     # source_dir = Path("/chemin/vers/votre/projet/source")
-    
+
     # Vérification de l'existence du dossier source
     if not source_dir.exists():
         print(f"Le dossier source '{source_dir}' n'existe pas.")
         print("   Vérifiez que vous exécutez le script depuis le bon répertoire.")
         return
-    
-    # Génération du contenu RST
-    index_content = generate_index_content(source_dir)
-    
-    # Écriture du fichier index.rst
+
+    for section in SECTIONS:
+        if not (source_dir / section["folder"]).is_dir():
+            print(f"Le dossier {source_dir / section['folder']} n'existe pas.")
+
+    # Génération et écriture du fichier index.rst
     index_path = source_dir / "index.rst"
-    
-    with open(index_path, "w", encoding="utf-8") as f:
-        f.write(index_content)
-    
+    if not write_index(source_dir):
+        print(f"Fichier {index_path} inchangé.")
+        return
+
     # Affichage du résultat
     print(f"Fichier {index_path} généré avec succès !")
     print("\nContenu généré :")
     print("-" * 40)
-    print(index_content)
+    print(generate_index_content(source_dir))
 
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
@@ -0,0 +1,565 @@
+"""
+Ce module extrait rapidement les symboles publics des fichiers MATLAB (.m).
+
+Seuls la ligne de déclaration (function ou classdef) et le bloc de
+commentaires d'en-tête sont lus: la lecture d'un fichier s'arrête à la
+première ligne de code qui suit l'en-tête. Le résultat est un index JSON
+des symboles (nom, type, signature, fichier, ligne, docstring) qui permet
+de générer des directives autofunction/autoclass explicites au lieu de
+laisser sphinxcontrib-matlabdomain analyser chaque dossier.
+"""
+
+import argparse
+import json
+import os
+import re
+import textwrap
+from collections.abc import Iterable, Iterator
+
+from folder_tree import FolderNode
+from rst_writer import write_lines_if_changed
+
+# Version du format de l'index des symboles
+INDEX_VERSION = 1
+
+# Types de symboles documentés par des directives explicites
+PUBLIC_KINDS = ("function", "class")
+
+_FUNCTION_RE = re.compile(
+    r"^function\s+"
+    r"(?:(?P<outputs>\[[^\]]*\]|[\w.]+)\s*=\s*)?"
+    r"(?P<name>[\w.]+)\s*"
+    r"(?:\((?P<args>[^)]*)\))?"
+    )
+_CLASSDEF_RE = re.compile(
+    r"^classdef\s*(?:\([^)]*\)\s*)?(?P<name>\w+)\s*(?:<\s*(?P<bases>.+))?$"
+    )
+
+
+def _split_names(text: str | None) -> list[str]:
+    """
+    Découpe une liste de noms MATLAB séparés par des virgules ou des espaces.
+
+    Args:
+        text: Texte à découper (ex: "[a, b]" ou "x, y, varargin").
+
+    Returns:
+        Liste des noms, sans crochets ni espaces.
+    """
+    if not text:
+        return []
+    return [name for name in re.split(r"[\s,\[\]]+", text) if name]
+
+
+def _strip_comment(line: str) -> str:
+    """
+    Retire le commentaire de fin de ligne d'une ligne de code MATLAB.
+
+    Les '%' contenus dans une chaîne entre apostrophes ou guillemets ne
+    sont pas considérés comme des commentaires.
+
+    Args:
+        line: Ligne de code.
+
+    Returns:
+        Ligne sans son commentaire de fin de ligne.
+    """
+    quote = None
+    for index, char in enumerate(line):
+        if quote:
+            if char == quote:
+                quote = None
+        elif char in "'\"":
+            quote = char
+        elif char == '%':
+            return line[:index]
+    return line
+
+
+def _comment_text(stripped: str) -> str:
+    """
+    Extrait le texte d'une ligne de commentaire MATLAB.
+
+    Args:
+        stripped: Ligne de commentaire sans indentation (commence par '%').
+
+    Returns:
+        Texte du commentaire, sans le ou les '%' initiaux ni l'espace
+        qui les suit.
+    """
+    text = stripped.lstrip('%')
+    return text[1:] if text.startswith(' ') else text
+
+
+def _format_docstring(comment_lines: list[str]) -> str:
+    """
+    Construit la docstring à partir des lignes de commentaire d'en-tête.
+
+    Args:
+        comment_lines: Textes des lignes de commentaire.
+
+    Returns:
+        Docstring sans indentation commune ni lignes vides en bordure.
+    """
+    return textwrap.dedent("\n".join(comment_lines)).strip("\n")
+
+
+def read_header(path: str) -> dict | None:
+    """
+    Lit la déclaration et l'en-tête de commentaires d'un fichier .m.
+
+    Le fichier est lu ligne par ligne et la lecture s'arrête dès la
+    première ligne de code suivant l'en-tête (voir parse_header).
+
+    Args:
+        path: Chemin du fichier .m.
+
+    Returns:
+        Symbole décrit par parse_header, ou None si le fichier n'est
+        pas lisible.
+    """
+    name = os.path.splitext(os.path.basename(path))[0]
+    try:
+        with open(path, 'r', encoding='utf-8', errors='replace') as f:
+            return parse_header(f, name)
+    except OSError:
+        return None
+
+
+def parse_header(lines: Iterable[str], name: str) -> dict:
+    """
+    Analyse la déclaration et l'en-tête de commentaires d'un fichier .m.
+
+    Les lignes sont consommées une par une et l'analyse s'arrête dès la
+    première ligne de code suivant l'en-tête. Trois types de fichiers sont
+    distingués: "function", "class" (classdef) et "script" (aucune
+    déclaration avant la première ligne de code).
+
+    Args:
+        lines: Lignes du fichier (ex: objet fichier ouvert en mode texte).
+        name: Nom du fichier sans extension, sous lequel MATLAB expose
+            la fonction ou le script.
+
+    Returns:
+        Dictionnaire {name, kind, signature, line, args, outputs, bases,
+        docstring, summary}, où line est le numéro (à partir de 1) de la
+        ligne de déclaration.
+    """
+    leading = []
+    trailing = []
+    declaration = None
+    line_number = 0
+    in_block = False
+
+    lines = iter(lines)
+    for line in lines:
+        line_number += 1
+        stripped = line.strip()
+
+        # Bloc de commentaires %{ ... %}
+        if in_block:
+            if stripped == '%}':
+                in_block = False
+            else:
+                (trailing if declaration else leading).append(line.rstrip())
+            continue
+        if stripped == '%{':
+            in_block = True
+            continue
+
+        if stripped.startswith('%'):
+            (trailing if declaration else leading).append(_comment_text(stripped))
+            continue
+
+        if declaration is not None:
+            # Une ligne vide ou de code termine l'en-tête
+            break
+
+        if not stripped:
+            if leading:
+                # Une ligne vide sépare l'en-tête d'un script du code
+                leading.append("")
+            continue
+
+        # Première ligne de code: déclaration éventuelle, avec ses
+        # lignes de continuation
+        code = _strip_comment(stripped).rstrip()
+        while code.endswith('...'):
+            next_line = next(lines, None)
+            if next_line is None:
+                break
+            line_number += 1
+            code = code[:-3] + ' ' + _strip_comment(next_line.strip()).rstrip()
+
+        declaration = (code, line_number)
+        if not (code.startswith('function') or code.startswith('classdef')):
+            break
+
+    symbol = {
+        "name": name,
+        "kind": "script",
+        "signature": name,
+        "line": 1,
+        "args": [],
+        "outputs": [],
+        "bases": [],
+        }
+
+    if declaration is not None:
+        code, declaration_line = declaration
+        function_match = _FUNCTION_RE.match(code)
+        class_match = _CLASSDEF_RE.match(code)
+
+        if function_match:
+            args = _split_names(function_match.group("args"))
+            # MATLAB expose la fonction principale sous le nom du fichier
+            symbol.update(
+                kind="function",
+                signature=f"{name}({', '.join(args)})",
+                line=declaration_line,
+                args=args,
+                outputs=_split_names(function_match.group("outputs")),
+                )
+        elif class_match:
+            bases = [base.strip() for base in (class_match.group("bases") or "").split('&')]
+            bases = [base for base in bases if base]
+            symbol.update(
+                name=class_match.group("name"),
+                kind="class",
+                signature=class_match.group("name"),
+                line=declaration_line,
+                bases=bases,
+                )
+            if bases:
+                symbol["signature"] += " < " + " & ".join(bases)
+
+    # L'aide MATLAB d'une fonction ou d'une classe suit la déclaration;
+    # à défaut, les commentaires qui la précèdent sont utilisés
+    if symbol["kind"] != "script" and trailing:
+        docstring = _format_docstring(trailing)
+    else:
+        docstring = _format_docstring(leading)
+
+    symbol["docstring"] = docstring
+    symbol["summary"] = next(
+        (line.strip() for line in docstring.splitlines() if line.strip()), ""
+        )
+    return symbol
+
+
+def iter_documented_folders(structure: FolderNode,
+        parent_path: str = "",
+        parent_folder: str = ""
+        ) -> Iterator[tuple[str, str]]:
+    """
+    Parcourt les dossiers contenant des fichiers .m dans la structure.
+
+    Args:
+        structure: Nœud racine de la structure des dossiers (issu de
+            auto_doc_matlab.find_leaf_folders).
+        parent_path: Chemin du dossier parent en notation pointée.
+        parent_folder: Chemin relatif du dossier parent.
+
+    Yields:
+        Tuples (chemin relatif du dossier, chemin en notation pointée).
+    """
+    for module_path, relative_folder, node in structure.iter_folders(parent_path, parent_folder):
+        if node.has_m:
+            yield relative_folder, module_path
+
+
+def scan_folder_symbols(root_path: str, relative_folder: str, reader=read_header) -> list[dict]:
+    """
+    Lit l'en-tête de tous les fichiers .m d'un dossier.
+
+    Args:
+        root_path: Chemin du dossier racine du code.
+        relative_folder: Chemin du dossier, relatif à la racine.
+        reader: Fonction de lecture d'un fichier, de même signature que
+            read_header (ex: parse_cache.ParseCache.read_header).
+
+    Returns:
+        Liste des symboles du dossier, triée par nom. Le champ file
+        contient le chemin du fichier relatif à la racine (séparateur '/').
+    """
+    folder_path = os.path.join(root_path, relative_folder)
+    symbols = []
+
+    try:
+        with os.scandir(folder_path) as entries:
+            m_files = sorted(entry.name for entry in entries if entry.name.endswith('.m'))
+    except OSError:
+        return symbols
+
+    for filename in m_files:
+        symbol = reader(os.path.join(folder_path, filename))
+        if symbol is not None:
+            symbol["file"] = f"{relative_folder.replace(os.sep, '/')}/{filename}"
+            symbols.append(symbol)
+
+    symbols.sort(key=lambda symbol: symbol["name"])
+    return symbols
+
+
+def build_symbol_index(root_path: str, structure: FolderNode, reader=read_header) -> dict[str, list[dict]]:
+    """
+    Construit l'index des symboles de tous les dossiers documentés.
+
+    Args:
+        root_path: Chemin du dossier racine du code.
+        structure: Nœud racine de la structure des dossiers (issu de
+            auto_doc_matlab.find_leaf_folders).
+        reader: Fonction de lecture d'un fichier, de même signature que
+            read_header.
+
+    Returns:
+        Dictionnaire {chemin en notation pointée: liste des symboles}.
+    """
+    return {
+        module_path: scan_folder_symbols(root_path, relative_folder, reader)
+        for relative_folder, module_path in iter_documented_folders(structure)
+        }
+
+
+def public_symbols(symbols: Iterable[dict], module_path: str) -> list[dict]:
+    """
+    Filtre les symboles documentables d'un dossier.
+
+    Les scripts ne sont pas documentés, ni le contenu des dossiers
+    'private' que MATLAB rend inaccessibles depuis l'extérieur.
+
+    Args:
+        symbols: Symboles du dossier.
+        module_path: Chemin du dossier en notation pointée.
+
+    Returns:
+        Liste des symboles publics (fonctions et classes).
+    """
+    if module_path.rsplit('.', 1)[-1] == "private":
+        return []
+    return [symbol for symbol in symbols if symbol["kind"] in PUBLIC_KINDS]
+
+
+def documented_modules(symbol_index: dict[str, list[dict]]) -> set[str]:
+    """
+    Calcule l'ensemble des dossiers ayant au moins un symbole public
+    dans leur sous-arborescence.
+
+    Args:
+        symbol_index: Index des symboles (issu de build_symbol_index).
+
+    Returns:
+        Ensemble des chemins en notation pointée des dossiers à documenter,
+        y compris leurs dossiers parents.
+    """
+    modules = set()
+    for module_path, symbols in symbol_index.items():
+        if not public_symbols(symbols, module_path):
+            continue
+        parts = module_path.split('.')
+        for depth in range(len(parts), 0, -1):
+            prefix = '.'.join(parts[:depth])
+            if prefix in modules:
+                break
+            modules.add(prefix)
+    return modules
+
+
+def prune_structure(structure: FolderNode,
+        symbol_index: dict[str, list[dict]],
+        parent_path: str = ""
+        ) -> FolderNode:
+    """
+    Retire de la structure les dossiers sans symbole public.
+
+    Un dossier terminal sans symbole public est supprimé; un dossier mixte
+    sans symbole public devient un dossier parent. Les dossiers dont la
+    sous-arborescence ne contient aucun symbole public sont supprimés.
+
+    Args:
+        structure: Nœud racine de la structure des dossiers (issu de
+            auto_doc_matlab.find_leaf_folders).
+        symbol_index: Index des symboles (issu de build_symbol_index).
+        parent_path: Chemin du dossier parent en notation pointée.
+
+    Returns:
+        Nouveau nœud racine; les nœuds conservés sans changement sont
+        partagés avec la structure d'origine.
+    """
+    documented = documented_modules(symbol_index)
+    return FolderNode(
+        structure.name, structure.has_m,
+        _prune(structure, symbol_index, documented, parent_path)
+        )
+
+
+def _prune(structure: FolderNode,
+        symbol_index: dict,
+        documented: set[str],
+        parent_path: str
+        ) -> list[FolderNode]:
+    """
+    Implémentation récursive de prune_structure.
+
+    Args:
+        structure: Nœud dont les sous-dossiers sont à filtrer.
+        symbol_index: Index des symboles.
+        documented: Dossiers à conserver (issu de documented_modules).
+        parent_path: Chemin du nœud en notation pointée.
+
+    Returns:
+        Liste des nœuds des sous-dossiers conservés.
+    """
+    pruned = []
+    for node in structure.children:
+        module_path = f"{parent_path}.{node.name}" if parent_path else node.name
+        if module_path not in documented:
+            continue
+
+        if node.is_leaf:
+            pruned.append(node)
+            continue
+
+        has_public = bool(public_symbols(symbol_index.get(module_path, []), module_path))
+        children = _prune(node, symbol_index, documented, module_path)
+        pruned.append(FolderNode(node.name, node.has_m and has_public, children))
+    return pruned
+
+
+def iter_member_directives(module_path: str, symbols: Iterable[dict]) -> Iterator[str]:
+    """
+    Produit les directives autodoc explicites des symboles publics d'un dossier.
+
+    Args:
+        module_path: Chemin du dossier en notation pointée.
+        symbols: Symboles du dossier.
+
+    Yields:
+        Lignes RST des directives autofunction/autoclass.
+    """
+    for symbol in public_symbols(symbols, module_path):
+        if symbol["kind"] == "class":
+            yield f".. autoclass:: {module_path}.{symbol['name']}"
+            yield "   :members:"
+        else:
+            yield f".. autofunction:: {module_path}.{symbol['name']}"
+        yield ""
+
+
+def _escape_rst(text: str) -> str:
+    """
+    Protège les caractères de balisage RST d'un texte libre.
+
+    Args:
+        text: Texte à insérer tel quel (ex: résumé d'un symbole).
+
+    Returns:
+        Texte dont les caractères '\\', '*', '`', '|' et '_' sont échappés.
+    """
+    return re.sub(r'([\\*`|_])', r'\\\1', text)
+
+
+def iter_summary_table(module_path: str, symbols: Iterable[dict]) -> Iterator[str]:
+    """
+    Produit le tableau récapitulatif des symboles publics d'un dossier.
+
+    Chaque ligne contient un lien vers la documentation du symbole et son
+    résumé (première ligne de son aide), sans les directives autodoc: le
+    tableau reste léger quel que soit le nombre de symboles.
+
+    Args:
+        module_path: Chemin du dossier en notation pointée.
+        symbols: Symboles du dossier.
+
+    Yields:
+        Lignes RST de la directive list-table.
+    """
+    yield ".. list-table::"
+    yield "   :widths: 30 70"
+    yield ""
+    for symbol in public_symbols(symbols, module_path):
+        role = "class" if symbol["kind"] == "class" else "func"
+        yield f"   * - :mat:{role}:`~{module_path}.{symbol['name']}`"
+        summary = _escape_rst(symbol.get("summary", ""))
+        yield f"     - {summary}" if summary else "     -"
+    yield ""
+
+
+def symbol_index_path_for(output_file: str) -> str:
+    """
+    Construit le chemin de l'index des symboles associé à un fichier RST.
+
+    Args:
+        output_file: Chemin du fichier RST généré.
+
+    Returns:
+        Chemin du fichier JSON de l'index, à côté du fichier de sortie.
+    """
+    directory, filename = os.path.split(os.path.abspath(output_file))
+    stem = os.path.splitext(filename)[0]
+    return os.path.join(directory, f".{stem}.symbols.json")
+
+
+def write_symbol_index(symbol_index: dict[str, list[dict]], index_file: str) -> bool:
+    """
+    Enregistre l'index des symboles au format JSON.
+
+    Args:
+        symbol_index: Index des symboles (issu de build_symbol_index).
+        index_file: Chemin du fichier JSON.
+
+    Returns:
+        True si le fichier a été créé ou modifié, False s'il était
+        déjà à jour.
+    """
+    data = {"version": INDEX_VERSION, "modules": symbol_index}
+    return write_lines_if_changed(
+        index_file, [json.dumps(data, ensure_ascii=False, separators=(',', ':'))]
+        )
+
+
+def load_symbol_index(index_file: str) -> dict[str, list[dict]]:
+    """
+    Charge un index des symboles enregistré par write_symbol_index.
+
+    Args:
+        index_file: Chemin du fichier JSON.
+
+    Returns:
+        Index des symboles, ou dictionnaire vide si le fichier est absent,
+        illisible ou d'un autre format.
+    """
+    try:
+        with open(index_file, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+    if not isinstance(data, dict) or data.get("version") != INDEX_VERSION:
+        return {}
+    return data.get("modules", {})
+
+
+def main() -> None:
+    """
+    Point d'entrée en ligne de commande: écrit l'index des symboles
+    d'une arborescence MATLAB.
+    """
+    from auto_doc_matlab import find_leaf_folders
+    from scan_rules import ScanRules
+
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("code_path", help="Dossier racine du code MATLAB")
+    parser.add_argument("index_file", help="Fichier JSON de l'index à écrire")
+    args = parser.parse_args()
+
+    structure = find_leaf_folders(args.code_path, rules=ScanRules.from_options(args.code_path))
+    symbol_index = build_symbol_index(args.code_path, structure)
+    write_symbol_index(symbol_index, args.index_file)
+
+    count = sum(len(symbols) for symbols in symbol_index.values())
+    print(f"Index {args.index_file}: {count} symbole(s) dans {len(symbol_index)} dossier(s)")
+
+
+if __name__ == "__main__":
+    main()
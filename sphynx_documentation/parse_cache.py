@@ -0,0 +1,261 @@
+"""
+Ce module fournit un cache d'analyse des fichiers MATLAB (.m) adressé par
+leur contenu.
+
+Chaque fichier analysé est identifié par l'empreinte SHA-256 de son nom
+et de son contenu: un fichier identique d'une version à l'autre n'est
+analysé qu'une seule fois, quel que soit le nombre de versions (tags)
+construites. Le cache est un dossier partagé, situé hors des copies de
+travail créées par sphinx-multiversion.
+
+Le module est aussi une extension Sphinx: ajouté à la liste 'extensions'
+de conf.py, il déclare l'option 'matlab_parse_cache_dir'. L'index des
+symboles de 'matlab_src_dir' n'est construit qu'à la demande (voir
+symbol_index_for), par les extensions qui en ont besoin.
+
+Limite: le cache ne sert qu'aux outils de ce dépôt qui lisent les en-têtes
+(index des symboles de auto_doc_extension avec
+matlab_autogen_explicit_members, auto_doc_matlab --parse-cache-dir,
+audit_doc, preview_doc). sphinxcontrib-matlabdomain analyse lui-même les
+fichiers .m des directives automodule/autofunction et ne passe pas par ce
+cache: avec la configuration livrée (directives automodule), chaque
+version construite analyse encore tous ses fichiers .m.
+"""
+
+import hashlib
+import json
+import os
+import tempfile
+import weakref
+
+from folder_tree import FolderNode
+from matlab_symbols import build_symbol_index, parse_header
+
+# Version du format des entrées du cache
+CACHE_VERSION = 1
+
+# Variable d'environnement permettant de choisir le dossier du cache
+CACHE_DIR_ENV = "MATLAB_PARSE_CACHE_DIR"
+
+
+def default_cache_dir() -> str:
+    """
+    Détermine le dossier du cache par défaut.
+
+    Returns:
+        Valeur de la variable d'environnement MATLAB_PARSE_CACHE_DIR si elle
+        est définie, sinon un dossier du cache utilisateur
+        (~/.cache/documentation_sphynx/matlab_parse).
+    """
+    if os.environ.get(CACHE_DIR_ENV):
+        return os.environ[CACHE_DIR_ENV]
+    base = os.environ.get("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache")
+    return os.path.join(base, "documentation_sphynx", "matlab_parse")
+
+
+class ParseCache:
+    """
+    Cache persistant des analyses d'en-tête de fichiers .m.
+
+    Les entrées sont des fichiers JSON nommés d'après l'empreinte du
+    fichier analysé et répartis en sous-dossiers (<xx>/<empreinte>.json).
+    Chaque entrée est écrite par renommage atomique: plusieurs processus
+    (versions construites en parallèle) peuvent partager le même dossier.
+
+    Attributes:
+        cache_dir: Dossier du cache.
+        hits: Nombre de fichiers servis depuis le cache.
+        misses: Nombre de fichiers analysés.
+    """
+
+    def __init__(self, cache_dir: str | None = None) -> None:
+        """
+        Args:
+            cache_dir: Dossier du cache. Par défaut, voir default_cache_dir.
+        """
+        self.cache_dir = cache_dir or default_cache_dir()
+        self.hits = 0
+        self.misses = 0
+
+    def _entry_path(self, key: str) -> str:
+        """
+        Construit le chemin de l'entrée associée à une empreinte.
+
+        Args:
+            key: Empreinte hexadécimale.
+
+        Returns:
+            Chemin du fichier JSON de l'entrée.
+        """
+        return os.path.join(self.cache_dir, key[:2], f"{key}.json")
+
+    @staticmethod
+    def content_key(name: str, content: bytes) -> str:
+        """
+        Calcule l'empreinte d'un fichier .m.
+
+        Le nom du fichier fait partie de l'empreinte car MATLAB expose une
+        fonction sous le nom de son fichier.
+
+        Args:
+            name: Nom du fichier sans extension.
+            content: Contenu brut du fichier.
+
+        Returns:
+            Empreinte SHA-256 hexadécimale.
+        """
+        digest = hashlib.sha256(name.encode('utf-8'))
+        digest.update(b'\0')
+        digest.update(content)
+        return digest.hexdigest()
+
+    def get(self, key: str) -> dict | None:
+        """
+        Lit une entrée du cache.
+
+        Args:
+            key: Empreinte du fichier (voir content_key).
+
+        Returns:
+            Symbole enregistré, ou None si l'entrée est absente ou illisible.
+        """
+        try:
+            with open(self._entry_path(key), 'r', encoding='utf-8') as f:
+                entry = json.load(f)
+        except (OSError, ValueError):
+            return None
+
+        if not isinstance(entry, dict) or entry.get("version") != CACHE_VERSION:
+            return None
+        return entry.get("symbol")
+
+    def put(self, key: str, symbol: dict) -> None:
+        """
+        Enregistre une entrée dans le cache.
+
+        Les erreurs d'écriture sont ignorées: le cache n'est qu'une
+        optimisation.
+
+        Args:
+            key: Empreinte du fichier (voir content_key).
+            symbol: Symbole à enregistrer.
+        """
+        entry_path = self._entry_path(key)
+        try:
+            os.makedirs(os.path.dirname(entry_path), exist_ok=True)
+            fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(entry_path), suffix=".tmp")
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                json.dump({"version": CACHE_VERSION, "symbol": symbol}, f, ensure_ascii=False)
+            os.replace(tmp_path, entry_path)
+        except OSError:
+            pass
+
+    def read_header(self, path: str) -> dict | None:
+        """
+        Lit l'en-tête d'un fichier .m, depuis le cache si son contenu est connu.
+
+        Remplace matlab_symbols.read_header (même signature). Le fichier est
+        lu en entier pour calculer son empreinte, mais n'est analysé que
+        s'il est absent du cache.
+
+        Args:
+            path: Chemin du fichier .m.
+
+        Returns:
+            Symbole décrit par matlab_symbols.parse_header, ou None si le
+            fichier n'est pas lisible.
+        """
+        name = os.path.splitext(os.path.basename(path))[0]
+        try:
+            with open(path, 'rb') as f:
+                content = f.read()
+        except OSError:
+            return None
+
+        key = self.content_key(name, content)
+        symbol = self.get(key)
+        if symbol is not None:
+            self.hits += 1
+            return symbol
+
+        self.misses += 1
+        text = content.decode('utf-8', errors='replace')
+        symbol = parse_header(text.splitlines(keepends=True), name)
+        self.put(key, symbol)
+        return symbol
+
+
+# Index des symboles déjà construits, par application Sphinx
+_symbol_indexes = weakref.WeakKeyDictionary()
+
+
+def symbol_index_for(app, structure: FolderNode | None = None) -> dict | None:
+    """
+    Construit, une seule fois par construction et seulement à la demande,
+    l'index des symboles de 'matlab_src_dir' à partir du cache.
+
+    Les extensions locales (ex: auto_doc_extension avec
+    matlab_autogen_explicit_members) l'obtiennent par cette fonction afin
+    de ne pas relire les fichiers .m une seconde fois. L'analyse propre à
+    sphinxcontrib-matlabdomain n'utilise pas cet index (voir le module).
+
+    Args:
+        app: Application Sphinx.
+        structure: Structure des dossiers déjà calculée (issue de
+            auto_doc_matlab.find_leaf_folders). Par défaut, l'arborescence
+            est parcourue.
+
+    Returns:
+        Index des symboles, ou None si 'matlab_src_dir' n'est pas défini.
+    """
+    if app in _symbol_indexes:
+        return _symbol_indexes[app]
+
+    from sphinx.util import logging
+
+    from auto_doc_matlab import find_leaf_folders
+    from scan_rules import ScanRules
+
+    logger = logging.getLogger(__name__)
+    src_dir = getattr(app.config, "matlab_src_dir", None)
+    if not src_dir or not os.path.isdir(src_dir):
+        return None
+
+    cache = ParseCache(app.config.matlab_parse_cache_dir)
+    if structure is None:
+        # Mêmes règles de parcours que l'extension auto_doc_extension
+        rules = ScanRules.from_options(
+            src_dir,
+            getattr(app.config, "matlab_autogen_exclude", ()),
+            max_depth=getattr(app.config, "matlab_autogen_max_depth", None),
+            follow_symlinks=getattr(app.config, "matlab_autogen_follow_symlinks", False),
+            )
+        structure = find_leaf_folders(src_dir, rules=rules)
+    symbol_index = build_symbol_index(src_dir, structure, cache.read_header)
+
+    _symbol_indexes[app] = symbol_index
+
+    logger.info(f"Cache d'analyse MATLAB ({cache.cache_dir}): {cache.hits} fichier(s) "
+                f"réutilisé(s), {cache.misses} fichier(s) analysé(s)")
+    return symbol_index
+
+
+def setup(app) -> dict:
+    """
+    Point d'entrée de l'extension Sphinx.
+
+    Déclare l'option de configuration 'matlab_parse_cache_dir' (dossier du
+    cache, voir default_cache_dir par défaut).
+
+    Args:
+        app: Application Sphinx.
+
+    Returns:
+        Métadonnées de l'extension.
+    """
+    app.add_config_value("matlab_parse_cache_dir", None, "env")
+    return {
+        "version": str(CACHE_VERSION),
+        "parallel_read_safe": True,
+        "parallel_write_safe": True,
+    }
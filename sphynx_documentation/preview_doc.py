@@ -0,0 +1,568 @@
+"""
+Ce script lance un serveur local d'aperçu de la documentation MATLAB qui
+ne rend les pages des dossiers qu'à la demande.
+
+La page d'accueil présente la hiérarchie des dossiers trouvée par
+find_leaf_folders (avec le cache de parcours: seuls les dossiers modifiés
+sont relus). La page d'un dossier n'est rendue qu'à sa première
+consultation, puis conservée dans un cache LRU de taille bornée; elle est
+rendue à nouveau lorsque la date de modification du dossier ou de l'un de
+ses fichiers .m change.
+
+Lorsque Sphinx est installé, la page est produite par generate_rst_content
+et construite par sphinx-build avec la configuration du projet (conf.py),
+sans la génération complète de l'arborescence ni l'index de recherche.
+Sinon, ou si la construction échoue, la page est rendue directement à
+partir des en-têtes des fichiers .m (voir matlab_symbols).
+
+Exemple:
+    python preview_doc.py ../code_matlab --port 8000
+"""
+
+import argparse
+import html
+import os
+import subprocess
+import sys
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import Iterator
+from functools import partial
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+from importlib.util import find_spec
+from urllib.parse import unquote, urlsplit
+
+from auto_doc_matlab import find_leaf_folders, generate_rst_content, scan_folder
+from build_cache import load_config
+from folder_tree import FolderNode
+from matlab_symbols import public_symbols, scan_folder_symbols
+from parse_cache import ParseCache
+from rst_writer import write_lines_if_changed
+from scan_cache import ScanCache
+from scan_rules import ScanRules
+
+# Nombre de pages rendues conservées en mémoire
+MAX_PAGES = 64
+
+# Délai minimal entre deux parcours de l'arborescence déclenchés par des
+# requêtes, en secondes
+REFRESH_INTERVAL = 2.0
+
+# Extensions de conf.py désactivées pour l'aperçu: génération de toute
+# l'arborescence, index des symboles, index de recherche et versions
+SKIPPED_EXTENSIONS = ("auto_doc_extension", "parse_cache", "search_shards", "sphinx_multiversion")
+
+
+def folder_stamp(folder_path: str) -> tuple:
+    """
+    Calcule l'état d'un dossier dont dépend le rendu de sa page.
+
+    Args:
+        folder_path: Chemin du dossier.
+
+    Returns:
+        Tuple (date de modification du dossier, (nom, date de modification,
+        taille) de chaque fichier .m), ou un tuple vide si le dossier
+        n'est pas lisible.
+    """
+    try:
+        mtime_ns = os.stat(folder_path).st_mtime_ns
+        with os.scandir(folder_path) as entries:
+            files = sorted(
+                (entry.name, entry.stat().st_mtime_ns, entry.stat().st_size)
+                for entry in entries if entry.name.endswith('.m') and entry.is_file()
+                )
+    except OSError:
+        return ()
+    return mtime_ns, tuple(files)
+
+
+class PageCache:
+    """
+    Cache LRU des pages rendues, invalidé par l'état des dossiers.
+
+    Attributes:
+        max_pages: Nombre maximal de pages conservées.
+        hits: Nombre de pages servies depuis le cache.
+        misses: Nombre de pages rendues.
+    """
+
+    def __init__(self, max_pages: int = MAX_PAGES) -> None:
+        """
+        Args:
+            max_pages: Nombre maximal de pages conservées.
+        """
+        self.max_pages = max_pages
+        self.hits = 0
+        self.misses = 0
+        self._pages = OrderedDict()
+
+    def get(self, key: str, stamp: tuple) -> str | None:
+        """
+        Lit une page si elle a été rendue pour le même état du dossier.
+
+        Args:
+            key: Chemin du dossier en notation pointée.
+            stamp: État du dossier (voir folder_stamp).
+
+        Returns:
+            Contenu HTML de la page, ou None s'il faut la rendre.
+        """
+        entry = self._pages.get(key)
+        if entry is None or entry[0] != stamp:
+            self.misses += 1
+            return None
+        self._pages.move_to_end(key)
+        self.hits += 1
+        return entry[1]
+
+    def put(self, key: str, stamp: tuple, content: str) -> None:
+        """
+        Enregistre une page et retire les moins récemment consultées.
+
+        Args:
+            key: Chemin du dossier en notation pointée.
+            stamp: État du dossier lors du rendu.
+            content: Contenu HTML de la page.
+        """
+        self._pages[key] = (stamp, content)
+        self._pages.move_to_end(key)
+        while len(self._pages) > self.max_pages:
+            self._pages.popitem(last=False)
+
+
+def iter_page_rst_lines(node: FolderNode, module_path: str, symbol_index: dict | None = None) -> Iterator[str]:
+    """
+    Produit le fichier RST de l'aperçu d'un dossier.
+
+    Les fonctions locales du dossier sont décrites par generate_rst_content
+    (sans ses sous-dossiers), suivies de liens vers les pages des
+    sous-dossiers et vers la hiérarchie.
+
+    Args:
+        node: Nœud du dossier.
+        module_path: Chemin du dossier en notation pointée.
+        symbol_index: Index des symboles optionnel (voir
+            auto_doc_matlab.iter_local_members).
+
+    Yields:
+        Lignes du fichier RST, sans caractère de fin de ligne.
+    """
+    parent_path = module_path.rpartition('.')[0]
+    yield ":orphan:"
+    yield ""
+    yield from generate_rst_content(
+        FolderNode("", False, [FolderNode(node.name, node.has_m)]), 0, parent_path, symbol_index
+        )
+    for child in node.children:
+        yield f"* `{child.name} <{module_path}.{child.name}.html>`__"
+    yield ""
+    yield "`Hiérarchie des dossiers </>`__"
+    yield ""
+
+
+def render_plain(node: FolderNode, module_path: str, symbols: list[dict]) -> str:
+    """
+    Rend la page d'un dossier sans Sphinx, à partir des en-têtes des fichiers .m.
+
+    Args:
+        node: Nœud du dossier.
+        module_path: Chemin du dossier en notation pointée.
+        symbols: Symboles du dossier (voir matlab_symbols.scan_folder_symbols).
+
+    Returns:
+        Contenu HTML de la page.
+    """
+    parts = [f'<p><a href="/">Hiérarchie des dossiers</a> / {html.escape(module_path)}</p>',
+             f"<h1>{html.escape(node.name)}</h1>"]
+    for symbol in public_symbols(symbols, module_path):
+        parts.append(f'<h2 id="{html.escape(symbol["name"])}"><code>{html.escape(symbol["signature"])}</code></h2>')
+        parts.append(f'<p><small>{html.escape(symbol["file"])}:{symbol["line"]}</small></p>')
+        parts.append(f"<pre>{html.escape(symbol['docstring'])}</pre>")
+    if node.children:
+        parts.append("<h2>Sous-dossiers</h2><ul>")
+        parts.extend(
+            f'<li><a href="{html.escape(module_path)}.{html.escape(child.name)}.html">'
+            f"{html.escape(child.name)}</a></li>"
+            for child in node.children
+            )
+        parts.append("</ul>")
+    return _html_document(module_path, "\n".join(parts))
+
+
+def _html_document(title: str, body: str) -> str:
+    """
+    Construit une page HTML minimale.
+
+    Args:
+        title: Titre de la page.
+        body: Contenu HTML du corps.
+
+    Returns:
+        Document HTML complet.
+    """
+    return (f'<!DOCTYPE html>\n<html lang="fr"><head><meta charset="utf-8">'
+            f"<title>{html.escape(title)}</title></head>\n<body>\n{body}\n</body></html>\n")
+
+
+class SphinxRenderer:
+    """
+    Construit les pages de l'aperçu avec sphinx-build et la configuration du projet.
+
+    Les pages sont écrites dans un dossier source propre à l'aperçu; chaque
+    construction est incrémentale et ne porte que sur la page demandée. Les
+    constructions partagent les dossiers de sortie et l'environnement
+    Sphinx: elles sont exécutées l'une après l'autre.
+
+    Attributes:
+        conf_dir: Dossier contenant conf.py.
+        source_dir: Dossier source de l'aperçu.
+        output_dir: Dossier de sortie HTML (sert aussi les fichiers statiques).
+        extensions: Extensions de conf.py conservées pour l'aperçu.
+    """
+
+    def __init__(self, conf_dir: str, work_dir: str, code_path: str) -> None:
+        """
+        Args:
+            conf_dir: Dossier contenant conf.py.
+            work_dir: Dossier de travail de l'aperçu.
+            code_path: Dossier racine du code MATLAB (remplace matlab_src_dir).
+        """
+        self.conf_dir = os.path.abspath(conf_dir)
+        self.source_dir = os.path.join(work_dir, "source")
+        self.output_dir = os.path.join(work_dir, "html")
+        self._doctree_dir = os.path.join(work_dir, "doctrees")
+        self._code_path = code_path
+        self._lock = threading.Lock()
+
+        extensions = load_config(self.conf_dir).get("extensions", [])
+        self.extensions = [name for name in extensions if name not in SKIPPED_EXTENSIONS]
+
+        os.makedirs(self.source_dir, exist_ok=True)
+        write_lines_if_changed(os.path.join(self.source_dir, "index.rst"), ["Aperçu", "======", ""])
+
+    def render(self, node: FolderNode, module_path: str, symbol_index: dict | None = None) -> str | None:
+        """
+        Construit la page d'un dossier.
+
+        Args:
+            node: Nœud du dossier.
+            module_path: Chemin du dossier en notation pointée.
+            symbol_index: Index des symboles optionnel (voir iter_page_rst_lines).
+
+        Returns:
+            Contenu HTML de la page, ou None si la construction a échoué ou
+            si aucune extension n'est conservée ('-D extensions=' vide
+            désignerait une extension sans nom, et les directives MATLAB
+            ne seraient pas reconnues).
+        """
+        if not self.extensions:
+            return None
+
+        page_path = os.path.join(self.source_dir, f"{module_path}.rst")
+        command = [
+            sys.executable, "-m", "sphinx", "-b", "html", "-q",
+            "-c", self.conf_dir, "-d", self._doctree_dir,
+            "-D", f"extensions={','.join(self.extensions)}",
+            "-D", f"matlab_src_dir={self._code_path}",
+            self.source_dir, self.output_dir, page_path,
+            ]
+
+        with self._lock:
+            # La page est toujours relue: un fichier .m modifié ne change pas son RST
+            if not write_lines_if_changed(page_path, iter_page_rst_lines(node, module_path, symbol_index)):
+                os.utime(page_path)
+            if subprocess.run(command).returncode != 0:
+                return None
+            try:
+                with open(os.path.join(self.output_dir, f"{module_path}.html"), 'r', encoding='utf-8') as f:
+                    return f.read()
+            except OSError:
+                return None
+
+
+class PreviewSite:
+    """
+    Contenu du serveur d'aperçu: hiérarchie des dossiers et pages rendues à la demande.
+
+    Attributes:
+        code_path: Dossier racine du code MATLAB.
+        renderer: Constructeur Sphinx, ou None pour le rendu sans Sphinx.
+        pages: Cache des pages rendues.
+        structure: Structure des dossiers du dernier parcours.
+    """
+
+    def __init__(self,
+            code_path: str,
+            work_dir: str,
+            renderer: SphinxRenderer | None = None,
+            explicit_members: bool = False,
+            max_pages: int = MAX_PAGES,
+            rules: ScanRules | None = None
+            ) -> None:
+        """
+        Args:
+            code_path: Dossier racine du code MATLAB.
+            work_dir: Dossier de travail (cache de parcours).
+            renderer: Constructeur Sphinx, ou None pour le rendu sans Sphinx.
+            explicit_members: True pour des directives autofunction/autoclass
+                explicites dans les pages construites par Sphinx.
+            max_pages: Nombre maximal de pages conservées en mémoire.
+            rules: Règles de parcours (voir scan_rules.ScanRules).
+        """
+        self.code_path = os.path.abspath(code_path)
+        self.renderer = renderer
+        self.pages = PageCache(max_pages)
+        self.structure = FolderNode("")
+        self._explicit_members = explicit_members
+        self._rules = rules if rules is not None else ScanRules.from_options(self.code_path)
+        self._scan_cache_file = os.path.join(work_dir, "scan.json")
+        self._parse_cache = ParseCache()
+        self._nodes = {}
+        self._refreshed_at = None
+        # Structure, nœuds et cache des pages (jamais pendant un parcours
+        # ou un rendu)
+        self._lock = threading.Lock()
+        # Un seul parcours à la fois
+        self._refresh_lock = threading.Lock()
+        # Un rendu à la fois par dossier
+        self._page_locks = {}
+        os.makedirs(work_dir, exist_ok=True)
+
+    def refresh(self, force: bool = True) -> bool:
+        """
+        Parcourt à nouveau l'arborescence (seuls les dossiers modifiés sont relus).
+
+        Les pages déjà rendues restent servies pendant le parcours.
+
+        Args:
+            force: Si False, le parcours est omis lorsque le précédent date
+                de moins de REFRESH_INTERVAL secondes (requêtes en rafale,
+                pages inconnues).
+
+        Returns:
+            True si l'arborescence a été parcourue.
+        """
+        with self._refresh_lock:
+            if (not force and self._refreshed_at is not None
+                    and time.monotonic() - self._refreshed_at < REFRESH_INTERVAL):
+                return False
+
+            cache = ScanCache(
+                self._scan_cache_file, self.code_path,
+                partial(scan_folder, follow_symlinks=self._rules.follow_symlinks),
+                rules=self._rules
+                )
+            structure = find_leaf_folders(self.code_path, cache=cache, rules=self._rules)
+            cache.save()
+            nodes = {
+                module_path: (relative_folder, node)
+                for module_path, relative_folder, node in structure.iter_folders()
+                }
+            with self._lock:
+                self.structure = structure
+                self._nodes = nodes
+            self._refreshed_at = time.monotonic()
+            return True
+
+    def index_html(self) -> str:
+        """
+        Rend la page d'accueil présentant la hiérarchie des dossiers.
+
+        Returns:
+            Contenu HTML de la page.
+        """
+        self.refresh(force=False)
+        with self._lock:
+            structure = self.structure
+        body = "\n".join(self._iter_tree_html(structure, ""))
+        return _html_document("Hiérarchie des dossiers", f"<h1>Hiérarchie des dossiers</h1>\n{body}")
+
+    def _iter_tree_html(self, structure: FolderNode, parent_path: str) -> Iterator[str]:
+        """
+        Produit la liste HTML imbriquée des dossiers.
+
+        Args:
+            structure: Nœud dont les sous-dossiers sont à afficher.
+            parent_path: Chemin du nœud en notation pointée.
+
+        Yields:
+            Fragments HTML.
+        """
+        if not structure.children:
+            return
+        yield "<ul>"
+        for node in structure.children:
+            module_path = f"{parent_path}.{node.name}" if parent_path else node.name
+            yield f'<li><a href="/{html.escape(module_path)}.html">{html.escape(node.name)}</a>'
+            yield from self._iter_tree_html(node, module_path)
+            yield "</li>"
+        yield "</ul>"
+
+    def page_html(self, module_path: str) -> str | None:
+        """
+        Fournit la page d'un dossier, rendue à la première demande.
+
+        Args:
+            module_path: Chemin du dossier en notation pointée.
+
+        Returns:
+            Contenu HTML de la page, ou None si le dossier n'existe pas.
+        """
+        with self._lock:
+            entry = self._nodes.get(module_path)
+        # Dossier inconnu: nouveau parcours, au plus un par REFRESH_INTERVAL
+        if entry is None and self.refresh(force=False):
+            with self._lock:
+                entry = self._nodes.get(module_path)
+        if entry is None:
+            return None
+
+        relative_folder, node = entry
+        with self._lock:
+            page_lock = self._page_locks.setdefault(module_path, threading.Lock())
+        with page_lock:
+            stamp = folder_stamp(os.path.join(self.code_path, relative_folder))
+            with self._lock:
+                content = self.pages.get(module_path, stamp)
+            if content is not None:
+                return content
+
+            started = time.perf_counter()
+            symbols = []
+            if node.has_m and (self.renderer is None or self._explicit_members):
+                symbols = scan_folder_symbols(self.code_path, relative_folder, self._parse_cache.read_header)
+
+            mode = "sphinx"
+            content = None
+            if self.renderer is not None:
+                symbol_index = {module_path: symbols} if self._explicit_members else None
+                content = self.renderer.render(node, module_path, symbol_index)
+            if content is None:
+                mode = "sans Sphinx"
+                if node.has_m and not symbols:
+                    symbols = scan_folder_symbols(
+                        self.code_path, relative_folder, self._parse_cache.read_header
+                        )
+                content = render_plain(node, module_path, symbols)
+
+            with self._lock:
+                self.pages.put(module_path, stamp, content)
+            print(f"{module_path}: page rendue en {time.perf_counter() - started:.2f} s ({mode})")
+            return content
+
+
+class PreviewHandler(SimpleHTTPRequestHandler):
+    """
+    Répond aux requêtes du serveur d'aperçu.
+
+    '/' présente la hiérarchie, '/<chemin.en.notation.pointee>.html' la page
+    d'un dossier; les autres chemins sont servis depuis le dossier de sortie
+    de Sphinx (fichiers statiques).
+    """
+
+    def __init__(self, *args, site: PreviewSite, **kwargs) -> None:
+        self.site = site
+        super().__init__(*args, **kwargs)
+
+    def do_GET(self) -> None:
+        """
+        Traite une requête GET.
+        """
+        path = unquote(urlsplit(self.path).path)
+        if path in ("/", "/index.html"):
+            self._send_html(self.site.index_html())
+            return
+
+        name = path.lstrip('/')
+        if name.endswith('.html') and '/' not in name:
+            content = self.site.page_html(name[:-len('.html')])
+            if content is not None:
+                self._send_html(content)
+                return
+        super().do_GET()
+
+    def _send_html(self, content: str) -> None:
+        """
+        Envoie une page HTML.
+
+        Args:
+            content: Contenu HTML.
+        """
+        data = content.encode('utf-8')
+        self.send_response(200)
+        self.send_header("Content-Type", "text/html; charset=utf-8")
+        self.send_header("Content-Length", str(len(data)))
+        self.send_header("Cache-Control", "no-cache")
+        self.end_headers()
+        self.wfile.write(data)
+
+
+def main() -> None:
+    """
+    Point d'entrée en ligne de commande.
+    """
+    base_dir = os.path.dirname(os.path.abspath(__file__))
+
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("code_path", nargs="?", default=os.path.join(base_dir, "..", "code_matlab"),
+                        help="Dossier racine du code MATLAB")
+    parser.add_argument("--source-dir", default=os.path.join(base_dir, "source"),
+                        help="Dossier source Sphinx (contenant conf.py)")
+    parser.add_argument("--work-dir", default=os.path.join(base_dir, ".build_cache", "preview"),
+                        help="Dossier de travail de l'aperçu")
+    parser.add_argument("--host", default="127.0.0.1", help="Adresse d'écoute")
+    parser.add_argument("--port", type=int, default=8000, help="Port d'écoute")
+    parser.add_argument("--max-pages", type=int, default=MAX_PAGES,
+                        help="Nombre de pages rendues conservées en mémoire")
+    parser.add_argument("--explicit-members", action="store_true",
+                        help="Directives autofunction/autoclass explicites")
+    parser.add_argument("--no-sphinx", action="store_true",
+                        help="Rendre les pages sans Sphinx, à partir des en-têtes des fichiers .m")
+    parser.add_argument("--exclude", action="append", default=[],
+                        help="Motif de dossiers à exclure (format .gitignore, répétable)")
+    parser.add_argument("--ignore-file",
+                        help="Fichier de motifs (par défaut: .matlabdocignore du code)")
+    args = parser.parse_args()
+
+    if not os.path.isdir(args.code_path):
+        print(f"Erreur: Le dossier {args.code_path} n'existe pas")
+        raise SystemExit(1)
+
+    renderer = None
+    if args.no_sphinx:
+        print("Rendu sans Sphinx")
+    elif find_spec("sphinx") is None or not os.path.isfile(os.path.join(args.source_dir, "conf.py")):
+        print("Sphinx ou conf.py introuvable: rendu sans Sphinx")
+    else:
+        renderer = SphinxRenderer(args.source_dir, args.work_dir, os.path.abspath(args.code_path))
+        if not renderer.extensions:
+            print("Aucune extension de conf.py conservée pour l'aperçu: rendu sans Sphinx")
+            renderer = None
+
+    site = PreviewSite(
+        args.code_path,
+        args.work_dir,
+        renderer,
+        explicit_members=args.explicit_members,
+        max_pages=args.max_pages,
+        rules=ScanRules.from_options(args.code_path, args.exclude, args.ignore_file),
+        )
+    site.refresh()
+
+    static_dir = os.path.join(args.work_dir, "html")
+    os.makedirs(static_dir, exist_ok=True)
+    handler = partial(PreviewHandler, site=site, directory=static_dir)
+    server = ThreadingHTTPServer((args.host, args.port), handler)
+    print(f"Aperçu de {site.code_path} sur http://{args.host}:{server.server_port}/")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
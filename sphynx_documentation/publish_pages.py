@@ -0,0 +1,336 @@
+"""
+Ce script publie le site construit par build_versions.py sur la branche
+gh-pages en ne transférant que les fichiers modifiés.
+
+Un manifeste (.publish_manifest.json, publié à la racine de la branche)
+associe chaque fichier du site à son empreinte d'objet git. Le manifeste du
+site construit est comparé à celui du dernier commit de la branche: seuls
+les fichiers ajoutés ou modifiés sont copiés dans une copie de travail
+gh-pages (git worktree, sans extraction des autres fichiers) et ajoutés à
+l'index, les fichiers supprimés en sont retirés, puis un commit est créé
+sur la branche. Les empreintes des fichiers construits sont mémorisées
+(taille et date de modification) dans build/.publish_state.json: seuls les
+fichiers nouveaux ou modifiés sont relus.
+
+Les chemins du site sont relatifs à la racine de la branche (quel que soit
+le dossier du dépôt d'où le script est lancé) et transmis à git comme des
+chemins littéraux: un nom de fichier contenant '*' ou ':' n'est jamais
+interprété comme un motif. Une branche locale en retard sur la branche
+distante (dernier 'git fetch') est d'abord avancée.
+
+Exemple:
+    python publish_pages.py --push
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import shutil
+import subprocess
+
+from git_tree import run_git
+
+# Version du format du manifeste et de l'état local
+MANIFEST_VERSION = 1
+
+# Manifeste publié à la racine de la branche
+MANIFEST_NAME = ".publish_manifest.json"
+
+# Empreintes des fichiers construits, dans le dossier de sortie (non publié)
+STATE_NAME = ".publish_state.json"
+
+# Fichier indiquant à GitHub Pages de ne pas traiter le site avec Jekyll
+# (sinon les dossiers _static, _sources et _assets ne sont pas servis)
+NOJEKYLL_NAME = ".nojekyll"
+
+# Objet arbre vide de git
+_EMPTY_TREE = "4b825dc642cb6eb9a060e54bf8d69288fbee4904"
+
+
+def blob_digest(path: str) -> str:
+    """
+    Calcule l'empreinte d'objet git d'un fichier (comme 'git hash-object').
+
+    Args:
+        path: Chemin du fichier.
+
+    Returns:
+        Empreinte SHA-1 hexadécimale.
+    """
+    with open(path, 'rb') as f:
+        data = f.read()
+    digest = hashlib.sha1(f"blob {len(data)}\0".encode('ascii'))
+    digest.update(data)
+    return digest.hexdigest()
+
+
+def site_manifest(build_dir: str) -> dict[str, str]:
+    """
+    Calcule le manifeste du site construit.
+
+    Les fichiers cachés de la racine (manifestes locaux) ne sont pas
+    publiés. Un fichier dont la taille et la date de modification sont
+    celles de l'état local enregistré n'est pas relu.
+
+    Args:
+        build_dir: Dossier de sortie contenant les versions.
+
+    Returns:
+        Dictionnaire {chemin relatif (séparateur '/'): empreinte d'objet git}.
+    """
+    state_path = os.path.join(build_dir, STATE_NAME)
+    try:
+        with open(state_path, 'r', encoding='utf-8') as f:
+            state = json.load(f)
+        if state.get("version") != MANIFEST_VERSION:
+            state = {}
+    except (OSError, ValueError):
+        state = {}
+    previous = state.get("files", {})
+
+    manifest = {}
+    files = {}
+    for folder_path, folders, filenames in os.walk(build_dir):
+        folders.sort()
+        root = folder_path == build_dir
+        for filename in filenames:
+            if root and filename.startswith('.'):
+                continue
+            path = os.path.join(folder_path, filename)
+            relative = os.path.relpath(path, build_dir).replace(os.sep, '/')
+            stat = os.stat(path)
+            known = previous.get(relative)
+            if known is not None and known[:2] == [stat.st_size, stat.st_mtime_ns]:
+                digest = known[2]
+            else:
+                digest = blob_digest(path)
+            manifest[relative] = digest
+            files[relative] = [stat.st_size, stat.st_mtime_ns, digest]
+
+    tmp_path = f"{state_path}.tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump({"version": MANIFEST_VERSION, "files": files}, f)
+    os.replace(tmp_path, state_path)
+    return manifest
+
+
+def published_manifest(repo_path: str, branch: str) -> dict[str, str]:
+    """
+    Lit le manifeste du dernier commit de la branche publiée.
+
+    Sans manifeste (branche publiée autrement), il est reconstruit à partir
+    de l'arbre du commit.
+
+    Args:
+        repo_path: Chemin du dépôt git.
+        branch: Branche publiée.
+
+    Returns:
+        Dictionnaire {chemin relatif: empreinte d'objet git}, sans le
+        manifeste lui-même ni .nojekyll.
+    """
+    try:
+        data = json.loads(run_git(repo_path, "show", f"{branch}:{MANIFEST_NAME}"))
+        if data.get("version") == MANIFEST_VERSION:
+            return data["files"]
+    except (subprocess.CalledProcessError, ValueError, KeyError):
+        pass
+
+    manifest = {}
+    output = run_git(
+        repo_path, "ls-tree", "-r", "-z", "--full-tree", branch
+        ).decode('utf-8', errors='surrogateescape')
+    for record in output.split('\0'):
+        if not record:
+            continue
+        header, path = record.split('\t', 1)
+        _, object_type, oid = header.split(' ')
+        if object_type == "blob" and path not in (MANIFEST_NAME, NOJEKYLL_NAME):
+            manifest[path] = oid
+    return manifest
+
+
+def diff_manifests(previous: dict[str, str], current: dict[str, str]) -> tuple[list[str], list[str]]:
+    """
+    Compare deux manifestes.
+
+    Args:
+        previous: Manifeste publié.
+        current: Manifeste du site construit.
+
+    Returns:
+        Tuple (fichiers ajoutés ou modifiés, fichiers supprimés), triés.
+    """
+    changed = sorted(path for path, digest in current.items() if previous.get(path) != digest)
+    removed = sorted(previous.keys() - current.keys())
+    return changed, removed
+
+
+def _pathspec(paths: list[str]) -> bytes:
+    """
+    Construit une liste de chemins pour l'option --pathspec-file-nul de git
+    (à utiliser avec --literal-pathspecs).
+
+    Args:
+        paths: Chemins relatifs (séparateur '/').
+
+    Returns:
+        Chemins séparés par des caractères nuls.
+    """
+    return "\0".join(paths).encode('utf-8', errors='surrogateescape')
+
+
+def _ensure_branch(repo_path: str, branch: str, remote: str) -> None:
+    """
+    Crée la branche locale publiée si elle n'existe pas, à partir de la
+    branche distante ou d'un commit initial vide, ou l'avance jusqu'à la
+    branche distante si elle est en retard.
+
+    Args:
+        repo_path: Chemin du dépôt git.
+        branch: Branche publiée.
+        remote: Dépôt distant.
+
+    Raises:
+        RuntimeError: Si la branche locale et la branche distante ont
+            divergé.
+    """
+    def resolve(ref: str) -> str | None:
+        try:
+            return run_git(repo_path, "rev-parse", "--verify", "--quiet", ref).decode('ascii').strip()
+        except subprocess.CalledProcessError:
+            return None
+
+    def is_ancestor(ancestor: str, commit: str) -> bool:
+        try:
+            run_git(repo_path, "merge-base", "--is-ancestor", ancestor, commit)
+            return True
+        except subprocess.CalledProcessError:
+            return False
+
+    local = resolve(f"refs/heads/{branch}")
+    upstream = resolve(f"refs/remotes/{remote}/{branch}")
+    if local is not None:
+        if upstream is None or is_ancestor(upstream, local):
+            return
+        if not is_ancestor(local, upstream):
+            raise RuntimeError(
+                f"La branche {branch} a divergé de {remote}/{branch}: "
+                f"réconcilier les deux branches avant de publier"
+                )
+        run_git(repo_path, "update-ref", f"refs/heads/{branch}", upstream, local)
+        return
+    if upstream is not None:
+        run_git(repo_path, "branch", branch, upstream)
+        return
+    commit = run_git(repo_path, "commit-tree", _EMPTY_TREE, "-m", "Initialisation de la documentation publiée")
+    run_git(repo_path, "branch", branch, commit.decode('ascii').strip())
+
+
+def _open_worktree(repo_path: str, branch: str, worktree_dir: str) -> None:
+    """
+    Prépare une copie de travail de la branche publiée, sans extraire ses
+    fichiers: l'index reflète le dernier commit de la branche.
+
+    Args:
+        repo_path: Chemin du dépôt git.
+        branch: Branche publiée.
+        worktree_dir: Dossier de la copie de travail.
+    """
+    if not os.path.exists(os.path.join(worktree_dir, ".git")):
+        run_git(repo_path, "worktree", "prune")
+        os.makedirs(os.path.dirname(os.path.abspath(worktree_dir)), exist_ok=True)
+        run_git(repo_path, "worktree", "add", "--no-checkout", worktree_dir, branch)
+    run_git(worktree_dir, "read-tree", "HEAD")
+
+
+def publish(build_dir: str,
+        repo_path: str = ".",
+        branch: str = "gh-pages",
+        worktree_dir: str | None = None,
+        remote: str = "origin",
+        push: bool = False,
+        message: str = "Mise à jour de la documentation"
+        ) -> bool:
+    """
+    Publie les fichiers modifiés du site sur la branche gh-pages.
+
+    Args:
+        build_dir: Dossier de sortie contenant les versions.
+        repo_path: Chemin du dépôt git.
+        branch: Branche publiée.
+        worktree_dir: Copie de travail de la branche; par défaut,
+            .build_cache/<branche> à côté de ce script.
+        remote: Dépôt distant de la branche.
+        push: Si True, pousse le commit vers le dépôt distant.
+        message: Message du commit.
+
+    Returns:
+        True si un commit a été créé.
+    """
+    build_dir = os.path.abspath(build_dir)
+    if worktree_dir is None:
+        worktree_dir = os.path.join(os.path.dirname(os.path.abspath(__file__)), ".build_cache", branch)
+    worktree_dir = os.path.abspath(worktree_dir)
+
+    _ensure_branch(repo_path, branch, remote)
+    current = site_manifest(build_dir)
+    previous = published_manifest(repo_path, branch)
+    changed, removed = diff_manifests(previous, current)
+    if not changed and not removed:
+        print(f"{len(current)} fichier(s), aucune modification à publier")
+        return False
+
+    _open_worktree(repo_path, branch, worktree_dir)
+    for relative in changed:
+        target = os.path.join(worktree_dir, relative)
+        os.makedirs(os.path.dirname(target), exist_ok=True)
+        shutil.copyfile(os.path.join(build_dir, relative), target)
+    for relative in removed:
+        try:
+            os.remove(os.path.join(worktree_dir, relative))
+        except FileNotFoundError:
+            pass
+
+    with open(os.path.join(worktree_dir, MANIFEST_NAME), 'w', encoding='utf-8') as f:
+        json.dump({"version": MANIFEST_VERSION, "files": current}, f, indent=0, sort_keys=True)
+    open(os.path.join(worktree_dir, NOJEKYLL_NAME), 'w').close()
+
+    run_git(worktree_dir, "--literal-pathspecs", "add", "--force",
+            "--pathspec-from-file=-", "--pathspec-file-nul",
+            stdin=_pathspec([*changed, MANIFEST_NAME, NOJEKYLL_NAME]))
+    if removed:
+        run_git(worktree_dir, "--literal-pathspecs", "rm", "--quiet", "--cached", "--ignore-unmatch",
+                "--pathspec-from-file=-", "--pathspec-file-nul", stdin=_pathspec(removed))
+    run_git(worktree_dir, "commit", "--quiet", "--no-verify", "-m", message)
+    print(f"{len(changed)} fichier(s) ajouté(s) ou modifié(s), {len(removed)} supprimé(s), "
+          f"{len(current) - len(changed)} inchangé(s)")
+
+    if push:
+        run_git(worktree_dir, "push", remote, f"HEAD:refs/heads/{branch}")
+        print(f"Branche {branch} poussée vers {remote}")
+    return True
+
+
+def main() -> None:
+    """
+    Point d'entrée en ligne de commande.
+    """
+    base_dir = os.path.dirname(os.path.abspath(__file__))
+
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--build-dir", default=os.path.join(base_dir, "build"),
+                        help="Dossier de sortie contenant les versions")
+    parser.add_argument("--branch", default="gh-pages", help="Branche publiée")
+    parser.add_argument("--worktree", help="Copie de travail de la branche publiée")
+    parser.add_argument("--remote", default="origin", help="Dépôt distant")
+    parser.add_argument("--push", action="store_true", help="Pousser le commit vers le dépôt distant")
+    parser.add_argument("--message", default="Mise à jour de la documentation", help="Message du commit")
+    args = parser.parse_args()
+
+    publish(args.build_dir, base_dir, args.branch, args.worktree, args.remote, args.push, args.message)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,116 @@
+"""
+Ce module regroupe les fonctions d'écriture des fichiers générés pour Sphinx.
+
+Les fichiers sont écrits au fil de l'eau dans un fichier temporaire, puis
+substitués atomiquement au fichier existant uniquement si leur contenu a
+changé. Un fichier identique conserve ainsi sa date de modification, et
+Sphinx ne relit pas la page correspondante lors d'une construction
+incrémentale.
+"""
+
+import hashlib
+import os
+import tempfile
+from collections.abc import Iterable
+
+# Taille des blocs lus pour calculer l'empreinte d'un fichier existant
+_CHUNK_SIZE = 1024 * 1024
+
+# Masque de création des fichiers, lu une seule fois: os.umask ne permet pas
+# de le lire sans le modifier pour tout le processus (threads compris)
+_UMASK = os.umask(0)
+os.umask(_UMASK)
+
+
+def file_digest(path: str) -> str | None:
+    """
+    Calcule l'empreinte SHA-256 du contenu d'un fichier.
+
+    Args:
+        path: Chemin du fichier.
+
+    Returns:
+        Empreinte hexadécimale, ou None si le fichier n'existe pas
+        ou n'est pas lisible.
+    """
+    digest = hashlib.sha256()
+    try:
+        with open(path, 'rb') as f:
+            while chunk := f.read(_CHUNK_SIZE):
+                digest.update(chunk)
+    except OSError:
+        return None
+    return digest.hexdigest()
+
+
+def write_lines_if_changed(path: str, lines: Iterable[str]) -> bool:
+    """
+    Écrit des lignes dans un fichier seulement si le contenu produit diffère.
+
+    Les lignes sont séparées par le séparateur de fin de ligne du système,
+    sans fin de ligne après la dernière (comme '\\n'.join en mode texte).
+    Elles sont écrites une par une dans un fichier temporaire du même
+    dossier tout en calculant l'empreinte du contenu; le fichier temporaire
+    remplace le fichier cible si les empreintes diffèrent et est supprimé
+    sinon.
+
+    Args:
+        path: Chemin du fichier à écrire.
+        lines: Lignes à écrire, sans caractère de fin de ligne. Peut être
+            un générateur: il n'est parcouru qu'une seule fois.
+
+    Returns:
+        True si le fichier a été créé ou modifié, False s'il était
+        déjà à jour.
+    """
+    directory = os.path.dirname(os.path.abspath(path))
+    separator = os.linesep.encode('utf-8')
+    digest = hashlib.sha256()
+
+    fd, tmp_path = tempfile.mkstemp(
+        dir=directory, prefix=f".{os.path.basename(path)}.", suffix=".tmp"
+        )
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            # Conserver les droits habituels d'un fichier créé par open()
+            # (mkstemp crée le fichier en 0o600)
+            if hasattr(os, 'fchmod'):
+                os.fchmod(f.fileno(), 0o666 & ~_UMASK)
+            else:
+                os.chmod(tmp_path, 0o666 & ~_UMASK)
+            first = True
+            for line in lines:
+                data = line.encode('utf-8')
+                if not first:
+                    data = separator + data
+                first = False
+                digest.update(data)
+                f.write(data)
+
+        if digest.hexdigest() == file_digest(path):
+            os.unlink(tmp_path)
+            return False
+
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.unlink(tmp_path)
+        raise
+
+    return True
+
+
+def write_text_if_changed(path: str, text: str) -> bool:
+    """
+    Écrit un texte dans un fichier seulement si son contenu diffère.
+
+    Args:
+        path: Chemin du fichier à écrire.
+        text: Contenu complet du fichier; les fins de ligne '\\n' sont
+            converties comme en mode texte.
+
+    Returns:
+        True si le fichier a été créé ou modifié, False s'il était
+        déjà à jour.
+    """
+    return write_lines_if_changed(path, text.split('\n'))
@@ -0,0 +1,206 @@
+"""
+Ce module fournit un cache persistant du parcours de l'arborescence MATLAB.
+
+Pour chaque dossier parcouru, le cache enregistre sa date de modification
+(mtime), la présence de fichiers .m et la liste de ses sous-dossiers.
+Lors des parcours suivants, seuls les dossiers dont la date de modification
+a changé sont relus: l'ajout, la suppression ou le renommage d'un fichier
+ou d'un sous-dossier modifie toujours la date du dossier qui le contient.
+
+Changer les options du parcours (liens symboliques suivis, motifs
+d'exclusion, profondeur maximale) ne modifie aucune date: l'empreinte des
+règles (voir scan_rules.ScanRules.digest) est enregistrée dans l'en-tête du
+fichier, et un cache produit avec d'autres règles est ignoré.
+"""
+
+import json
+import os
+import threading
+import time
+
+# Version du format du fichier de cache
+CACHE_VERSION = 2
+
+# Fenêtre (en nanosecondes) pendant laquelle une date de modification est
+# jugée trop récente pour être fiable: un dossier modifié dans la même
+# seconde que le parcours pourrait l'être à nouveau sans changer de mtime.
+_RACY_WINDOW_NS = 2 * 10**9
+
+
+def cache_path_for(output_file: str) -> str:
+    """
+    Construit le chemin du fichier de cache associé à un fichier RST.
+
+    Le cache est enregistré à côté du fichier de sortie, sous un nom caché
+    (ex: source/.documentation_hierarchique.scan.json).
+
+    Args:
+        output_file: Chemin du fichier RST généré.
+
+    Returns:
+        Chemin du fichier de cache.
+    """
+    directory, filename = os.path.split(os.path.abspath(output_file))
+    stem = os.path.splitext(filename)[0]
+    return os.path.join(directory, f".{stem}.scan.json")
+
+
+class ScanCache:
+    """
+    Cache des lectures de dossiers, indexé par chemin relatif à la racine.
+
+    S'utilise à la place de auto_doc_matlab.scan_folder: la méthode
+    scan_folder a la même signature et ne relit un dossier que si sa date
+    de modification diffère de celle enregistrée. Elle peut être appelée
+    depuis plusieurs threads.
+
+    Attributes:
+        cache_file: Chemin du fichier JSON de cache.
+        root_path: Chemin absolu du dossier racine du code.
+        rules_digest: Empreinte des règles du parcours, ou None.
+        hits: Nombre de dossiers servis depuis le cache.
+        misses: Nombre de dossiers relus sur le disque.
+    """
+
+    def __init__(self,
+            cache_file: str | None,
+            root_path: str,
+            lister,
+            entries: dict | None = None,
+            metrics=None,
+            rules=None
+            ) -> None:
+        """
+        Charge le cache depuis le disque s'il existe et correspond à la racine
+        et aux règles du parcours.
+
+        Args:
+            cache_file: Chemin du fichier JSON de cache, ou None pour un
+                cache conservé uniquement en mémoire (voir entries).
+            root_path: Chemin du dossier racine du code.
+            lister: Fonction de lecture réelle d'un dossier, utilisée pour
+                les dossiers absents du cache ou modifiés
+                (ex: auto_doc_matlab.scan_folder).
+            entries: Entrées d'un parcours précédent (voir l'attribut
+                entries), utilisées à la place du fichier de cache.
+            metrics: Mesures optionnelles (voir build_metrics.BuildMetrics),
+                qui comptent les appels à os.stat.
+            rules: Règles du parcours (voir scan_rules.ScanRules), dont
+                l'empreinte est comparée à celle du fichier de cache. Les
+                entrées transmises par entries doivent avoir été produites
+                avec les mêmes règles.
+        """
+        self.cache_file = cache_file
+        self.root_path = os.path.abspath(root_path)
+        self.rules_digest = rules.digest() if rules is not None else None
+        self.hits = 0
+        self.misses = 0
+        self._lister = lister
+        self._metrics = metrics
+        self._entries = entries if entries is not None else self._load()
+        self._seen = {}
+        self._lock = threading.Lock()
+        self._started_ns = time.time_ns()
+
+    def _load(self) -> dict:
+        """
+        Lit le fichier de cache.
+
+        Returns:
+            Dictionnaire {chemin relatif: [mtime_ns, has_m, sous-dossiers]}.
+            Retourne un dictionnaire vide si le fichier est absent, illisible
+            ou s'il a été produit pour une autre racine, un autre format ou
+            d'autres règles de parcours.
+        """
+        if self.cache_file is None:
+            return {}
+
+        try:
+            with open(self.cache_file, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+        if (not isinstance(data, dict)
+                or data.get("version") != CACHE_VERSION
+                or data.get("root") != self.root_path
+                or data.get("rules") != self.rules_digest):
+            return {}
+        return data.get("entries", {})
+
+    def scan_folder(self, folder_path: str) -> tuple[list[str], bool]:
+        """
+        Lit un dossier, depuis le cache si sa date de modification est inchangée.
+
+        Args:
+            folder_path: Chemin vers le dossier à analyser.
+
+        Returns:
+            Tuple (sous-dossiers triés alphabétiquement, présence de fichiers .m).
+            Retourne ([], False) en cas d'erreur d'accès au dossier.
+        """
+        key = os.path.relpath(folder_path, self.root_path)
+
+        if self._metrics is not None:
+            self._metrics.count("stat_calls")
+        try:
+            mtime_ns = os.stat(folder_path).st_mtime_ns
+        except OSError:
+            return [], False
+
+        entry = self._entries.get(key)
+        if entry is not None and entry[0] == mtime_ns:
+            with self._lock:
+                self.hits += 1
+                self._seen[key] = entry
+            return list(entry[2]), entry[1]
+
+        folders, has_m = self._lister(folder_path)
+
+        # Une date trop proche du parcours n'est pas mémorisée: le dossier
+        # sera relu au prochain passage
+        if self._started_ns - mtime_ns < _RACY_WINDOW_NS:
+            mtime_ns = None
+        with self._lock:
+            self.misses += 1
+            self._seen[key] = [mtime_ns, has_m, folders]
+        return list(folders), has_m
+
+    @property
+    def entries(self) -> dict:
+        """
+        Entrées des dossiers rencontrés lors du dernier parcours.
+
+        Returns:
+            Dictionnaire {chemin relatif: [mtime_ns, has_m, sous-dossiers]},
+            réutilisable via le paramètre entries du constructeur.
+        """
+        return self._seen
+
+    def save(self) -> None:
+        """
+        Enregistre le cache sur le disque.
+
+        Seuls les dossiers rencontrés lors du dernier parcours sont conservés,
+        ce qui purge les dossiers supprimés. Le fichier n'est réécrit que si
+        son contenu change, via un fichier temporaire renommé atomiquement.
+        """
+        if self.cache_file is None or self._seen == self._entries:
+            return
+
+        data = {
+            "version": CACHE_VERSION,
+            "root": self.root_path,
+            "rules": self.rules_digest,
+            "entries": self._seen,
+        }
+        tmp_file = f"{self.cache_file}.tmp"
+        try:
+            with open(tmp_file, 'w', encoding='utf-8') as f:
+                json.dump(data, f, separators=(',', ':'))
+            os.replace(tmp_file, self.cache_file)
+        except OSError as error:
+            print(f"Impossible d'enregistrer le cache {self.cache_file}: {error}")
+            return
+
+        self._entries = self._seen
@@ -0,0 +1,353 @@
+"""
+Ce module définit les règles appliquées lors du parcours de l'arborescence
+MATLAB, avant de descendre dans chaque sous-dossier:
+- motifs d'exclusion au format .gitignore (fichier .matlabdocignore à la
+  racine du code, options de conf.py ou de la ligne de commande);
+- liens symboliques vers des dossiers: ignorés par défaut (dès la lecture
+  du dossier, voir auto_doc_matlab.scan_folder), ou suivis avec détection
+  des boucles (périphérique et inode des dossiers parents);
+- profondeur maximale.
+
+Les motifs s'appliquent aux dossiers uniquement, sur leur chemin relatif
+à la racine du code (séparateur '/'):
+- 'data' exclut tout dossier nommé data, à n'importe quel niveau;
+- '/data' ou 'projet/data' est relatif à la racine;
+- '*', '?' et '[...]' ne traversent pas les '/', '**' traverse plusieurs
+  niveaux (ex: '**/resultats_*');
+- '!motif' réintègre un dossier exclu par un motif précédent (le dernier
+  motif correspondant l'emporte, et un dossier exclu n'est jamais
+  parcouru: ses sous-dossiers ne peuvent pas être réintégrés).
+"""
+
+import hashlib
+import json
+import os
+import re
+import threading
+
+# Nom du fichier de motifs lu à la racine du code MATLAB
+IGNORE_FILENAME = ".matlabdocignore"
+
+# Dossiers toujours exclus (gestion de versions)
+DEFAULT_EXCLUDES = (".git", ".svn", ".hg")
+
+
+def _translate_pattern(pattern: str) -> str:
+    """
+    Convertit un motif au format .gitignore en expression régulière.
+
+    Args:
+        pattern: Motif sans '!' initial ni '/' final.
+
+    Returns:
+        Expression régulière s'appliquant au chemin relatif complet.
+    """
+    anchored = '/' in pattern
+    pattern = pattern.lstrip('/')
+
+    regex = []
+    index = 0
+    while index < len(pattern):
+        char = pattern[index]
+        if pattern.startswith("**/", index):
+            regex.append("(?:.*/)?")
+            index += 3
+            continue
+        if pattern.startswith("**", index):
+            regex.append(".*")
+            index += 2
+            continue
+        if char == '*':
+            regex.append("[^/]*")
+        elif char == '?':
+            regex.append("[^/]")
+        elif char == '[':
+            end = pattern.find(']', index + 2)
+            if end == -1:
+                regex.append(re.escape(char))
+            else:
+                content = pattern[index + 1:end]
+                if content.startswith('!'):
+                    content = '^' + content[1:]
+                regex.append(f"[{content}]")
+                index = end
+        else:
+            regex.append(re.escape(char))
+        index += 1
+
+    prefix = "" if anchored else "(?:.*/)?"
+    return prefix + "".join(regex)
+
+
+def parse_patterns(lines) -> list[tuple[str, bool]]:
+    """
+    Lit des motifs au format .gitignore.
+
+    Les lignes vides et les commentaires ('#') sont ignorés.
+
+    Args:
+        lines: Lignes du fichier ou motifs des options.
+
+    Returns:
+        Liste de tuples (expression régulière, motif de réintégration '!').
+    """
+    patterns = []
+    for line in lines:
+        line = line.strip()
+        if not line or line.startswith('#'):
+            continue
+        negate = line.startswith('!')
+        if negate:
+            line = line[1:]
+        line = line.rstrip('/')
+        if line:
+            patterns.append((_translate_pattern(line), negate))
+    return patterns
+
+
+class CycleGuard:
+    """
+    Détection des boucles de liens symboliques lors d'un parcours.
+
+    Une boucle est détectée en comparant le périphérique et l'inode d'un
+    sous-dossier à ceux de ses dossiers parents: un lien symbolique vers
+    un autre dossier de l'arborescence reste parcouru.
+    """
+
+    def __init__(self, root_path: str) -> None:
+        """
+        Args:
+            root_path: Dossier racine du parcours.
+        """
+        self.root_path = os.path.normpath(root_path)
+        self._identities = {}
+        try:
+            stat = os.stat(self.root_path)
+            self._identities[self.root_path] = (stat.st_dev, stat.st_ino)
+        except OSError:
+            pass
+
+    def is_loop(self, folder_path: str, child_path: str) -> bool:
+        """
+        Indique si un sous-dossier forme une boucle avec ses dossiers parents.
+
+        Le sous-dossier est mémorisé s'il ne forme pas de boucle: ses
+        propres sous-dossiers sont ensuite comparés à lui.
+
+        Args:
+            folder_path: Dossier parent, déjà parcouru.
+            child_path: Sous-dossier à parcourir.
+
+        Returns:
+            True si le sous-dossier est l'un de ses dossiers parents.
+
+        Raises:
+            OSError: Si le sous-dossier ne peut pas être lu avec os.stat.
+        """
+        folder_path = os.path.normpath(folder_path)
+        ancestors = set()
+        path = folder_path
+        while path in self._identities:
+            ancestors.add(self._identities[path])
+            if path == self.root_path:
+                break
+            path = os.path.dirname(path)
+
+        stat = os.stat(child_path)
+        identity = (stat.st_dev, stat.st_ino)
+        if identity in ancestors:
+            return True
+        self._identities[os.path.normpath(child_path)] = identity
+        return False
+
+
+class ScanRules:
+    """
+    Règles de parcours appliquées aux sous-dossiers de chaque dossier lu.
+
+    Attributes:
+        patterns: Motifs d'exclusion, exclusions par défaut comprises.
+        max_depth: Profondeur maximale des dossiers parcourus (1 pour les
+            dossiers de premier niveau), ou None sans limite.
+        follow_symlinks: True si les liens symboliques vers des dossiers
+            sont suivis (la fonction de lecture doit alors les retourner,
+            voir auto_doc_matlab.scan_folder).
+        excluded: Nombre de dossiers exclus par les motifs.
+        cycles: Nombre de liens symboliques ignorés car ils forment une boucle.
+    """
+
+    def __init__(self, patterns=(), max_depth: int | None = None, follow_symlinks: bool = False) -> None:
+        """
+        Args:
+            patterns: Motifs au format .gitignore (voir le module), ajoutés
+                aux exclusions par défaut (DEFAULT_EXCLUDES).
+            max_depth: Profondeur maximale, ou None sans limite.
+            follow_symlinks: Suivre les liens symboliques vers des dossiers.
+        """
+        self.patterns = [*DEFAULT_EXCLUDES, *patterns]
+        rules = parse_patterns(self.patterns)
+        self.max_depth = max_depth
+        self.follow_symlinks = follow_symlinks
+        self.excluded = 0
+        self.cycles = 0
+        self._lock = threading.Lock()
+
+        # Sans réintégration, une seule expression suffit pour tous les motifs
+        if any(negate for _, negate in rules):
+            self._rules = [(re.compile(regex), negate) for regex, negate in rules]
+            self._combined = None
+        else:
+            self._rules = None
+            self._combined = re.compile("|".join(f"(?:{regex})" for regex, _ in rules))
+
+    @classmethod
+    def from_options(cls,
+            root_path: str,
+            exclude=(),
+            ignore_file: str | None = None,
+            max_depth: int | None = None,
+            follow_symlinks: bool = False
+            ) -> "ScanRules":
+        """
+        Construit les règles à partir d'un fichier de motifs et d'options.
+
+        Args:
+            root_path: Dossier racine du code MATLAB.
+            exclude: Motifs supplémentaires (ex: option de conf.py).
+            ignore_file: Fichier de motifs; par défaut, le fichier
+                .matlabdocignore de la racine du code s'il existe.
+            max_depth: Profondeur maximale, ou None sans limite.
+            follow_symlinks: Suivre les liens symboliques vers des dossiers.
+
+        Returns:
+            Règles de parcours.
+        """
+        if ignore_file is None:
+            ignore_file = os.path.join(root_path, IGNORE_FILENAME)
+            if not os.path.isfile(ignore_file):
+                ignore_file = None
+
+        patterns = []
+        if ignore_file is not None:
+            with open(ignore_file, 'r', encoding='utf-8') as f:
+                patterns.extend(f.read().splitlines())
+        patterns.extend(exclude)
+        return cls(patterns, max_depth, follow_symlinks)
+
+    def digest(self) -> str:
+        """
+        Calcule l'empreinte des règles, enregistrée avec les parcours mis en
+        cache (voir scan_cache.ScanCache).
+
+        Returns:
+            Empreinte SHA-256 hexadécimale des motifs, de la profondeur
+            maximale et de l'option follow_symlinks.
+        """
+        options = {
+            "patterns": self.patterns,
+            "max_depth": self.max_depth,
+            "follow_symlinks": self.follow_symlinks,
+            }
+        return hashlib.sha256(json.dumps(options, sort_keys=True).encode('utf-8')).hexdigest()
+
+    def is_excluded(self, relative_path: str) -> bool:
+        """
+        Indique si un dossier est exclu par les motifs.
+
+        Args:
+            relative_path: Chemin du dossier relatif à la racine du code,
+                avec '/' comme séparateur.
+
+        Returns:
+            True si le dernier motif correspondant est une exclusion.
+        """
+        if self._combined is not None:
+            return self._combined.fullmatch(relative_path) is not None
+
+        excluded = False
+        for regex, negate in self._rules:
+            if regex.fullmatch(relative_path):
+                excluded = not negate
+        return excluded
+
+    def is_walked(self, relative_path: str) -> bool:
+        """
+        Indique si un dossier est atteint par le parcours.
+
+        Un dossier n'est pas atteint si lui-même ou l'un de ses dossiers
+        parents est exclu, ou s'il est au-delà de la profondeur maximale
+        (filtrage d'événements, ex: watch_doc).
+
+        Args:
+            relative_path: Chemin du dossier relatif à la racine du code,
+                avec '/' comme séparateur ('' pour la racine).
+
+        Returns:
+            True si le dossier est parcouru.
+        """
+        if not relative_path:
+            return True
+        parts = relative_path.split('/')
+        if self.max_depth is not None and len(parts) > self.max_depth:
+            return False
+        return not any(
+            self.is_excluded('/'.join(parts[:depth])) for depth in range(1, len(parts) + 1)
+            )
+
+    def wrap_lister(self, lister, root_path: str, check_cycles: bool = True):
+        """
+        Applique les règles aux sous-dossiers retournés par une fonction de
+        lecture de dossier.
+
+        Les sous-dossiers exclus, au-delà de la profondeur maximale ou
+        formant une boucle ne sont jamais lus. Les boucles ne sont
+        recherchées (voir CycleGuard) que lorsque les liens symboliques
+        sont suivis (follow_symlinks). Sinon, aucun sous-dossier n'est lu
+        avec os.stat: la fonction de lecture ne retourne pas les liens.
+
+        Args:
+            lister: Fonction de lecture d'un dossier, de même signature que
+                auto_doc_matlab.scan_folder.
+            root_path: Dossier racine du parcours.
+            check_cycles: Si False, les boucles ne sont pas recherchées
+                même si les liens sont suivis (arborescence sans lien
+                symbolique, ex: objets git).
+
+        Returns:
+            Fonction de même signature.
+        """
+        root_path = os.path.normpath(root_path)
+        guard = CycleGuard(root_path) if check_cycles and self.follow_symlinks else None
+
+        def filtered_lister(folder_path: str) -> tuple[list[str], bool]:
+            folders, has_m = lister(folder_path)
+            folder_path = os.path.normpath(folder_path)
+
+            if folder_path == root_path:
+                relative, depth = "", 0
+            else:
+                relative = os.path.relpath(folder_path, root_path).replace(os.sep, '/')
+                depth = relative.count('/') + 1
+            if self.max_depth is not None and depth >= self.max_depth:
+                return [], has_m
+
+            kept = []
+            for name in folders:
+                if self.is_excluded(f"{relative}/{name}" if relative else name):
+                    with self._lock:
+                        self.excluded += 1
+                    continue
+
+                if guard is not None:
+                    try:
+                        if guard.is_loop(folder_path, os.path.join(folder_path, name)):
+                            with self._lock:
+                                self.cycles += 1
+                            continue
+                    except OSError:
+                        continue
+                kept.append(name)
+
+            return kept, has_m
+
+        return filtered_lister
@@ -0,0 +1,83 @@
+/*
+ * Chargement à la demande des fragments de l'index de recherche (voir
+ * search_shards.py).
+ *
+ * searchindex.js ne contient que l'index de base et la liste des
+ * fragments. Avant chaque recherche, les fragments des mots de la requête
+ * (clé: début du mot et de sa racine) sont chargés par des balises
+ * <script>, comme searchindex.js (fonctionne aussi en file://), puis
+ * ajoutés à l'index et la recherche de Sphinx est exécutée.
+ */
+"use strict";
+
+const SearchShards = {
+  // Clé -> promesse résolue lorsque le fragment est ajouté à l'index
+  _pending: new Map(),
+  _resolvers: new Map(),
+  // Identifiants des objets déjà ajoutés (un objet figure dans plusieurs fragments)
+  _objects: new Set(),
+
+  /* Appelé par chaque fragment chargé. */
+  add: (key, shard) => {
+    const index = Search._index;
+    Object.assign(index.terms, shard.terms);
+    Object.assign(index.titleterms, shard.titleterms);
+    shard.objects.forEach(([id, prefix, name, entry]) => {
+      if (SearchShards._objects.has(id)) return;
+      SearchShards._objects.add(id);
+      const objects = index.objects[prefix];
+      if (Array.isArray(objects)) objects.push(entry);
+      else objects[name] = entry;
+    });
+    const resolve = SearchShards._resolvers.get(key);
+    if (resolve) resolve();
+  },
+
+  _load: (key, manifest) => {
+    if (!SearchShards._pending.has(key)) {
+      const hex = Array.from(new TextEncoder().encode(key),
+                             (byte) => byte.toString(16).padStart(2, "0")).join("");
+      const root = document.documentElement.dataset.content_root
+        || (typeof DOCUMENTATION_OPTIONS !== "undefined" && DOCUMENTATION_OPTIONS.URL_ROOT) || "";
+      SearchShards._pending.set(key, new Promise((resolve) => {
+        SearchShards._resolvers.set(key, resolve);
+        const script = document.createElement("script");
+        script.src = `${root}${manifest.path}${hex}.js`;
+        script.onerror = resolve;
+        document.head.appendChild(script);
+      }));
+    }
+    return SearchShards._pending.get(key);
+  },
+
+  /* Charge les fragments nécessaires à une requête. */
+  require: (query, manifest) => {
+    const split = typeof splitQuery === "function"
+      ? splitQuery
+      : (text) => text.split(/[^\p{Letter}\p{Number}_]+/gu).filter((term) => term);
+    const stemmer = typeof Stemmer === "function" ? new Stemmer() : null;
+    const available = new Set(manifest.keys);
+    const prefix = (word) => Array.from(word).slice(0, manifest.length).join("");
+
+    const keys = new Set();
+    split(query.trim()).forEach((term) => {
+      const lower = term.toLowerCase().replace(/^-/, "");
+      keys.add(prefix(lower));
+      if (stemmer) keys.add(prefix(stemmer.stemWord(lower)));
+    });
+    return Promise.all(
+      [...keys].filter((key) => available.has(key)).map((key) => SearchShards._load(key, manifest))
+    );
+  },
+};
+
+// Installé avant Search.init (searchtools.js), qui lance la recherche de l'URL
+document.addEventListener("DOMContentLoaded", () => {
+  if (typeof Search === "undefined") return;
+  const query = Search.query;
+  Search.query = (text) => {
+    const manifest = Search._index && Search._index.shards;
+    if (!manifest) return query.call(Search, text);
+    SearchShards.require(text, manifest).then(() => query.call(Search, text));
+  };
+});
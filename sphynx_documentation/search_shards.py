@@ -0,0 +1,301 @@
+"""
+Extension Sphinx découpant l'index de recherche en fragments chargés à la
+demande.
+
+Sphinx écrit un seul fichier searchindex.js, que le navigateur télécharge
+et analyse en entier avant la première recherche. A la fin de la
+construction HTML, l'extension répartit les termes ('terms',
+'titleterms') et les objets documentés ('objects', ex: fonctions MATLAB)
+dans des fragments build/<version>/_search/<clé>.js, la clé étant le début
+du terme ou de chaque composante du nom de l'objet (2 caractères par
+défaut). searchindex.js ne contient plus que les documents, les titres et
+la liste des fragments. Le script search_shards.js, ajouté à la page de
+recherche, charge avant chaque recherche les seuls fragments des mots de
+la requête, puis exécute la recherche de Sphinx.
+
+Les correspondances partielles de Sphinx (un mot contenu dans un terme ou
+dans le nom d'un objet) sont limitées aux termes et aux composantes de
+nom qui commencent comme le mot recherché.
+
+L'index complet est conservé dans le dossier des doctrees et remis en
+place au démarrage de la construction suivante: Sphinx le relit pour une
+construction incrémentale.
+
+Options de configuration (conf.py):
+    search_shards_enabled: Active le découpage (True par défaut).
+    search_shards_prefix_length: Nombre de caractères des clés des
+        fragments (2 par défaut).
+"""
+
+import json
+import os
+import shutil
+
+from rst_writer import write_text_if_changed
+
+# Dossier des fragments, dans le dossier de sortie de chaque version
+SHARDS_DIR = "_search"
+
+# Copie de l'index complet, dans le dossier des doctrees
+FULL_INDEX_NAME = "searchindex.full.js"
+
+# Script de chargement des fragments (copié dans _static)
+LOADER_NAME = "search_shards.js"
+
+# Parties de l'index réparties dans les fragments
+_SHARDED_KEYS = ("terms", "titleterms", "objects")
+
+
+def shard_key(word: str, length: int) -> str:
+    """
+    Détermine la clé du fragment d'un terme ou d'un nom.
+
+    Args:
+        word: Terme de l'index ou composante d'un nom d'objet.
+        length: Nombre de caractères de la clé.
+
+    Returns:
+        Début du mot en minuscules.
+    """
+    return word.lower()[:length]
+
+
+def shard_filename(key: str) -> str:
+    """
+    Nom du fichier d'un fragment (clé encodée en hexadécimal).
+
+    Args:
+        key: Clé du fragment.
+
+    Returns:
+        Nom du fichier, ex: '6d61.js' pour la clé 'ma'.
+    """
+    return f"{key.encode('utf-8').hex()}.js"
+
+
+def split_index(index: dict, length: int = 2) -> tuple[dict, dict[str, dict]]:
+    """
+    Répartit un index de recherche Sphinx en un index de base et des fragments.
+
+    Un objet est placé dans le fragment de chaque composante de son nom
+    complet (ex: 'pkg.ma_fonction' dans les fragments 'pk' et 'ma'), avec
+    un identifiant qui évite les doublons lorsque plusieurs fragments sont
+    chargés.
+
+    Args:
+        index: Index lu dans searchindex.js.
+        length: Nombre de caractères des clés des fragments.
+
+    Returns:
+        Tuple (index de base, {clé: fragment}). L'index de base contient des
+        termes vides, les préfixes des objets avec un conteneur vide (liste
+        ou dictionnaire selon la version de Sphinx) et la liste des
+        fragments ('shards').
+        Chaque fragment est un dictionnaire {"terms", "titleterms",
+        "objects"}, les objets étant des listes [identifiant, préfixe, nom,
+        entrée].
+    """
+    base = {key: value for key, value in index.items() if key not in _SHARDED_KEYS}
+    base["terms"] = {}
+    base["titleterms"] = {}
+    shards = {}
+
+    def shard(key: str) -> dict:
+        if key not in shards:
+            shards[key] = {"terms": {}, "titleterms": {}, "objects": []}
+        return shards[key]
+
+    for kind in ("terms", "titleterms"):
+        for term, value in index.get(kind, {}).items():
+            shard(shard_key(term, length))[kind][term] = value
+
+    base["objects"] = {}
+    object_id = 0
+    for prefix, entries in index.get("objects", {}).items():
+        # Sphinx >= 7.2: liste d'entrées dont le nom est le dernier élément;
+        # versions précédentes: dictionnaire {nom: entrée}
+        if isinstance(entries, dict):
+            base["objects"][prefix] = {}
+            items = entries.items()
+        else:
+            base["objects"][prefix] = []
+            items = ((entry[-1], entry) for entry in entries)
+
+        for name, entry in items:
+            components = f"{prefix}.{name}".split('.') if prefix else name.split('.')
+            for key in {shard_key(part, length) for part in components if part}:
+                shard(key)["objects"].append([object_id, prefix, name, entry])
+            object_id += 1
+
+    base["shards"] = {"path": f"{SHARDS_DIR}/", "length": length, "keys": sorted(shards)}
+    return base, shards
+
+
+def write_shards(outdir: str, shards: dict[str, dict]) -> tuple[int, int]:
+    """
+    Écrit les fragments et supprime ceux qui n'existent plus.
+
+    Un fragment identique n'est pas réécrit (sa date de modification et
+    son empreinte de publication restent inchangées).
+
+    Args:
+        outdir: Dossier de sortie HTML.
+        shards: Fragments (voir split_index).
+
+    Returns:
+        Tuple (fragments écrits, fragments supprimés).
+    """
+    shards_dir = os.path.join(outdir, SHARDS_DIR)
+    os.makedirs(shards_dir, exist_ok=True)
+    names = set()
+    written = 0
+    for key, shard in shards.items():
+        name = shard_filename(key)
+        names.add(name)
+        content = (f"SearchShards.add({json.dumps(key)},"
+                   f"{json.dumps(shard, ensure_ascii=False, separators=(',', ':'), sort_keys=True)});")
+        written += write_text_if_changed(os.path.join(shards_dir, name), content)
+
+    removed = 0
+    with os.scandir(shards_dir) as entries:
+        for entry in entries:
+            if entry.name.endswith('.js') and entry.name not in names:
+                os.remove(entry.path)
+                removed += 1
+    return written, removed
+
+
+def _index_path(app) -> str | None:
+    """
+    Chemin de searchindex.js pour un constructeur HTML avec recherche.
+
+    Args:
+        app: Application Sphinx.
+
+    Returns:
+        Chemin du fichier, ou None si le constructeur n'écrit pas d'index.
+    """
+    filename = getattr(app.builder, "searchindex_filename", None)
+    if not app.config.search_shards_enabled or not filename or not getattr(app.builder, "search", False):
+        return None
+    return os.path.join(app.outdir, filename)
+
+
+def _is_sharded(index_path: str) -> bool:
+    """
+    Indique si searchindex.js est un index de base découpé par l'extension.
+
+    Le contenu de Search.setIndex(...) est analysé: un terme ou un titre
+    contenant le texte '"shards":' ne suffit pas à identifier un index
+    découpé.
+
+    Args:
+        index_path: Chemin de searchindex.js.
+
+    Returns:
+        True si le fichier existe et que son index contient la clé 'shards'
+        au premier niveau.
+    """
+    from sphinx.search import js_index
+
+    try:
+        with open(index_path, 'r', encoding='utf-8') as f:
+            index = js_index.load(f)
+    except (OSError, ValueError):
+        return False
+    return isinstance(index, dict) and "shards" in index
+
+
+def _on_builder_inited(app) -> None:
+    """
+    Remet en place l'index complet de la construction précédente, relu par
+    Sphinx pour une construction incrémentale.
+
+    Args:
+        app: Application Sphinx.
+    """
+    index_path = _index_path(app)
+    if index_path is None:
+        return
+
+    full_path = os.path.join(app.doctreedir, FULL_INDEX_NAME)
+    if os.path.isfile(full_path):
+        os.makedirs(os.path.dirname(index_path), exist_ok=True)
+        shutil.copyfile(full_path, index_path)
+    elif _is_sharded(index_path):
+        # Index de base sans copie complète: Sphinx ne pourrait pas le relire
+        os.remove(index_path)
+
+
+def _on_html_page_context(app, pagename, templatename, context, doctree) -> None:
+    """
+    Ajoute le script de chargement des fragments à la page de recherche.
+
+    Args:
+        app: Application Sphinx.
+        pagename: Nom de la page.
+        templatename: Modèle de la page.
+        context: Contexte du modèle.
+        doctree: Arbre du document (None pour les pages générées).
+    """
+    if pagename == "search" and _index_path(app) is not None:
+        app.add_js_file(LOADER_NAME)
+
+
+def _on_build_finished(app, exception) -> None:
+    """
+    Découpe searchindex.js en fragments après une construction réussie.
+
+    Args:
+        app: Application Sphinx.
+        exception: Exception levée pendant la construction, ou None.
+    """
+    from sphinx.search import js_index
+    from sphinx.util import logging
+
+    index_path = _index_path(app)
+    if exception is not None or index_path is None or not os.path.isfile(index_path):
+        return
+
+    with open(index_path, 'r', encoding='utf-8') as f:
+        index = js_index.load(f)
+    if "shards" in index:
+        return
+
+    shutil.copyfile(index_path, os.path.join(app.doctreedir, FULL_INDEX_NAME))
+    base, shards = split_index(index, app.config.search_shards_prefix_length)
+    written, removed = write_shards(app.outdir, shards)
+    with open(index_path, 'w', encoding='utf-8') as f:
+        f.write(js_index.dumps(base))
+
+    static_dir = os.path.join(app.outdir, "_static")
+    os.makedirs(static_dir, exist_ok=True)
+    shutil.copyfile(os.path.join(os.path.dirname(os.path.abspath(__file__)), LOADER_NAME),
+                    os.path.join(static_dir, LOADER_NAME))
+
+    logging.getLogger(__name__).info(
+        f"Index de recherche: {len(shards)} fragment(s), {written} écrit(s), {removed} supprimé(s)"
+        )
+
+
+def setup(app) -> dict:
+    """
+    Point d'entrée de l'extension Sphinx.
+
+    Args:
+        app: Application Sphinx.
+
+    Returns:
+        Métadonnées de l'extension.
+    """
+    app.add_config_value("search_shards_enabled", True, "html")
+    app.add_config_value("search_shards_prefix_length", 2, "html")
+
+    app.connect("builder-inited", _on_builder_inited)
+    app.connect("html-page-context", _on_html_page_context)
+    app.connect("build-finished", _on_build_finished)
+    return {
+        "version": "1",
+        "parallel_read_safe": True,
+        "parallel_write_safe": True,
+    }
@@ -1,4 +1,5 @@
 import os
+import sys
 # Configuration file for the Sphinx documentation builder.
 #
 # For the full list of built-in configuration values, see the documentation:
@@ -14,13 +15,56 @@ author = 'MAIF'
 # -- General configuration ---------------------------------------------------
 # https://www.sphinx-doc.org/en/master/usage/configuration.html#general-configuration
 
-extensions = ['sphinxcontrib.matlab', 'sphinx.ext.autodoc', 'sphinx.ext.napoleon',  'sphinx_multiversion']
+# Outils de génération locaux (dossier sphynx_documentation)
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+extensions = ['sphinxcontrib.matlab', 'sphinx.ext.autodoc', 'sphinx.ext.napoleon',  'sphinx_multiversion',
+              'auto_doc_extension', 'search_shards']
 primary_domain = "mat"
 
 matlab_src_dir = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..', 'code_matlab'))
 # matlab_src_dir = os.path.abspath('C:/Projets/Interne/MAIF/Documentation_Git_Versioning/documentation_sphynx/code_matlab')
 # matlab_src_dir = r'C:\Projets\Interne\MAIF\Documentation_Git_Versioning\documentation_sphynx\code_matlab' 
 
+# Cache d'analyse des fichiers .m partagé entre les versions construites
+# (None: variable MATLAB_PARSE_CACHE_DIR ou ~/.cache/documentation_sphynx).
+# Il ne sert qu'à l'index des symboles (matlab_autogen_explicit_members):
+# sphinxcontrib-matlabdomain analyse toujours lui-même les fichiers .m
+matlab_parse_cache_dir = None
+
+# Génération de documentation_hierarchique.rst au démarrage de la construction
+# (voir auto_doc_extension.py)
+matlab_autogen_enabled = True
+matlab_autogen_output = 'documentation_hierarchique.rst'
+matlab_autogen_split_pages = False
+matlab_autogen_explicit_members = False
+# Symboles par page au-delà desquels un dossier est découpé en un tableau
+# récapitulatif et des sous-pages (None: pas de découpage; nécessite les deux
+# options précédentes)
+matlab_autogen_max_members = None
+# Génération de index.rst (voir index_writer.py) et sections de l'index
+# (None: sections par défaut, doc_actuarielle et doc_technique)
+matlab_autogen_index = False
+matlab_autogen_index_sections = None
+# Dossiers exclus du parcours, au format .gitignore (en plus du fichier
+# .matlabdocignore de code_matlab s'il existe), et profondeur maximale
+matlab_autogen_exclude = []
+matlab_autogen_max_depth = None
+# Suivre les liens symboliques vers des dossiers (avec détection des boucles)
+matlab_autogen_follow_symlinks = False
+# Vérifier la date des fichiers .m des dossiers inchangés (False: seuls les
+# dossiers dont la date de modification a changé sont vérifiés, une
+# modification sur place d'un fichier n'est alors pas détectée)
+matlab_autogen_check_files = True
+# Rapport JSON des mesures de la génération, relatif au dossier des doctrees
+# (ex: 'matlab_autogen_metrics.json'; None: pas de mesures)
+matlab_autogen_metrics = None
+
+# Index de recherche découpé en fragments chargés à la demande
+# (voir search_shards.py)
+search_shards_enabled = True
+search_shards_prefix_length = 2
+
 templates_path = ['_templates']
 exclude_patterns = []
 
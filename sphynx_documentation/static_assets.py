@@ -0,0 +1,433 @@
+"""
+Ce script réduit la taille du site construit par build_versions.py après
+la construction des versions:
+
+- les fichiers de _static (feuilles de style, scripts, polices, images)
+  référencés par les pages HTML ou par d'autres feuilles de style sont
+  déplacés dans un dossier commun build/_assets, sous un nom contenant
+  l'empreinte de leur contenu (ex: basic.3f2a9c1e0b7d.css). Les références
+  des pages et des feuilles de style sont réécrites vers ce dossier: un
+  fichier identique dans plusieurs versions n'est stocké et téléchargé
+  qu'une seule fois, et son nom change avec son contenu (mise en cache
+  permanente par le navigateur). Les fichiers de _static qu'aucune page ne
+  référence (chargés dynamiquement par un script) restent en place;
+- une copie compressée (.gz, et .br si le module brotli est installé) est
+  écrite à côté de chaque fichier HTML, JavaScript et CSS, pour les
+  serveurs qui servent des fichiers précompressés.
+
+Le traitement est idempotent: une version déjà traitée ne référence plus
+_static, et seuls les fichiers nouveaux ou modifiés sont compressés.
+
+Exemple:
+    python static_assets.py --build-dir build
+"""
+
+import argparse
+import gzip
+import hashlib
+import os
+import posixpath
+import re
+from urllib.parse import urlsplit
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+# Dossier commun des fichiers statiques, à la racine du dossier de sortie
+STORE_NAME = "_assets"
+
+# Extensions des fichiers compressés
+COMPRESSED_SUFFIXES = (".html", ".js", ".css")
+
+# Longueur de l'empreinte dans le nom des fichiers du dossier commun
+_HASH_LENGTH = 12
+
+# Références des pages HTML (attributs src et href)
+_HTML_REFERENCE = re.compile(r'''(\b(?:src|href)=)(["'])([^"'<>]*)\2''')
+
+# Références des feuilles de style (url(...) et @import "...")
+_CSS_REFERENCE = re.compile(r'''(url\(\s*)(["']?)([^"')\s]+)\2(\s*\))|(@import\s+)(["'])([^"']+)\6''')
+
+# Références vers le dossier commun, pour retrouver les fichiers utilisés
+_STORE_REFERENCE = re.compile(rf'''{STORE_NAME}/([^"'?#)\s]+)''')
+
+
+def _write_bytes(path: str, data: bytes) -> None:
+    """
+    Écrit un fichier de façon atomique (fichier temporaire puis substitution).
+
+    Args:
+        path: Chemin du fichier.
+        data: Contenu.
+    """
+    tmp_path = f"{path}.tmp{os.getpid()}"
+    with open(tmp_path, 'wb') as f:
+        f.write(data)
+    os.replace(tmp_path, path)
+
+
+def _is_relative(url: str) -> bool:
+    """
+    Indique si une URL est relative (ni absolue, ni data:, ni ancre seule).
+
+    Args:
+        url: URL lue dans une page ou une feuille de style.
+
+    Returns:
+        True si l'URL désigne un fichier relatif au document.
+    """
+    parts = urlsplit(url)
+    return not (parts.scheme or parts.netloc or url.startswith(('/', '#')) or not parts.path)
+
+
+class AssetStore:
+    """
+    Dossier commun des fichiers statiques, adressés par leur contenu.
+
+    Attributes:
+        build_dir: Dossier de sortie contenant les versions.
+        store_dir: Dossier commun (<build_dir>/_assets).
+        stored: Nombre de fichiers ajoutés au dossier commun.
+        moved: Nombre de fichiers retirés des dossiers _static des versions.
+        bytes_saved: Taille des fichiers retirés des dossiers _static.
+    """
+
+    def __init__(self, build_dir: str) -> None:
+        """
+        Args:
+            build_dir: Dossier de sortie contenant les versions.
+        """
+        self.build_dir = os.path.abspath(build_dir)
+        self.store_dir = os.path.join(self.build_dir, STORE_NAME)
+        self.stored = 0
+        self.moved = 0
+        self.bytes_saved = 0
+        # Chemin d'un fichier de _static -> nom dans le dossier commun
+        self._names = {}
+
+    def store(self, path: str, static_dir: str) -> str:
+        """
+        Ajoute un fichier de _static au dossier commun.
+
+        Les références relatives d'une feuille de style sont d'abord
+        réécrites vers le dossier commun, les fichiers référencés étant
+        ajoutés eux aussi.
+
+        Args:
+            path: Chemin du fichier.
+            static_dir: Dossier _static de la version.
+
+        Returns:
+            Nom du fichier dans le dossier commun.
+        """
+        if path in self._names:
+            return self._names[path]
+
+        with open(path, 'rb') as f:
+            data = f.read()
+        if path.endswith('.css'):
+            data = self._rewrite_css(data, path, static_dir)
+
+        stem, suffix = os.path.splitext(os.path.basename(path))
+        name = f"{stem}.{hashlib.sha256(data).hexdigest()[:_HASH_LENGTH]}{suffix}"
+        target = os.path.join(self.store_dir, name)
+        if not os.path.exists(target):
+            os.makedirs(self.store_dir, exist_ok=True)
+            _write_bytes(target, data)
+            self.stored += 1
+
+        self._names[path] = name
+        return name
+
+    def _resolve(self, url: str, document_dir: str, static_dir: str) -> str | None:
+        """
+        Détermine le fichier de _static désigné par une URL relative.
+
+        Args:
+            url: URL lue dans le document.
+            document_dir: Dossier du document.
+            static_dir: Dossier _static de la version.
+
+        Returns:
+            Chemin du fichier, ou None si l'URL ne désigne pas un fichier
+            existant de _static.
+        """
+        if not _is_relative(url):
+            return None
+        path = os.path.normpath(os.path.join(document_dir, urlsplit(url).path))
+        if not path.startswith(static_dir + os.sep) or not os.path.isfile(path):
+            return None
+        return path
+
+    def _rewrite_css(self, data: bytes, path: str, static_dir: str) -> bytes:
+        """
+        Réécrit les références relatives d'une feuille de style vers le
+        dossier commun (les fichiers y sont stockés à plat).
+
+        Args:
+            data: Contenu de la feuille de style.
+            path: Chemin de la feuille de style dans _static.
+            static_dir: Dossier _static de la version.
+
+        Returns:
+            Contenu réécrit.
+        """
+        document_dir = os.path.dirname(path)
+
+        def replace(match: re.Match) -> str:
+            url = match.group(3) or match.group(7)
+            target = self._resolve(url, document_dir, static_dir)
+            if target is None:
+                return match.group(0)
+            name = self.store(target, static_dir) + _fragment(url)
+            if match.group(3):
+                return f"{match.group(1)}{match.group(2)}{name}{match.group(2)}{match.group(4)}"
+            return f"{match.group(5)}{match.group(6)}{name}{match.group(6)}"
+
+        text = data.decode('utf-8', errors='surrogateescape')
+        return _CSS_REFERENCE.sub(replace, text).encode('utf-8', errors='surrogateescape')
+
+    def rewrite_page(self, path: str, static_dir: str, used: set[str]) -> bool:
+        """
+        Réécrit les références d'une page HTML vers le dossier commun.
+
+        Args:
+            path: Chemin de la page.
+            static_dir: Dossier _static de la version de la page.
+            used: Ensemble complété avec les fichiers de _static déplacés.
+
+        Returns:
+            True si la page a été modifiée.
+        """
+        with open(path, 'rb') as f:
+            text = f.read().decode('utf-8', errors='surrogateescape')
+        document_dir = os.path.dirname(path)
+
+        def replace(match: re.Match) -> str:
+            url = match.group(3)
+            target = self._resolve(url, document_dir, static_dir)
+            if target is None:
+                return match.group(0)
+            name = self.store(target, static_dir)
+            used.add(target)
+            relative = os.path.relpath(os.path.join(self.store_dir, name), document_dir)
+            quote = match.group(2)
+            return f"{match.group(1)}{quote}{relative.replace(os.sep, '/')}{_fragment(url)}{quote}"
+
+        rewritten = _HTML_REFERENCE.sub(replace, text)
+        if rewritten == text:
+            return False
+        _write_bytes(path, rewritten.encode('utf-8', errors='surrogateescape'))
+        return True
+
+    def deduplicate(self) -> int:
+        """
+        Déplace les fichiers référencés de chaque dossier _static dans le
+        dossier commun et réécrit les pages de toutes les versions.
+
+        Les fichiers du dossier commun qui ne sont plus référencés (version
+        supprimée ou reconstruite) sont supprimés.
+
+        Returns:
+            Nombre de pages réécrites.
+        """
+        pages = 0
+        for static_dir, version_dir in self._static_dirs():
+            used = set()
+            for folder_path, folders, files in os.walk(version_dir):
+                folders[:] = [name for name in folders
+                              if os.path.join(folder_path, name) != static_dir]
+                for filename in files:
+                    if filename.endswith('.html'):
+                        pages += self.rewrite_page(os.path.join(folder_path, filename), static_dir, used)
+
+            # Les feuilles de style référencent aussi des fichiers déplacés
+            used.update(path for path in self._names if path.startswith(static_dir + os.sep))
+            for path in used:
+                self.bytes_saved += os.path.getsize(path)
+                os.remove(path)
+                self.moved += 1
+            _remove_empty_folders(static_dir)
+
+        self._collect()
+        return pages
+
+    def _static_dirs(self) -> list[tuple[str, str]]:
+        """
+        Liste les dossiers _static des versions.
+
+        Returns:
+            Liste de tuples (dossier _static, dossier de la version).
+        """
+        static_dirs = []
+        for folder_path, folders, _ in os.walk(self.build_dir):
+            if folder_path == self.build_dir:
+                folders[:] = [name for name in folders
+                              if name != STORE_NAME and not name.startswith('.')]
+            if "_static" in folders:
+                static_dirs.append((os.path.join(folder_path, "_static"), folder_path))
+            folders[:] = [name for name in folders if not name.startswith('_')]
+        return static_dirs
+
+    def _collect(self) -> list[str]:
+        """
+        Supprime les fichiers du dossier commun qu'aucune page ne référence.
+
+        Returns:
+            Noms des fichiers supprimés.
+        """
+        if not os.path.isdir(self.store_dir):
+            return []
+
+        referenced = set()
+        pending = []
+        for folder_path, folders, files in os.walk(self.build_dir):
+            folders[:] = [name for name in folders if name != STORE_NAME or folder_path != self.build_dir]
+            for filename in files:
+                if filename.endswith('.html'):
+                    with open(os.path.join(folder_path, filename), 'r', encoding='utf-8',
+                              errors='surrogateescape') as f:
+                        pending.extend(_STORE_REFERENCE.findall(f.read()))
+
+        # Fichiers référencés par les feuilles de style du dossier commun
+        while pending:
+            name = pending.pop()
+            if name in referenced:
+                continue
+            referenced.add(name)
+            path = os.path.join(self.store_dir, name)
+            if name.endswith('.css') and os.path.isfile(path):
+                with open(path, 'r', encoding='utf-8', errors='surrogateescape') as f:
+                    for match in _CSS_REFERENCE.finditer(f.read()):
+                        url = match.group(3) or match.group(7)
+                        if _is_relative(url) and '/' not in urlsplit(url).path:
+                            pending.append(urlsplit(url).path)
+
+        removed = []
+        with os.scandir(self.store_dir) as entries:
+            for entry in entries:
+                name = entry.name
+                for suffix in (".gz", ".br"):
+                    name = name.removesuffix(suffix)
+                if name not in referenced:
+                    os.remove(entry.path)
+                    removed.append(entry.name)
+        return removed
+
+
+def _fragment(url: str) -> str:
+    """
+    Retourne l'ancre d'une URL (ex: '#iefix' des polices), sans la requête:
+    le nom des fichiers du dossier commun contient déjà leur empreinte.
+
+    Args:
+        url: URL relative.
+
+    Returns:
+        Ancre précédée de '#', ou chaîne vide.
+    """
+    fragment = urlsplit(url).fragment
+    return f"#{fragment}" if fragment else ""
+
+
+def _remove_empty_folders(root: str) -> None:
+    """
+    Supprime les dossiers vides d'une arborescence, racine comprise.
+
+    Args:
+        root: Dossier racine.
+    """
+    for folder_path, _, _ in sorted(os.walk(root), key=lambda item: len(item[0]), reverse=True):
+        try:
+            os.rmdir(folder_path)
+        except OSError:
+            pass
+
+
+def compress_files(build_dir: str, level: int = 9) -> int:
+    """
+    Écrit les copies compressées des fichiers HTML, JavaScript et CSS.
+
+    Une copie est écrite si elle est absente ou plus ancienne que le
+    fichier; les copies dont le fichier a disparu sont supprimées. Les
+    copies .gz sont reproductibles (date de l'en-tête gzip à zéro).
+
+    Args:
+        build_dir: Dossier de sortie.
+        level: Niveau de compression gzip.
+
+    Returns:
+        Nombre de fichiers compressés.
+    """
+    suffixes = [".gz"] if brotli is None else [".gz", ".br"]
+    compressed = 0
+    for folder_path, _, files in os.walk(build_dir):
+        names = set(files)
+        for filename in files:
+            path = os.path.join(folder_path, filename)
+            base, suffix = os.path.splitext(filename)
+            if suffix in (".gz", ".br"):
+                if base.endswith(COMPRESSED_SUFFIXES) and base not in names:
+                    os.remove(path)
+                continue
+            if not filename.endswith(COMPRESSED_SUFFIXES):
+                continue
+
+            mtime = os.stat(path).st_mtime_ns
+            outdated = [suffix for suffix in suffixes
+                        if f"{filename}{suffix}" not in names
+                        or os.stat(f"{path}{suffix}").st_mtime_ns < mtime]
+            if not outdated:
+                continue
+
+            with open(path, 'rb') as f:
+                data = f.read()
+            for suffix in outdated:
+                if suffix == ".gz":
+                    packed = gzip.compress(data, compresslevel=level, mtime=0)
+                else:
+                    packed = brotli.compress(data)
+                _write_bytes(f"{path}{suffix}", packed)
+            compressed += 1
+    return compressed
+
+
+def optimize_site(build_dir: str, compress: bool = True) -> None:
+    """
+    Regroupe les fichiers statiques des versions et écrit les copies compressées.
+
+    Args:
+        build_dir: Dossier de sortie contenant les versions.
+        compress: Si False, aucune copie compressée n'est écrite.
+    """
+    store = AssetStore(build_dir)
+    pages = store.deduplicate()
+    print(f"{pages} page(s) réécrite(s), {store.moved} fichier(s) statique(s) "
+          f"déplacé(s) ({store.bytes_saved} octets), {store.stored} ajouté(s) à "
+          f"{posixpath.join(os.path.basename(store.build_dir), STORE_NAME)}")
+    if compress:
+        count = compress_files(build_dir)
+        formats = "gzip" if brotli is None else "gzip et brotli"
+        print(f"{count} fichier(s) compressé(s) ({formats})")
+
+
+def main() -> None:
+    """
+    Point d'entrée en ligne de commande.
+    """
+    base_dir = os.path.dirname(os.path.abspath(__file__))
+
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--build-dir", default=os.path.join(base_dir, "build"),
+                        help="Dossier de sortie contenant les versions")
+    parser.add_argument("--no-compress", action="store_true",
+                        help="Ne pas écrire de copies compressées")
+    args = parser.parse_args()
+
+    optimize_site(args.build_dir, compress=not args.no_compress)
+
+
+if __name__ == "__main__":
+    main()
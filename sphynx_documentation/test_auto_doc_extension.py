@@ -0,0 +1,86 @@
+"""
+Tests de la détection des pages à relire par l'extension auto_doc_extension.
+
+Exemple:
+    python -m pytest test_auto_doc_extension.py
+"""
+
+import os
+import tempfile
+import time
+import unittest
+from types import SimpleNamespace
+
+from auto_doc_extension import _module_docnames, changed_modules, folder_fingerprints, unchanged_folders
+from auto_doc_matlab import find_leaf_folders, scan_folder
+from scan_cache import ScanCache
+
+
+class OutdatedPagesTest(unittest.TestCase):
+    """
+    Deux constructions successives sur le même code MATLAB.
+    """
+
+    def setUp(self) -> None:
+        self._tmp = tempfile.TemporaryDirectory()
+        self.code_path = os.path.join(self._tmp.name, "code")
+        for folder in ("A", "B"):
+            os.makedirs(os.path.join(self.code_path, folder))
+            self._write(os.path.join(folder, "f.m"), "function f()\nend\n")
+        # Dates anciennes: le cache de parcours ne mémorise pas les dates
+        # trop récentes
+        past = time.time() - 60
+        for folder in ("A", "B", ""):
+            os.utime(os.path.join(self.code_path, folder), (past, past))
+        self.app = SimpleNamespace(srcdir=os.path.join(self._tmp.name, "source"))
+        self.output_file = os.path.join(self.app.srcdir, "documentation_hierarchique.rst")
+
+        self.entries = {}
+        self.fingerprints = None
+        self._build()
+
+    def tearDown(self) -> None:
+        self._tmp.cleanup()
+
+    def _write(self, relative: str, content: str) -> None:
+        with open(os.path.join(self.code_path, relative), 'w', encoding='utf-8') as f:
+            f.write(content)
+
+    def _build(self, check_files: bool = True) -> set[str]:
+        """Reproduit la détection de _on_builder_inited et retourne les pages signalées."""
+        previous_entries = self.entries
+        cache = ScanCache(None, self.code_path, scan_folder, entries=dict(previous_entries))
+        structure = find_leaf_folders(self.code_path, cache=cache)
+        unchanged = unchanged_folders(previous_entries, cache.entries)
+        fingerprints = folder_fingerprints(
+            self.code_path, structure, self.fingerprints, unchanged, check_files
+            )
+        modules = changed_modules(self.fingerprints, fingerprints)
+        self.entries, self.fingerprints = cache.entries, fingerprints
+        return _module_docnames(self.app, self.output_file, modules, split_pages=True)
+
+    def _edit_in_place(self) -> None:
+        folder_path = os.path.join(self.code_path, "A")
+        folder_stat = os.stat(folder_path)
+        self._write(os.path.join("A", "f.m"), "function f()\n% Modifiée\nend\n")
+        # La date du dossier est inchangée, comme pour une édition sur place
+        os.utime(folder_path, ns=(folder_stat.st_atime_ns, folder_stat.st_mtime_ns))
+
+    def test_in_place_edit_is_reported(self) -> None:
+        self.assertEqual(self._build(), set())
+
+        self._edit_in_place()
+        self.assertEqual(self._build(), {"documentation_hierarchique/A"})
+        self.assertEqual(self._build(), set())
+
+    def test_in_place_edit_ignored_without_check_files(self) -> None:
+        self._edit_in_place()
+        self.assertEqual(self._build(check_files=False), set())
+
+    def test_added_file_is_reported(self) -> None:
+        self._write(os.path.join("B", "g.m"), "function g()\nend\n")
+        self.assertEqual(self._build(), {"documentation_hierarchique/B"})
+
+
+if __name__ == "__main__":
+    unittest.main()
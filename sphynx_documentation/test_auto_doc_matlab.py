@@ -0,0 +1,81 @@
+"""
+Tests de la génération de documentation_hierarchique.rst (auto_doc_matlab).
+
+Exemple:
+    python -m pytest test_auto_doc_matlab.py
+"""
+
+import os
+import sys
+import tempfile
+import unittest
+from contextlib import redirect_stdout
+from io import StringIO
+
+from auto_doc_matlab import find_leaf_folders, generate_hierarchical_rst, generate_rst_content
+
+
+class DeepTreeTest(unittest.TestCase):
+    """
+    Arborescence plus profonde que la limite de récursion de Python.
+    """
+
+    def setUp(self) -> None:
+        self._tmp = tempfile.TemporaryDirectory()
+        self.code_path = os.path.join(self._tmp.name, "code")
+        self.depth = sys.getrecursionlimit() + 100
+        # os.makedirs et shutil.rmtree sont récursifs: création et
+        # suppression dossier par dossier
+        self.folders = [self.code_path]
+        for _ in range(self.depth):
+            self.folders.append(os.path.join(self.folders[-1], "d"))
+        for folder_path in self.folders:
+            os.mkdir(folder_path)
+        with open(os.path.join(self.folders[-1], "f.m"), 'w', encoding='utf-8') as f:
+            f.write("function f()\n% Fonction au fond de l'arborescence\nend\n")
+
+    def tearDown(self) -> None:
+        os.remove(os.path.join(self.folders[-1], "f.m"))
+        for folder_path in reversed(self.folders):
+            os.rmdir(folder_path)
+        self._tmp.cleanup()
+
+    def test_generate_hierarchical_rst(self) -> None:
+        output_file = os.path.join(self._tmp.name, "documentation.rst")
+        for iterative in (False, True):
+            with self.subTest(iterative=iterative), redirect_stdout(StringIO()):
+                structure = generate_hierarchical_rst(
+                    self.code_path, output_file, workers=1, iterative=iterative
+                    )
+            self.assertIsNotNone(structure)
+            with open(output_file, 'r', encoding='utf-8') as f:
+                lines = f.read().splitlines()
+            self.assertIn(f".. automodule:: {'.'.join(['d'] * self.depth)}", lines)
+            self.assertEqual(lines.count("d"), self.depth)
+
+    def test_parallel_scan(self) -> None:
+        structure = find_leaf_folders(self.code_path, workers=4)
+        self.assertEqual(structure, find_leaf_folders(self.code_path))
+
+
+class RstContentTest(unittest.TestCase):
+    """
+    Ordre des titres et directives produits pour une petite arborescence.
+    """
+
+    def test_order_and_levels(self) -> None:
+        with tempfile.TemporaryDirectory() as code_path:
+            for folder in ("A", os.path.join("A", "B"), "C"):
+                os.makedirs(os.path.join(code_path, folder), exist_ok=True)
+                with open(os.path.join(code_path, folder, "f.m"), 'w', encoding='utf-8') as f:
+                    f.write("function f()\nend\n")
+            lines = generate_rst_content(find_leaf_folders(code_path))
+
+        titles = [(line, lines[index + 1][0]) for index, line in enumerate(lines)
+                  if line in ("A", "B", "C")]
+        self.assertEqual(titles, [("A", "="), ("B", "-"), ("C", "=")])
+        self.assertIn(".. automodule:: A.B", lines)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,60 @@
+"""
+Tests du cache d'analyse des fichiers .m (parse_cache).
+
+Exemple:
+    python -m pytest test_parse_cache.py
+"""
+
+import os
+import shutil
+import tempfile
+import unittest
+
+from auto_doc_matlab import find_leaf_folders
+from matlab_symbols import build_symbol_index
+from parse_cache import ParseCache
+
+
+class SharedCacheTest(unittest.TestCase):
+    """
+    Index des symboles de deux versions du code partageant un même cache.
+    """
+
+    def setUp(self) -> None:
+        self._tmp = tempfile.TemporaryDirectory()
+        self.cache_dir = os.path.join(self._tmp.name, "cache")
+        self.code_path = os.path.join(self._tmp.name, "v1")
+        for folder in ("A", "B"):
+            os.makedirs(os.path.join(self.code_path, folder))
+            for name in ("f", "g"):
+                self._write(self.code_path, os.path.join(folder, f"{name}.m"),
+                            f"function {name}()\n% Fonction {name} de {folder}\nend\n")
+
+    def tearDown(self) -> None:
+        self._tmp.cleanup()
+
+    @staticmethod
+    def _write(code_path: str, relative: str, content: str) -> None:
+        with open(os.path.join(code_path, relative), 'w', encoding='utf-8') as f:
+            f.write(content)
+
+    def _index(self, code_path: str) -> tuple[dict, ParseCache]:
+        cache = ParseCache(self.cache_dir)
+        index = build_symbol_index(code_path, find_leaf_folders(code_path), cache.read_header)
+        return index, cache
+
+    def test_second_version_reuses_cache(self) -> None:
+        first, cache = self._index(self.code_path)
+        self.assertEqual((cache.hits, cache.misses), (0, 4))
+
+        # Seconde version: un seul fichier modifié
+        other_path = os.path.join(self._tmp.name, "v2")
+        shutil.copytree(self.code_path, other_path)
+        self._write(other_path, os.path.join("B", "g.m"), "function g()\n% Modifiée\nend\n")
+        second, cache = self._index(other_path)
+        self.assertEqual((cache.hits, cache.misses), (3, 1))
+        self.assertEqual(first["A"], second["A"])
+
+
+if __name__ == "__main__":
+    unittest.main()
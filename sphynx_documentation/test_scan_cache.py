@@ -0,0 +1,63 @@
+"""
+Tests du cache persistant du parcours de l'arborescence (scan_cache).
+
+Exemple:
+    python -m pytest test_scan_cache.py
+"""
+
+import os
+import tempfile
+import time
+import unittest
+from functools import partial
+
+from auto_doc_matlab import find_leaf_folders, scan_folder
+from scan_cache import ScanCache
+from scan_rules import ScanRules
+
+
+class RulesHeaderTest(unittest.TestCase):
+    """
+    Cache enregistré puis relu avec les mêmes règles ou d'autres règles.
+    """
+
+    def setUp(self) -> None:
+        self._tmp = tempfile.TemporaryDirectory()
+        self.code_path = os.path.join(self._tmp.name, "code")
+        os.makedirs(os.path.join(self.code_path, "A"))
+        with open(os.path.join(self.code_path, "A", "f.m"), 'w', encoding='utf-8') as f:
+            f.write("function f()\nend\n")
+        # Dates anciennes: le cache ne mémorise pas les dates trop récentes
+        past = time.time() - 60
+        for folder in ("A", ""):
+            os.utime(os.path.join(self.code_path, folder), (past, past))
+        self.cache_file = os.path.join(self._tmp.name, "scan.json")
+
+    def tearDown(self) -> None:
+        self._tmp.cleanup()
+
+    def _scan(self, rules: ScanRules) -> ScanCache:
+        cache = ScanCache(
+            self.cache_file, self.code_path,
+            partial(scan_folder, follow_symlinks=rules.follow_symlinks), rules=rules
+            )
+        find_leaf_folders(self.code_path, cache=cache, rules=rules)
+        cache.save()
+        return cache
+
+    def test_same_rules_reuse_cache(self) -> None:
+        self._scan(ScanRules())
+        cache = self._scan(ScanRules())
+        self.assertEqual((cache.hits, cache.misses), (2, 0))
+
+    def test_changed_rules_discard_cache(self) -> None:
+        self._scan(ScanRules())
+        for rules in (ScanRules(follow_symlinks=True), ScanRules(["tmp"]), ScanRules(max_depth=1)):
+            with self.subTest(patterns=rules.patterns, max_depth=rules.max_depth,
+                              follow_symlinks=rules.follow_symlinks):
+                cache = self._scan(rules)
+                self.assertEqual(cache.hits, 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,593 @@
+"""
+Ce module surveille le code MATLAB et les dossiers source/doc_* pendant la
+rédaction, et ne régénère que les fichiers RST concernés par chaque
+modification avant de relancer une construction Sphinx incrémentale.
+
+Les événements sont fournis par watchdog (inotify sous Linux) lorsqu'il
+est installé, et sinon par une scrutation périodique des dates de
+modification. Les dossiers exclus du parcours (voir scan_rules.ScanRules,
+dont .git) sont ignorés. Les changements sont regroupés (debounce) puis
+associés:
+- aux dossiers de la structure de find_leaf_folders (fichiers .m);
+- aux sections de index.rst (dossiers source/doc_*).
+
+Une modification du contenu d'un fichier .m ne change pas le RST généré:
+la page du dossier est alors simplement « touchée » pour que Sphinx la
+relise. Un ajout ou une suppression de fichier ou de dossier relance le
+parcours (avec le cache de parcours) et seules les pages dont le contenu
+change sont réécrites.
+
+Les options de parcours et les sections de index.rst sont lues dans
+conf.py (matlab_autogen_exclude, matlab_autogen_max_depth,
+matlab_autogen_follow_symlinks, matlab_autogen_index_sections).
+
+Exemple:
+    python watch_doc.py --split-pages
+"""
+
+import argparse
+import os
+import queue
+import subprocess
+import time
+from functools import partial
+from pathlib import Path
+
+from auto_doc_matlab import (
+    find_leaf_folders,
+    folder_page_names,
+    pages_dir_for,
+    scan_folder,
+    write_documentation,
+)
+from build_cache import load_config
+from folder_tree import FolderNode
+from index_writer import write_index
+from matlab_symbols import build_symbol_index, prune_structure, scan_folder_symbols
+from parse_cache import ParseCache
+from scan_cache import ScanCache, cache_path_for
+from scan_rules import CycleGuard, ScanRules
+
+try:
+    from watchdog.events import FileSystemEventHandler
+    from watchdog.observers import Observer
+except ImportError:
+    Observer = None
+
+# Types de changements
+MODIFIED = "modified"
+STRUCTURE = "structure"
+
+
+def _is_watched_file(path: str) -> bool:
+    """
+    Indique si un fichier est suivi par la surveillance.
+
+    Args:
+        path: Chemin du fichier.
+
+    Returns:
+        True pour les fichiers MATLAB (.m) et reStructuredText (.rst).
+    """
+    return path.endswith('.m') or path.endswith('.rst')
+
+
+class PollingObserver:
+    """
+    Détection des changements par scrutation périodique.
+
+    À chaque passage, la liste des dossiers surveillés est recalculée (un
+    nouveau dossier source/doc_* est ainsi suivi), les dossiers sont relus
+    avec os.scandir et la date de modification et la taille de chaque
+    fichier suivi sont comparées au passage précédent.
+    """
+
+    def __init__(self,
+            roots,
+            interval: float = 1.0,
+            ignored=None,
+            follow_symlinks: bool = False
+            ) -> None:
+        """
+        Args:
+            roots: Fonction sans argument retournant les dossiers à
+                surveiller (voir DocWatcher.watched_roots).
+            interval: Délai entre deux passages, en secondes.
+            ignored: Fonction indiquant si un dossier est ignoré (ses
+                fichiers et sous-dossiers ne sont pas relus), ou None.
+            follow_symlinks: Si True, les liens symboliques vers des
+                dossiers sont suivis, sauf s'ils forment une boucle (voir
+                scan_rules.CycleGuard); sinon ils sont ignorés.
+        """
+        self.roots = roots
+        self.interval = interval
+        self.ignored = ignored
+        self.follow_symlinks = follow_symlinks
+        self._snapshot = self._take_snapshot()
+
+    def _take_snapshot(self) -> dict[str, tuple]:
+        """
+        Relève l'état des dossiers et fichiers suivis.
+
+        Returns:
+            Dictionnaire {chemin: (est un dossier, mtime_ns, taille)}.
+        """
+        snapshot = {}
+        stack = [
+            (root, CycleGuard(root) if self.follow_symlinks else None)
+            for root in self.roots() if os.path.isdir(root)
+            ]
+        while stack:
+            folder_path, guard = stack.pop()
+            snapshot[folder_path] = (True, 0, 0)
+            try:
+                with os.scandir(folder_path) as entries:
+                    for entry in entries:
+                        try:
+                            if entry.is_dir(follow_symlinks=self.follow_symlinks):
+                                if self.ignored is not None and self.ignored(entry.path):
+                                    continue
+                                if guard is not None and guard.is_loop(folder_path, entry.path):
+                                    continue
+                                stack.append((entry.path, guard))
+                            elif _is_watched_file(entry.name):
+                                stat = entry.stat()
+                                snapshot[entry.path] = (False, stat.st_mtime_ns, stat.st_size)
+                        except OSError:
+                            continue
+            except OSError:
+                continue
+        return snapshot
+
+    def events(self, timeout: float) -> list[tuple[str, str]]:
+        """
+        Attend le prochain passage et retourne les changements détectés.
+
+        Args:
+            timeout: Délai maximal d'attente, en secondes.
+
+        Returns:
+            Liste de tuples (type de changement, chemin).
+        """
+        time.sleep(min(timeout, self.interval))
+        snapshot = self._take_snapshot()
+        previous = self._snapshot
+        self._snapshot = snapshot
+
+        changes = []
+        for path in snapshot.keys() - previous.keys():
+            changes.append((STRUCTURE, path))
+        for path in previous.keys() - snapshot.keys():
+            changes.append((STRUCTURE, path))
+        for path, state in snapshot.items():
+            if not state[0] and path in previous and previous[path] != state:
+                changes.append((MODIFIED, path))
+        return changes
+
+    def stop(self) -> None:
+        """Arrête la surveillance (rien à libérer pour la scrutation)."""
+
+
+class WatchdogObserver:
+    """
+    Détection des changements par les notifications du système de fichiers
+    (inotify, FSEvents, ReadDirectoryChangesW), via watchdog.
+
+    La liste des dossiers surveillés est recalculée à chaque attente: un
+    nouveau dossier source/doc_* est surveillé dès son apparition et
+    signalé comme un changement de structure.
+    """
+
+    def __init__(self, roots, ignored=None) -> None:
+        """
+        Args:
+            roots: Fonction sans argument retournant les dossiers à
+                surveiller (voir DocWatcher.watched_roots).
+            ignored: Fonction indiquant si un dossier est ignoré (les
+                événements des chemins qu'il contient sont écartés), ou None.
+        """
+        self.roots = roots
+        self._queue = queue.Queue()
+        self._observer = Observer()
+        self._scheduled = set()
+
+        changes = self._queue
+
+        def is_ignored(path: str, is_directory: bool) -> bool:
+            if ignored is None:
+                return False
+            return ignored(path if is_directory else os.path.dirname(path))
+
+        class _Handler(FileSystemEventHandler):
+            def on_any_event(self, event):
+                paths = [event.src_path, getattr(event, "dest_path", "")]
+                if event.event_type == "modified":
+                    if (not event.is_directory and _is_watched_file(event.src_path)
+                            and not is_ignored(event.src_path, False)):
+                        changes.put((MODIFIED, event.src_path))
+                elif event.event_type in ("created", "deleted", "moved"):
+                    for path in paths:
+                        if (path and (event.is_directory or _is_watched_file(path))
+                                and not is_ignored(path, event.is_directory)):
+                            changes.put((STRUCTURE, path))
+
+        self._handler = _Handler()
+        self._schedule_roots()
+        self._observer.start()
+
+    def _schedule_roots(self) -> list[str]:
+        """
+        Surveille les dossiers apparus depuis le dernier appel.
+
+        Returns:
+            Dossiers nouvellement surveillés.
+        """
+        added = []
+        for root in self.roots():
+            if root not in self._scheduled and os.path.isdir(root):
+                self._observer.schedule(self._handler, root, recursive=True)
+                self._scheduled.add(root)
+                added.append(root)
+        return added
+
+    def events(self, timeout: float) -> list[tuple[str, str]]:
+        """
+        Attend des changements pendant au plus timeout secondes.
+
+        Args:
+            timeout: Délai maximal d'attente, en secondes.
+
+        Returns:
+            Liste de tuples (type de changement, chemin).
+        """
+        for root in self._schedule_roots():
+            self._queue.put((STRUCTURE, root))
+        try:
+            changes = [self._queue.get(timeout=timeout)]
+        except queue.Empty:
+            return []
+        while True:
+            try:
+                changes.append(self._queue.get_nowait())
+            except queue.Empty:
+                return changes
+
+    def stop(self) -> None:
+        """Arrête le thread de surveillance de watchdog."""
+        self._observer.stop()
+        self._observer.join()
+
+
+def wait_for_changes(observer, debounce: float) -> dict[str, str]:
+    """
+    Attend un changement puis regroupe ceux qui suivent de près.
+
+    Les changements sont accumulés jusqu'à ce qu'aucun nouveau changement
+    n'arrive pendant 'debounce' secondes, ce qui regroupe par exemple les
+    écritures multiples d'un éditeur ou un changement de branche git.
+
+    Args:
+        observer: PollingObserver ou WatchdogObserver.
+        debounce: Délai de calme, en secondes.
+
+    Returns:
+        Dictionnaire {chemin: type de changement}; un changement de
+        structure l'emporte sur une modification de contenu.
+    """
+    changes = {}
+    while not changes:
+        for kind, path in observer.events(timeout=1.0):
+            if changes.get(path) != STRUCTURE:
+                changes[path] = kind
+
+    while True:
+        events = observer.events(timeout=debounce)
+        if not events:
+            return changes
+        for kind, path in events:
+            if changes.get(path) != STRUCTURE:
+                changes[path] = kind
+
+
+class DocWatcher:
+    """
+    Régénère les fichiers RST touchés par un ensemble de changements.
+
+    Attributes:
+        code_path: Dossier racine du code MATLAB.
+        source_dir: Dossier source du projet Sphinx.
+        output_file: Fichier RST généré (page racine en mode une page par dossier).
+        split_pages: True en mode une page par dossier.
+        explicit_members: True pour des directives autofunction/autoclass explicites.
+        max_members: Découpage des dossiers volumineux (voir
+            auto_doc_matlab.generate_rst_pages), ou None.
+        with_index: True pour régénérer aussi index.rst (index_writer).
+        index_sections: Sections de index.rst (voir index_writer.SECTIONS),
+            ou None pour les sections par défaut.
+        rules: Règles de parcours (voir scan_rules.ScanRules).
+    """
+
+    def __init__(self,
+            code_path: str,
+            source_dir: str,
+            output_file: str,
+            split_pages: bool = False,
+            explicit_members: bool = False,
+            with_index: bool = False,
+            max_members: int | None = None,
+            index_sections: list[dict] | None = None,
+            rules: ScanRules | None = None
+            ) -> None:
+        self.code_path = os.path.abspath(code_path)
+        self.source_dir = os.path.abspath(source_dir)
+        self.output_file = os.path.abspath(output_file)
+        self.split_pages = split_pages
+        self.explicit_members = explicit_members
+        self.with_index = with_index
+        self.max_members = max_members
+        self.index_sections = index_sections
+        self.rules = rules if rules is not None else ScanRules.from_options(code_path)
+        self._parse_cache = ParseCache()
+        self._structure = FolderNode("")
+        self._symbol_index = None
+
+    def watched_roots(self) -> list[str]:
+        """
+        Liste les dossiers à surveiller (appelée par les observateurs à
+        chaque passage).
+
+        Returns:
+            Dossier du code MATLAB et dossiers source/doc_*.
+        """
+        roots = [self.code_path]
+        with os.scandir(self.source_dir) as entries:
+            roots.extend(
+                entry.path for entry in entries
+                if entry.is_dir() and entry.name.startswith("doc_")
+                )
+        return roots
+
+    def is_ignored(self, folder_path: str) -> bool:
+        """
+        Indique si un dossier surveillé est hors du parcours.
+
+        Args:
+            folder_path: Chemin du dossier.
+
+        Returns:
+            True pour un dossier du code MATLAB exclu par les règles de
+            parcours (ou sous un dossier exclu); False pour les autres
+            dossiers (dont les dossiers source/doc_*).
+        """
+        relative = os.path.relpath(folder_path, self.code_path)
+        if relative.startswith(os.pardir):
+            return False
+        if relative == os.curdir:
+            relative = ""
+        return not self.rules.is_walked(relative.replace(os.sep, '/'))
+
+    def _folder_of(self, path: str) -> tuple[str, str] | None:
+        """
+        Détermine le dossier MATLAB d'un fichier .m.
+
+        Args:
+            path: Chemin du fichier.
+
+        Returns:
+            Tuple (chemin en notation pointée, chemin relatif) du dossier,
+            ou None si le fichier n'est pas sous le dossier du code.
+        """
+        relative = os.path.relpath(os.path.dirname(path), self.code_path)
+        if relative == os.curdir or relative.startswith(os.pardir):
+            return None
+        return relative.replace(os.sep, '.'), relative
+
+    def _page_paths(self, module_path: str) -> list[str]:
+        """
+        Détermine les fichiers RST qui documentent un dossier MATLAB.
+
+        Args:
+            module_path: Chemin du dossier en notation pointée.
+
+        Returns:
+            Chemins de la page du dossier et de ses sous-pages (ou du
+            fichier unique).
+        """
+        if self.split_pages:
+            pages_dir = pages_dir_for(self.output_file)
+            return [
+                os.path.join(pages_dir, f"{page_name}.rst")
+                for page_name in folder_page_names(module_path, self._symbol_index, self.max_members)
+                ]
+        return [self.output_file]
+
+    def regenerate(self) -> list[str]:
+        """
+        Parcourt l'arborescence et réécrit les fichiers RST modifiés.
+
+        Returns:
+            Chemins des fichiers écrits.
+        """
+        cache = ScanCache(
+            cache_path_for(self.output_file), self.code_path,
+            partial(scan_folder, follow_symlinks=self.rules.follow_symlinks),
+            rules=self.rules
+            )
+        self._structure = find_leaf_folders(self.code_path, cache=cache, rules=self.rules)
+        cache.save()
+
+        if self.explicit_members:
+            self._symbol_index = build_symbol_index(
+                self.code_path, self._structure, self._parse_cache.read_header
+                )
+        return self._write()
+
+    def _write(self) -> list[str]:
+        """
+        Écrit les fichiers RST à partir de la structure et de l'index courants.
+
+        Returns:
+            Chemins des fichiers écrits.
+        """
+        structure = self._structure
+        if self._symbol_index is not None:
+            structure = prune_structure(structure, self._symbol_index)
+        written, _, _ = write_documentation(
+            structure, self.output_file, self.split_pages, self._symbol_index,
+            max_members=self.max_members
+            )
+        return written
+
+    def apply(self, changes: dict[str, str]) -> list[str]:
+        """
+        Met à jour les fichiers RST concernés par des changements.
+
+        Args:
+            changes: Dictionnaire {chemin: type de changement}
+                (issu de wait_for_changes).
+
+        Returns:
+            Chemins des fichiers RST écrits ou touchés.
+        """
+        updated = []
+        code_prefix = self.code_path + os.sep
+        code_changes = {path: kind for path, kind in changes.items() if path.startswith(code_prefix)}
+        doc_changes = {path: kind for path, kind in changes.items() if path not in code_changes}
+
+        modified = [path for path, kind in code_changes.items() if kind == MODIFIED]
+        modules = dict(filter(None, map(self._folder_of, modified)))
+
+        if any(kind == STRUCTURE for kind in code_changes.values()):
+            # Ajout, suppression ou renommage: nouveau parcours (seuls les
+            # dossiers modifiés sont relus grâce au cache de parcours, et
+            # l'index des symboles est reconstruit)
+            updated.extend(self.regenerate())
+        elif modules and self._symbol_index is not None:
+            # Un en-tête modifié peut changer les directives explicites
+            for module_path, relative_folder in modules.items():
+                self._symbol_index[module_path] = scan_folder_symbols(
+                    self.code_path, relative_folder, self._parse_cache.read_header
+                    )
+            updated.extend(self._write())
+
+        # Pages des fichiers modifiés non réécrites: les toucher pour que
+        # Sphinx les relise
+        page_paths = {path for module_path in modules for path in self._page_paths(module_path)}
+        for page_path in page_paths:
+            if page_path not in updated and os.path.exists(page_path):
+                os.utime(page_path)
+                updated.append(page_path)
+
+        if self.with_index and any(kind == STRUCTURE for kind in doc_changes.values()):
+            if write_index(Path(self.source_dir), self.index_sections):
+                updated.append(os.path.join(self.source_dir, "index.rst"))
+
+        return updated
+
+
+def run_sphinx(sphinx_build: str, source_dir: str, build_dir: str, builder: str) -> int:
+    """
+    Lance une construction Sphinx incrémentale.
+
+    La génération par l'extension auto_doc_extension est désactivée: les
+    fichiers RST sont déjà à jour.
+
+    Args:
+        sphinx_build: Commande sphinx-build.
+        source_dir: Dossier source du projet Sphinx.
+        build_dir: Dossier de sortie.
+        builder: Constructeur Sphinx (ex: html).
+
+    Returns:
+        Code de retour de sphinx-build.
+    """
+    command = [
+        sphinx_build, "-M", builder, source_dir, build_dir,
+        "-D", "matlab_autogen_enabled=0",
+        ]
+    return subprocess.run(command).returncode
+
+
+def main() -> None:
+    """
+    Point d'entrée en ligne de commande du mode surveillance.
+    """
+    base_dir = os.path.dirname(os.path.abspath(__file__))
+
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--code-path", default=os.path.join(base_dir, "..", "code_matlab"),
+                        help="Dossier racine du code MATLAB")
+    parser.add_argument("--source-dir", default=os.path.join(base_dir, "source"),
+                        help="Dossier source du projet Sphinx")
+    parser.add_argument("--build-dir", default=os.path.join(base_dir, "build"),
+                        help="Dossier de sortie de Sphinx")
+    parser.add_argument("--output", default="documentation_hierarchique.rst",
+                        help="Fichier RST généré, relatif au dossier source")
+    parser.add_argument("--split-pages", action="store_true", help="Une page par dossier")
+    parser.add_argument("--explicit-members", action="store_true",
+                        help="Directives autofunction/autoclass explicites")
+    parser.add_argument("--max-members", type=int,
+                        help="Symboles par page au-delà desquels un dossier est découpé "
+                             "(avec --split-pages et --explicit-members)")
+    parser.add_argument("--index", action="store_true",
+                        help="Régénérer aussi index.rst (index_writer)")
+    parser.add_argument("--builder", default="html", help="Constructeur Sphinx")
+    parser.add_argument("--sphinx-build", default="sphinx-build", help="Commande sphinx-build")
+    parser.add_argument("--no-build", action="store_true",
+                        help="Régénérer les RST sans lancer Sphinx")
+    parser.add_argument("--debounce", type=float, default=0.5,
+                        help="Délai de regroupement des événements, en secondes")
+    parser.add_argument("--interval", type=float, default=1.0,
+                        help="Intervalle de scrutation sans watchdog, en secondes")
+    parser.add_argument("--polling", action="store_true",
+                        help="Forcer la scrutation même si watchdog est installé")
+    args = parser.parse_args()
+
+    config = load_config(args.source_dir)
+    rules = ScanRules.from_options(
+        args.code_path, config.get("matlab_autogen_exclude", ()),
+        max_depth=config.get("matlab_autogen_max_depth"),
+        follow_symlinks=config.get("matlab_autogen_follow_symlinks", False),
+        )
+    watcher = DocWatcher(
+        args.code_path,
+        args.source_dir,
+        os.path.join(args.source_dir, args.output),
+        split_pages=args.split_pages,
+        explicit_members=args.explicit_members,
+        with_index=args.index,
+        max_members=args.max_members,
+        index_sections=config.get("matlab_autogen_index_sections"),
+        rules=rules,
+        )
+    watcher.regenerate()
+    if not args.no_build:
+        run_sphinx(args.sphinx_build, args.source_dir, args.build_dir, args.builder)
+
+    roots = watcher.watched_roots()
+    if Observer is not None and not args.polling:
+        observer = WatchdogObserver(watcher.watched_roots, watcher.is_ignored)
+        print("Surveillance (watchdog) de:", ", ".join(roots))
+    else:
+        observer = PollingObserver(
+            watcher.watched_roots, args.interval, watcher.is_ignored, rules.follow_symlinks
+            )
+        print("Surveillance (scrutation) de:", ", ".join(roots))
+
+    try:
+        while True:
+            changes = wait_for_changes(observer, args.debounce)
+            started = time.perf_counter()
+            updated = watcher.apply(changes)
+            print(f"{len(changes)} changement(s), {len(updated)} fichier(s) RST mis à jour")
+            if not args.no_build:
+                run_sphinx(args.sphinx_build, args.source_dir, args.build_dir, args.builder)
+            print(f"Documentation à jour en {time.perf_counter() - started:.1f} s")
+    except KeyboardInterrupt:
+        pass
+    finally:
+        observer.stop()
+
+
+if __name__ == "__main__":
+    main()